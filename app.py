@@ -4,6 +4,7 @@ Run with: streamlit run app.py
 """
 
 import base64
+import uuid
 
 import streamlit as st
 from auth import render_login_page, render_user_menu
@@ -12,9 +13,13 @@ from database import (
     save_audio, get_audio, get_user_subscription, update_user_subscription,
     save_reflection, save_reflection_audio, get_reflection_audio,
     get_user_reflections, get_reflection, delete_reflection,
-    get_user_streak, get_reflection_stats,
+    get_user_streak, get_reflection_stats, get_resumable_runs, copy_speech,
+    enqueue_job, get_job, get_active_jobs, request_job_cancel,
+)
+from pipeline import (
+    run_full_pipeline, resume_pipeline, get_addon, get_perspective, generate_combined_perspectives,
+    precompute_addons, PRECOMPUTE_ADDONS,
 )
-from pipeline import run_full_pipeline, generate_addon, generate_perspective, generate_combined_perspectives
 from prompts import LEARNING_ADDONS, PERSPECTIVE_LENSES
 from exporter import export_docx, generate_audio
 from payments import (
@@ -24,6 +29,10 @@ from payments import (
 )
 from topics import get_random_topic, get_featured_topics, TOPIC_CATEGORIES, get_topics_by_category
 from visual_kit import inject_css, stepper, progress_status, chapter_marker, pull_quote, takeaway_box, cover_art, celebrate
+from cancellation import CancelToken
+from clients import warm_up
+from topic_index import find_similar_episode
+from worker import JOB_QUEUE, JOB_EMBEDDED_WORKERS, start_embedded_workers
 
 st.set_page_config(
     page_title="MindCast",
@@ -32,6 +41,25 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
+# ── Warm provider connections once per server process ──────
+@st.cache_resource
+def _warm_up_providers() -> bool:
+    warm_up()
+    return True
+
+
+_warm_up_providers()
+
+
+# ── Background generation workers (JOB_QUEUE) ──────────────
+@st.cache_resource
+def _start_job_workers() -> int:
+    return len(start_embedded_workers(JOB_EMBEDDED_WORKERS))
+
+
+if JOB_QUEUE and JOB_EMBEDDED_WORKERS > 0:
+    _start_job_workers()
+
 # ── Inject Visual Kit CSS ───────────────────────────────────
 inject_css()
 
@@ -676,6 +704,9 @@ defaults = {
     "last_speech_id": None,
     "view": "create",
     "viewing_speech": None,
+    "duplicate_offer": None,  # Existing episode offered for a near-duplicate topic
+    "cancel_token": None,  # CancelToken of the generation in progress
+    "job_id": None,  # Queued/running generation job (JOB_QUEUE)
     # Lens/Reflect mode state
     "lens_situation": "",
     "lens_selected": [],  # List of (category_id, lens_id) tuples
@@ -699,6 +730,14 @@ for key, val in defaults.items():
     if key not in st.session_state:
         st.session_state[key] = val
 
+# A generation cut short by Stop, a rerun or navigating away leaves its token
+# behind: stop whatever of it is still running (the create view offers to resume
+# it once a step was checkpointed)
+if st.session_state.cancel_token is not None:
+    st.session_state.cancel_token.cancel("interrupted")
+    st.session_state.cancel_token = None
+    st.session_state.running = False
+
 # ── Sidebar (clean & minimal) ──────────────────────────────
 with st.sidebar:
     render_user_menu()
@@ -767,6 +806,53 @@ if st.session_state.view == "create":
         render_paywall()
         st.stop()
 
+    # Episode generated by a background worker (JOB_QUEUE): poll it until it finishes.
+    # A job started in another tab or before a reload is picked up too.
+    if JOB_QUEUE and not st.session_state.job_id:
+        active_jobs = get_active_jobs(user["id"])
+        if active_jobs:
+            st.session_state.job_id = active_jobs[0]["job_id"]
+
+    @st.fragment(run_every=2)
+    def _render_job_progress():
+        job = get_job(st.session_state.job_id, user["id"])
+        if job is None or job["status"] not in ("queued", "running"):
+            st.session_state.job_id = None
+            if job and job["status"] == "done":
+                st.session_state.topic = job["topic"]
+                st.session_state.final_text = get_speech(job["speech_id"], user["id"])["final_text"]
+                st.session_state.last_speech_id = job["speech_id"]
+            elif job and job["status"] == "dead":
+                st.session_state.error = f"Generation failed: {job['error']}"
+            elif job and any(r["run_id"] == job["run_id"] for r in get_resumable_runs(user["id"])):
+                st.session_state.error = "Generation stopped. You can resume it where it left off."
+            elif job:
+                st.session_state.error = "Generation stopped."
+            st.rerun()
+
+        progress = job["progress"]
+        st.markdown(f'<h1 class="hero-title">{job["topic"]}</h1>', unsafe_allow_html=True)
+        st.progress(min(progress.get("completed", 0) / progress.get("total", 12), 1.0))
+        if job["cancel_requested"]:
+            progress_status("Stopping...")
+        elif job["status"] == "queued" and job["attempts"]:
+            progress_status("Something went wrong. Retrying shortly...")
+        elif job["status"] == "queued":
+            progress_status("Waiting for a free slot...")
+        elif progress.get("step_type") == "audio":
+            progress_status("Generating audio...")
+        else:
+            progress_status("Crafting your episode...")
+            if progress.get("step"):
+                st.caption(f"Finished: {progress['step']}")
+        if st.button("Stop", key="stop_job_btn", disabled=bool(job["cancel_requested"])):
+            request_job_cancel(job["job_id"], user["id"])
+            st.rerun(scope="fragment")
+
+    if st.session_state.job_id:
+        _render_job_progress()
+        st.stop()
+
     # Show results first if we have them (audio-first experience)
     if st.session_state.final_text and st.session_state.last_speech_id:
         # Success celebration
@@ -808,7 +894,9 @@ if st.session_state.view == "create":
                         st.session_state.addon_running = addon_key
                         with st.spinner(f"Generating {addon['name'].lower()}..."):
                             try:
-                                result = generate_addon(
+                                result = get_addon(
+                                    st.session_state.last_speech_id,
+                                    user["id"],
                                     addon_key,
                                     st.session_state.topic,
                                     st.session_state.final_text
@@ -861,7 +949,9 @@ if st.session_state.view == "create":
                     with st.spinner("Applying lenses..."):
                         try:
                             if len(selected) == 1:
-                                result = generate_perspective(
+                                result = get_perspective(
+                                    st.session_state.last_speech_id,
+                                    user["id"],
                                     selected[0],
                                     st.session_state.topic,
                                     st.session_state.final_text
@@ -870,7 +960,9 @@ if st.session_state.view == "create":
                                 result = generate_combined_perspectives(
                                     selected,
                                     st.session_state.topic,
-                                    st.session_state.final_text
+                                    st.session_state.final_text,
+                                    speech_id=st.session_state.last_speech_id,
+                                    user_id=user["id"],
                                 )
                             st.session_state.perspective_result = result
                         except Exception as e:
@@ -1001,8 +1093,54 @@ if st.session_state.view == "create":
     if not topic.strip():
         st.caption("💡 Tip: The more specific your topic, the better the episode")
 
-    if generate and topic.strip():
-        st.session_state.topic = topic.strip()
+    # Offer to finish an interrupted run (checkpointed stages are not paid for again)
+    resume_run = None
+    resumable = get_resumable_runs(user["id"])
+    if resumable and not st.session_state.running:
+        latest = resumable[0]
+        st.info(f"Your episode on \"{latest['topic']}\" was interrupted before it finished.")
+        if st.button("Resume where it left off", key="resume_run_btn", use_container_width=True):
+            resume_run = latest
+
+    # An episode on (almost) this topic already exists: serve it instead of regenerating
+    def _open_existing_episode(match: dict):
+        speech_id = match["speech_id"]
+        if match["user_id"] != user["id"]:
+            speech_id = copy_speech(speech_id, user["id"])  # catalogue episode -> user's library
+        st.session_state.duplicate_offer = None
+        st.session_state.view = "library"
+        st.session_state.viewing_speech = speech_id
+        st.rerun()
+
+    forced_run = None
+    if generate and topic.strip() and not resume_run:
+        match = find_similar_episode(user["id"], topic.strip())
+        if match and match["auto_serve"]:
+            _open_existing_episode(match)
+        elif match:
+            st.session_state.duplicate_offer = {**match, "requested_topic": topic.strip()}
+            generate = False
+
+    offer = st.session_state.get("duplicate_offer")
+    if offer and not st.session_state.running:
+        st.info(f"There's already an episode on \"{offer['topic']}\" — want to listen to it now?")
+        col_listen, col_new = st.columns(2)
+        with col_listen:
+            if st.button("Listen now", key="duplicate_listen_btn", type="primary", use_container_width=True):
+                _open_existing_episode(offer)
+        with col_new:
+            if st.button("Generate a new one", key="duplicate_new_btn", use_container_width=True):
+                forced_run = offer
+                st.session_state.duplicate_offer = None
+
+    if (generate and topic.strip()) or resume_run or forced_run:
+        if resume_run:
+            st.session_state.topic = resume_run["topic"]
+            length = resume_run["length"]
+        elif forced_run:
+            st.session_state.topic = forced_run["requested_topic"]
+        else:
+            st.session_state.topic = topic.strip()
         st.session_state.length = length
         st.session_state.selected_voice = selected_voice
         st.session_state.steps = []
@@ -1011,10 +1149,21 @@ if st.session_state.view == "create":
         st.session_state.running = True
         st.session_state.error = None
 
+        if JOB_QUEUE:
+            # A background worker generates it; the polling view above takes over
+            st.session_state.job_id = enqueue_job(
+                user["id"], st.session_state.topic, length, selected_voice,
+                run_id=resume_run["run_id"] if resume_run else None,
+            )
+            st.session_state.running = False
+            st.rerun()
+
         # Clean progress display
         st.markdown("---")
         progress_bar = st.progress(0)
         status_container = st.empty()
+        preview_container = st.empty()
+        preview_text = ""
 
         total_steps = 12  # Research, Drafts, Judge, 4x(Critique+Enhancement), Audio
         step_count = 0
@@ -1037,9 +1186,27 @@ if st.session_state.view == "create":
         ]
         enhancement_idx = 0
 
+        cancel = CancelToken()
+        st.session_state.cancel_token = cancel
         try:
-            for step_name, step_type, data in run_full_pipeline(st.session_state.topic, length):
-                if data.get("status") == "done" or step_type == "done":
+            if resume_run:
+                events = resume_pipeline(resume_run["run_id"], stream=True, cancel=cancel)
+            else:
+                events = run_full_pipeline(
+                    st.session_state.topic, length, stream=True,
+                    run_id=uuid.uuid4().hex, user_id=user["id"], cancel=cancel,
+                )
+            for step_name, step_type, data in events:
+                if data.get("status") == "delta":
+                    # Live preview of the stage being written (throttled re-render)
+                    preview_text += data["delta"]
+                    if data["tokens"] == 1 or data["tokens"] % 25 == 0:
+                        preview_container.caption(preview_text[-1500:])
+                    continue
+
+                if data.get("status") in ("done", "skipped") or step_type == "done":
+                    preview_text = ""
+                    preview_container.empty()
                     step_count += 1
                     st.session_state.steps.append((step_name, step_type, data))
                     progress_bar.progress(min(step_count / total_steps, 1.0))
@@ -1058,9 +1225,17 @@ if st.session_state.view == "create":
 
                 if step_type == "done":
                     st.session_state.final_text = data.get("final_text")
+                elif step_type == "cancelled" and data["completed_steps"]:
+                    st.session_state.error = "Generation stopped. You can resume it where it left off."
+                elif step_type == "cancelled":
+                    st.session_state.error = "Generation stopped."
 
         except RuntimeError as e:
             st.session_state.error = str(e)
+        except BaseException:
+            # Streamlit interrupts the script (Stop, rerun, navigation) by raising here
+            cancel.cancel("interrupted")
+            raise
 
         st.session_state.running = False
 
@@ -1073,18 +1248,23 @@ if st.session_state.view == "create":
             )
             st.session_state.last_speech_id = speech_id
 
+            # Learning add-ons are written in the background while the audio renders
+            if PRECOMPUTE_ADDONS:
+                precompute_addons(speech_id, st.session_state.topic, st.session_state.final_text)
+
             # Generate audio
             voice = st.session_state.get("selected_voice", "onyx")
             status_container.markdown("""
             <div class="progress-status">Generating audio...</div>
             """, unsafe_allow_html=True)
             try:
-                audio_bytes = generate_audio(st.session_state.final_text, voice=voice, speed=1.0)
+                audio_bytes = generate_audio(st.session_state.final_text, voice=voice, speed=1.0, cancel=cancel)
                 save_audio(speech_id, user["id"], audio_bytes, voice)
                 progress_bar.progress(1.0)
             except Exception:
                 pass
 
+        st.session_state.cancel_token = None
         st.rerun()
 
     # Show error if any
@@ -1141,7 +1321,9 @@ elif st.session_state.view == "library":
                         if not is_generated:
                             with st.spinner(f"Generating {addon['name'].lower()}..."):
                                 try:
-                                    result = generate_addon(addon_key, speech["topic"], speech["final_text"])
+                                    result = get_addon(
+                                        speech["id"], user["id"], addon_key, speech["topic"], speech["final_text"]
+                                    )
                                     st.session_state[lib_addon_key][addon_key] = result
                                 except Exception as e:
                                     st.error(f"Failed: {e}")
@@ -1183,9 +1365,14 @@ elif st.session_state.view == "library":
                         with st.spinner("Applying lenses..."):
                             try:
                                 if len(selected) == 1:
-                                    result = generate_perspective(selected[0], speech["topic"], speech["final_text"])
+                                    result = get_perspective(
+                                        speech["id"], user["id"], selected[0], speech["topic"], speech["final_text"]
+                                    )
                                 else:
-                                    result = generate_combined_perspectives(selected, speech["topic"], speech["final_text"])
+                                    result = generate_combined_perspectives(
+                                        selected, speech["topic"], speech["final_text"],
+                                        speech_id=speech["id"], user_id=user["id"],
+                                    )
                                 st.session_state[lib_perspective_key] = result
                             except Exception as e:
                                 st.error(f"Failed: {e}")
@@ -0,0 +1,185 @@
+"""
+Headless batch generation for seeding the episode catalogue.
+
+Runs the full pipeline plus TTS for a list of topics on a bounded pool of
+concurrent workers, saving each episode through database.save_speech /
+save_audio under a single owner account.
+
+Re-running the same command is idempotent: topics that already have a saved
+episode with audio are skipped, a saved episode without audio only gets its
+audio, and an interrupted generation resumes from its pipeline checkpoints
+(each topic gets a deterministic run id).
+
+Usage:
+    python batch.py --featured
+    python batch.py --topics-file my_topics.txt --workers 6 --length "15 min"
+    python batch.py --catalogue --limit 50 --report seed_report.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from database import (
+    get_or_create_user,
+    get_speech,
+    get_speech_by_topic,
+    save_audio,
+    save_speech,
+)
+from exporter import generate_audio
+from pipeline import run_full_pipeline_async
+from prompts import EPISODE_LENGTHS
+from topics import FEATURED_TOPICS, get_all_topics
+
+DEFAULT_OWNER_EMAIL = os.getenv("BATCH_OWNER_EMAIL", "canon@mindcast.local")
+
+
+def _read_topics_file(path: str) -> list[str]:
+    """One topic per line; blank lines and lines starting with '#' are ignored."""
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.strip().startswith("#")]
+
+
+def _run_id(owner_id: int, topic: str, length: str) -> str:
+    digest = hashlib.sha256(f"{owner_id}:{length}:{topic}".encode("utf-8")).hexdigest()
+    return f"batch-{digest[:32]}"
+
+
+def _usage_tokens(data: dict) -> int:
+    usage = data.get("usage") or {}
+    return (
+        usage.get("input_tokens", 0)
+        + usage.get("cached_input_tokens", 0)
+        + usage.get("cache_write_tokens", 0)
+        + usage.get("output_tokens", 0)
+    )
+
+
+async def _generate_episode(topic: str, owner_id: int, args, stats: dict) -> str:
+    """Generate (or finish) one episode. Returns the outcome label."""
+    existing = await asyncio.to_thread(get_speech_by_topic, owner_id, topic)
+    if existing and (existing["has_audio"] or args.no_audio):
+        return "skipped"
+
+    if existing:
+        speech_id = existing["id"]
+        speech = await asyncio.to_thread(get_speech, speech_id, owner_id)
+        final_text = speech["final_text"]
+    else:
+        steps = []
+        final_text = None
+        async for step_name, step_type, data in run_full_pipeline_async(
+            topic, args.length, run_id=_run_id(owner_id, topic, args.length), user_id=owner_id,
+            budget=args.budget,
+        ):
+            if data.get("status") in ("done", "skipped") or step_type == "done":
+                steps.append((step_name, step_type, data))
+                stats["tokens"] += _usage_tokens(data)
+                stats["cost_usd"] += (data.get("usage") or {}).get("cost_usd", 0.0)
+            if step_type == "done":
+                final_text = data["final_text"]
+        speech_id = await asyncio.to_thread(save_speech, owner_id, topic, final_text, steps)
+
+    if not args.no_audio:
+        audio_bytes = await asyncio.to_thread(generate_audio, final_text, voice=args.voice, speed=1.0)
+        await asyncio.to_thread(save_audio, speech_id, owner_id, audio_bytes, args.voice)
+
+    return "completed" if not existing else "audio_only"
+
+
+async def run_batch(topics: list[str], args) -> dict:
+    """Generate every topic with at most args.workers episodes in flight. Returns a report."""
+    owner = get_or_create_user(args.owner_email, "MindCast Catalogue", provider="system")
+    semaphore = asyncio.Semaphore(args.workers)
+    stats = {
+        "topics": len(topics),
+        "completed": 0,
+        "audio_only": 0,
+        "skipped": 0,
+        "failed": [],
+        "tokens": 0,
+        "cost_usd": 0.0,
+    }
+    started = time.perf_counter()
+    finished = 0
+
+    async def _worker(topic: str):
+        nonlocal finished
+        async with semaphore:
+            episode_started = time.perf_counter()
+            try:
+                outcome = await _generate_episode(topic, owner["id"], args, stats)
+                stats[outcome] += 1
+            except Exception as e:
+                outcome = "failed"
+                stats["failed"].append({"topic": topic, "error": str(e)})
+            finished += 1
+            elapsed = time.perf_counter() - episode_started
+            print(f"[{finished}/{len(topics)}] {outcome:<10} {elapsed:7.1f}s  {topic}", flush=True)
+
+    await asyncio.gather(*(_worker(t) for t in topics))
+
+    wall_seconds = time.perf_counter() - started
+    generated = stats["completed"] + stats["audio_only"]
+    stats["wall_seconds"] = round(wall_seconds, 1)
+    stats["cost_usd"] = round(stats["cost_usd"], 4)
+    stats["episodes_per_hour"] = round(generated / wall_seconds * 3600, 2) if wall_seconds else 0.0
+    return stats
+
+
+def _parse_args(argv: list[str]):
+    parser = argparse.ArgumentParser(description="Batch-generate MindCast episodes for a topic list.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--topics-file", help="Text file with one topic per line")
+    source.add_argument("--featured", action="store_true", help="Use topics.FEATURED_TOPICS")
+    source.add_argument("--catalogue", action="store_true", help="Use every topic in topics.txt")
+    parser.add_argument("--limit", type=int, help="Only the first N topics")
+    parser.add_argument("--length", default="10 min", choices=list(EPISODE_LENGTHS))
+    parser.add_argument("--budget", type=float, help="Per-episode pipeline budget in seconds")
+    parser.add_argument("--voice", default="onyx", help="TTS voice (default: onyx)")
+    parser.add_argument("--no-audio", action="store_true", help="Skip TTS")
+    parser.add_argument("--workers", type=int, default=4, help="Episodes generated concurrently")
+    parser.add_argument("--owner-email", default=DEFAULT_OWNER_EMAIL, help="Account that owns the episodes")
+    parser.add_argument("--report", help="Write the JSON report to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(sys.argv[1:] if argv is None else argv)
+
+    if args.topics_file:
+        topics = _read_topics_file(args.topics_file)
+    elif args.featured:
+        topics = list(FEATURED_TOPICS)
+    else:
+        topics = get_all_topics()
+    topics = list(dict.fromkeys(topics))  # de-duplicate, keep order
+    if args.limit:
+        topics = topics[:args.limit]
+
+    print(f"Generating {len(topics)} episodes ({args.length}) with {args.workers} workers...", flush=True)
+    report = asyncio.run(run_batch(topics, args))
+
+    print(
+        f"\nDone in {report['wall_seconds']}s: {report['completed']} generated, "
+        f"{report['audio_only']} audio-only, {report['skipped']} skipped, "
+        f"{len(report['failed'])} failed"
+    )
+    print(f"Throughput: {report['episodes_per_hour']} episodes/hour · Tokens: {report['tokens']:,} · Cost: ${report['cost_usd']:.2f}")
+    for failure in report["failed"]:
+        print(f"  FAILED  {failure['topic']}: {failure['error']}")
+
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
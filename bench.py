@@ -0,0 +1,180 @@
+"""
+Offline benchmarks for the episode pipeline, on the record/replay LLM backend
+(see cassettes.py). No API calls are made except by `record`.
+
+    python bench.py record                     # one live run; saves cassettes
+    python bench.py run                        # replay the recorded cassettes
+    python bench.py run --synthetic            # no cassettes: synthetic responses
+    python bench.py run --scale 0.05 --concurrency 1,4,16 --episodes 5
+
+Measures:
+  - orchestration overhead: wall time per episode with zero provider latency
+  - stage gaps: time spent between stages with provider latency switched on
+  - concurrency: throughput and speedup of K episodes sharing one event loop
+  - memory: tracemalloc peak per concurrency level
+
+Results are printed and appended to bench_output.txt. Runs use a throwaway
+database, no response cache and no opening history, so every replay sends
+byte-identical requests.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Must be set before the pipeline modules are imported
+os.environ["LLM_CACHE_DISABLED"] = "1"
+for _provider in ("ANTHROPIC", "OPENAI"):
+    os.environ.setdefault(f"RATE_LIMIT_{_provider}_RPM", "1000000000")
+    os.environ.setdefault(f"RATE_LIMIT_{_provider}_TPM", "1000000000")
+
+import cassettes  # noqa: E402
+import clients  # noqa: E402
+import database  # noqa: E402
+import pipeline  # noqa: E402
+from topics import FEATURED_TOPICS  # noqa: E402
+
+OUTPUT_FILE = Path(__file__).parent / "bench_output.txt"
+
+
+def _isolate(workdir: Path):
+    """Point the pipeline at a scratch database and freeze the opening history."""
+    database.DB_PATH = workdir / "bench.db"
+    database.init_db()
+    # The differentiation history changes draft prompts after every episode,
+    # which would make recorded requests unrepeatable.
+    pipeline._save_opening = lambda text, user_id=None: None
+
+
+async def _episode(topic: str, length: str, stream: bool) -> dict:
+    started = time.perf_counter()
+    stage_seconds = 0.0
+    final_text = None
+    async for _, step_type, data in pipeline.run_full_pipeline_async(
+        topic, length, stream=stream, run_id=uuid.uuid4().hex
+    ):
+        if data.get("status") == "done" and "metrics" in data:
+            stage_seconds += data["metrics"]["seconds"]
+        if step_type == "done":
+            final_text = data["final_text"]
+    wall = time.perf_counter() - started
+    return {"wall": wall, "stage_seconds": stage_seconds, "final_text": final_text}
+
+
+async def _recorded_episode(topic: str, length: str) -> dict:
+    try:
+        return await _episode(topic, length, stream=False)
+    finally:
+        await clients.aclose_loop_clients()
+
+
+async def _concurrent(k: int, topic: str, length: str, stream: bool) -> tuple[float, int]:
+    """Run k episodes on the running loop. Returns (wall seconds, tracemalloc peak bytes)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(_episode(topic, length, stream) for _ in range(k)))
+    wall = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return wall, peak
+
+
+def _p95(values: list[float]) -> float:
+    return sorted(values)[max(0, round(0.95 * len(values)) - 1)]
+
+
+def run_benchmarks(args) -> list[str]:
+    lines = []
+
+    def report(line: str = ""):
+        print(line, flush=True)
+        lines.append(line)
+
+    report(
+        f"bench {datetime.now(timezone.utc).isoformat(timespec='seconds')} · backend={cassettes.MODE} · "
+        f"topic={args.topic!r} · length={args.length} · stream={args.stream}"
+    )
+
+    # 1. Orchestration overhead: provider latency switched off
+    cassettes.configure(scale=0)
+    overhead = [asyncio.run(_episode(args.topic, args.length, args.stream)) for _ in range(args.episodes)]
+    walls = [e["wall"] * 1000 for e in overhead]
+    report(
+        f"overhead   per episode (zero latency): mean {statistics.mean(walls):.1f} ms · "
+        f"p95 {_p95(walls):.1f} ms · n={len(walls)}"
+    )
+    texts = {e["final_text"] for e in overhead}
+    report(f"determinism   identical final text across replays: {len(texts) == 1}")
+
+    # 2. Stage gaps: time outside stage calls with latency on
+    cassettes.configure(scale=args.scale)
+    single = asyncio.run(_episode(args.topic, args.length, args.stream))
+    gap = single["wall"] - single["stage_seconds"]
+    report(
+        f"stages     episode {single['wall']:.2f} s at latency x{args.scale} · "
+        f"in stages {single['stage_seconds']:.2f} s · between stages {gap * 1000:.1f} ms"
+    )
+
+    # 3 + 4. Concurrency and memory
+    baseline = None
+    for k in args.concurrency:
+        wall, peak = asyncio.run(_concurrent(k, args.topic, args.length, args.stream))
+        baseline = baseline or wall / k
+        speedup = baseline * k / wall
+        report(
+            f"concurrency k={k:<3} wall {wall:6.2f} s · {k / wall * 60:7.1f} episodes/min · "
+            f"speedup {speedup:5.1f}x ({speedup / k:.0%} of ideal) · "
+            f"peak mem {peak / 1e6:6.1f} MB ({peak / 1e6 / k:.1f} MB/episode)"
+        )
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmarks on recorded LLM cassettes.")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--topic", default=FEATURED_TOPICS[0])
+    parser.add_argument("--length", default="10 min", choices=list(pipeline.EPISODE_LENGTHS))
+    parser.add_argument("--cassettes", help="Cassette directory (default: LLM_CASSETTE_DIR or ./cassettes)")
+    parser.add_argument("--synthetic", action="store_true", help="Use synthetic responses instead of cassettes")
+    parser.add_argument("--stream", action="store_true", help="Stream enhancement stages, as the app does")
+    parser.add_argument("--scale", type=float, default=0.05, help="Multiplier on recorded latency (default 0.05)")
+    parser.add_argument("--episodes", type=int, default=3, help="Episodes for the overhead measurement")
+    parser.add_argument(
+        "--concurrency", default="1,4,16",
+        type=lambda v: [int(k) for k in v.split(",")],
+        help="Comma-separated episode counts to run concurrently",
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    with tempfile.TemporaryDirectory(prefix="mindcast-bench-") as workdir:
+        _isolate(Path(workdir))
+
+        if args.command == "record":
+            cassettes.configure(mode="record", directory=args.cassettes)
+            print(f"Recording one live episode into {cassettes.CASSETTE_DIR} ...", flush=True)
+            episode = asyncio.run(_recorded_episode(args.topic, args.length))
+            print(f"Recorded in {episode['wall']:.1f} s.")
+            return 0
+
+        cassettes.configure(mode="synthetic" if args.synthetic else "replay", directory=args.cassettes)
+        try:
+            lines = run_benchmarks(args)
+        except cassettes.CassetteMissError as e:
+            print(f"{e}\nRun `python bench.py record --topic ... --length ...` with the same arguments first.")
+            return 1
+
+    with OUTPUT_FILE.open("a", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Cooperative cancellation for long-running generation work.
+
+Whoever starts the work (the app, a batch job) creates a CancelToken and passes
+it down; cancel() may be called from any thread. Work checks the token between
+steps and registers callbacks that abort whatever is in flight:
+
+  - async code awaits through run_cancellable(), so a cancel cancels the task
+    and the provider request it is waiting on
+  - thread pools cancel the futures that haven't started
+  - polling loops sleep with token.wait() and stop at the next poll
+
+Requests already running on a plain thread can't be interrupted; their results
+are discarded.
+"""
+
+import asyncio
+import threading
+from typing import Callable
+
+
+class Cancelled(RuntimeError):
+    """
+    Work was stopped through its CancelToken.
+
+    partial holds whatever finished before the stop, when the caller has
+    something useful to return (e.g. the video clips already rendered).
+    """
+
+    def __init__(self, reason: str = "cancelled", partial=None):
+        super().__init__(f"Generation stopped ({reason}).")
+        self.reason = reason
+        self.partial = partial
+
+
+class CancelToken:
+    """A thread-safe, one-way cancel flag with callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.reason: str | None = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled"):
+        """Cancel the work and run the registered callbacks. Later calls are no-ops."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def raise_if_cancelled(self, partial=None):
+        if self._event.is_set():
+            raise Cancelled(self.reason, partial)
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to timeout seconds, waking early on cancel. Returns True if cancelled."""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Run callback once when the token is cancelled (right away if it already
+        is). Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def remove():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+
+                return remove
+        callback()
+        return lambda: None
+
+
+async def run_cancellable(awaitable, cancel: CancelToken | None):
+    """
+    Await awaitable in its own task, cancelling the task (and any request it
+    has in flight) as soon as cancel is cancelled. Raises Cancelled then.
+    """
+    if cancel is None:
+        return await awaitable
+
+    async def _run():
+        return await awaitable
+
+    task = asyncio.ensure_future(_run())
+    loop = asyncio.get_running_loop()
+    remove = cancel.on_cancel(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if cancel.cancelled and task.cancelled():
+            raise Cancelled(cancel.reason) from None
+        raise
+    finally:
+        remove()
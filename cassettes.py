@@ -0,0 +1,232 @@
+"""
+Record/replay backend for LLM calls.
+
+Sits under pipeline._call_llm (below the response cache and the rate limiter),
+so every provider call — pipeline stages, add-ons, lens analyses, video shot
+prompts — goes through it:
+
+    live       call the provider (default)
+    record     call the provider and save each request/response as a cassette
+    replay     serve responses from cassettes, never touching the network
+    synthetic  serve deterministic placeholder text, no cassettes needed
+
+A cassette is one JSON file per request, named by a SHA-256 of the request
+(provider, model, prompts, temperature, max_tokens). It keeps the response text,
+the normalized token usage and the recorded latency / time to first token.
+
+Replay and synthetic calls sleep to imitate provider latency:
+    LLM_REPLAY_LATENCY   "recorded" (default) or a fixed number of seconds per call
+    LLM_REPLAY_SCALE     multiplier on that latency (0 = as fast as possible)
+
+Configure via env vars (LLM_BACKEND, LLM_CASSETTE_DIR) or configure().
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+MODES = ("live", "record", "replay", "synthetic")
+
+MODE = os.getenv("LLM_BACKEND", "live").lower()
+CASSETTE_DIR = Path(os.getenv("LLM_CASSETTE_DIR", str(Path(__file__).parent / "cassettes")))
+REPLAY_LATENCY = os.getenv("LLM_REPLAY_LATENCY", "recorded")
+REPLAY_SCALE = float(os.getenv("LLM_REPLAY_SCALE", "1.0"))
+
+CHUNK_CHARS = 24  # size of replayed stream chunks
+SYNTHETIC_WORDS = 1500
+SYNTHETIC_SECONDS = 2.0  # latency of a synthetic call when LLM_REPLAY_LATENCY is "recorded"
+
+
+class CassetteMissError(RuntimeError):
+    """Replay mode found no cassette for a request."""
+
+
+def configure(
+    mode: str | None = None,
+    directory: str | Path | None = None,
+    latency: str | float | None = None,
+    scale: float | None = None,
+):
+    """Change the backend at runtime (e.g. from a benchmark script)."""
+    global MODE, CASSETTE_DIR, REPLAY_LATENCY, REPLAY_SCALE
+    if mode is not None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM backend: {mode} (expected one of {', '.join(MODES)})")
+        MODE = mode
+    if directory is not None:
+        CASSETTE_DIR = Path(directory)
+    if latency is not None:
+        REPLAY_LATENCY = str(latency)
+    if scale is not None:
+        REPLAY_SCALE = scale
+
+
+def request_key(request: dict) -> str:
+    """Hash a full request description into a cassette name."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _path(request: dict) -> Path:
+    return CASSETTE_DIR / f"{request_key(request)}.json"
+
+
+def load(request: dict) -> dict:
+    """Return the cassette recorded for request. Raises CassetteMissError if there is none."""
+    path = _path(request)
+    if not path.exists():
+        raise CassetteMissError(
+            f"No cassette for this {request['provider']} request in {CASSETTE_DIR}. "
+            "Record it first with LLM_BACKEND=record."
+        )
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save(request: dict, response: str, usage: list[dict], seconds: float, ttft: float | None = None):
+    """Write a cassette atomically (concurrent recordings of one request keep the last)."""
+    CASSETTE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(request)
+    cassette = {
+        "request": request,
+        "response": response,
+        "usage": usage,
+        "seconds": round(seconds, 3),
+        "ttft": round(ttft, 3) if ttft is not None else None,
+        "recorded_at": time.time(),
+    }
+    tmp = path.with_suffix(f".{os.getpid()}.{random.getrandbits(32):08x}.tmp")
+    tmp.write_text(json.dumps(cassette, ensure_ascii=False, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _synthetic(request: dict) -> dict:
+    """A deterministic stand-in response, sized like a full script."""
+    seed = request_key(request)
+    rng = random.Random(seed)
+    words = [rng.choice(("the", "mind", "memory", "habit", "signal", "story", "study", "brain",
+                         "practice", "attention", "pattern", "change", "evidence", "moment"))
+             for _ in range(SYNTHETIC_WORDS)]
+    sentences = [" ".join(words[i:i + 15]).capitalize() + "." for i in range(0, len(words), 15)]
+    paragraphs = ["\n".join(sentences[i:i + 6]) for i in range(0, len(sentences), 6)]
+    # Stop at the request's output budget, as the provider would
+    text = ("WINNER: A\n\n" + "\n\n".join(paragraphs))[:request["max_tokens"] * 4]
+    return {
+        "response": text,
+        "usage": [{
+            "provider": request["provider"],
+            "model": request["model"],
+            "input_tokens": len(request["user_content"]) // 4,
+            "cached_input_tokens": len(request.get("context") or "") // 4,
+            "cache_write_tokens": 0,
+            "output_tokens": len(text) // 4,
+            "llm_cache_hit": False,
+        }],
+        "seconds": SYNTHETIC_SECONDS,
+        "ttft": SYNTHETIC_SECONDS / 10,
+    }
+
+
+def _canned(request: dict) -> dict:
+    return _synthetic(request) if MODE == "synthetic" else load(request)
+
+
+def _latency(cassette: dict) -> tuple[float, float]:
+    """(total seconds, seconds to first chunk) to imitate for a replayed call."""
+    if REPLAY_LATENCY == "recorded":
+        seconds = cassette["seconds"]
+        ttft = cassette["ttft"] if cassette["ttft"] is not None else seconds / 10
+    else:
+        seconds = float(REPLAY_LATENCY)
+        ttft = seconds / 10
+    return seconds * REPLAY_SCALE, min(ttft, seconds) * REPLAY_SCALE
+
+
+def _chunks(text: str) -> list[str]:
+    return [text[i:i + CHUNK_CHARS] for i in range(0, len(text), CHUNK_CHARS)]
+
+
+# ──────────────────────────────────────────────
+# Backend entry points (called by pipeline._call_llm and friends)
+# ──────────────────────────────────────────────
+def call(request: dict, live, usage: list) -> str:
+    """
+    Run one blocking completion on the active backend.
+
+    `live()` performs the real provider call and appends its usage entry to
+    `usage`; replayed calls append the recorded usage instead.
+    """
+    if MODE == "live":
+        return live()
+    if MODE == "record":
+        started = time.perf_counter()
+        before = len(usage)
+        text = live()
+        save(request, text, usage[before:], time.perf_counter() - started)
+        return text
+
+    cassette = _canned(request)
+    seconds, _ = _latency(cassette)
+    if seconds > 0:
+        time.sleep(seconds)
+    usage.extend(dict(entry) for entry in cassette["usage"])
+    return cassette["response"]
+
+
+async def call_async(request: dict, live, usage: list) -> str:
+    """Async counterpart of call; `live()` returns an awaitable."""
+    if MODE == "live":
+        return await live()
+    if MODE == "record":
+        started = time.perf_counter()
+        before = len(usage)
+        text = await live()
+        save(request, text, usage[before:], time.perf_counter() - started)
+        return text
+
+    cassette = _canned(request)
+    seconds, _ = _latency(cassette)
+    if seconds > 0:
+        await asyncio.sleep(seconds)
+    usage.extend(dict(entry) for entry in cassette["usage"])
+    return cassette["response"]
+
+
+async def stream_async(request: dict, live, usage: list):
+    """
+    Streaming counterpart of call_async: `live()` returns an async iterator of
+    text chunks. Replay paces the chunks to the recorded time to first chunk
+    and total latency.
+    """
+    if MODE == "live":
+        async for chunk in live():
+            yield chunk
+        return
+
+    if MODE == "record":
+        started = time.perf_counter()
+        before = len(usage)
+        parts = []
+        ttft = None
+        async for chunk in live():
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(chunk)
+            yield chunk
+        save(request, "".join(parts), usage[before:], time.perf_counter() - started, ttft)
+        return
+
+    cassette = _canned(request)
+    seconds, ttft = _latency(cassette)
+    chunks = _chunks(cassette["response"])
+    gap = (seconds - ttft) / max(len(chunks) - 1, 1)
+    if ttft > 0:
+        await asyncio.sleep(ttft)
+    for i, chunk in enumerate(chunks):
+        if i and gap > 0:
+            await asyncio.sleep(gap)
+        yield chunk
+    usage.extend(dict(entry) for entry in cassette["usage"])
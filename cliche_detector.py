@@ -0,0 +1,78 @@
+"""
+Stock AI phrase detection.
+
+A curated list of phrases that mark machine-written prose (the patterns the
+De-AI stage is told to eliminate) compiled into one case-insensitive regex, so
+a whole script is scanned in a single pass without a model call. Each match is
+reported with its span and the numbered paragraph ([P1], [P2], ... as in
+script_patch.number_paragraphs) it falls in.
+
+Used by draft_scorer to rank drafts and by the pipeline to skip the De-AI stage
+on clean scripts or point it at the flagged paragraphs (see pipeline.DEAI_GATE).
+"""
+
+import re
+
+from script_patch import split_paragraphs
+
+# Matched case-insensitively, at a word boundary
+AI_CLICHES = [
+    r"in today'?s (fast-paced |modern |digital )?world",
+    r"have you ever wondered",
+    r"let'?s dive in(to)?",
+    r"dive deep(er)? into",
+    r"delve into",
+    r"it'?s worth noting",
+    r"interestingly enough",
+    r"one might argue",
+    r"that being said",
+    r"in conclusion",
+    r"at the end of the day",
+    r"a testament to",
+    r"tapestry",
+    r"navigat(e|ing) the complexities",
+    r"in the realm of",
+    r"unlock(ing)? the (secrets|power|potential)",
+    r"plays a (crucial|vital|pivotal) role",
+    r"(moreover|furthermore|additionally),",
+    r"not just .{1,40}, but",
+    r"embark on a journey",
+    r"ever-evolving",
+    r"fascinating (world|journey)",
+    r"this is (important|significant) because",
+    r"what makes this (so )?(significant|remarkable|important) is",
+    r"on (the )?one hand",
+]
+CLICHE_RE = re.compile(r"\b(" + "|".join(AI_CLICHES) + r")", re.IGNORECASE)
+
+
+def find_cliches(text: str) -> list[dict]:
+    """Every stock phrase in text, in order: [{start, end, phrase}]."""
+    return [
+        {"start": m.start(), "end": m.end(), "phrase": m.group(0)}
+        for m in CLICHE_RE.finditer(text)
+    ]
+
+
+def scan_script(text: str) -> dict:
+    """
+    Scan a script paragraph by paragraph.
+
+    Returns {"hits": int, "words": int, "density": hits per 1000 words,
+    "paragraphs": {paragraph number (1-based): [phrases]}}; only paragraphs
+    with a match are listed.
+    """
+    paragraphs = {}
+    hits = 0
+    for n, paragraph in enumerate(split_paragraphs(text), 1):
+        phrases = [m.group(0) for m in CLICHE_RE.finditer(paragraph)]
+        if phrases:
+            paragraphs[n] = phrases
+            hits += len(phrases)
+    words = len(text.split())
+    return {
+        "hits": hits,
+        "words": words,
+        "density": round(hits * 1000 / max(words, 1), 2),
+        "paragraphs": paragraphs,
+    }
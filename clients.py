@@ -0,0 +1,240 @@
+"""
+Process-wide registry of long-lived provider clients.
+
+Building an SDK client per request means a fresh connection pool and TLS
+handshake for every LLM, TTS or video call. Clients here are created once per
+process (async clients once per event loop, since their connections are bound
+to it) and shared by pipeline.py, exporter.py and video.py.
+
+Sync code runs async work on one shared, long-lived event loop (run_sync), so
+the async clients bound to it, and their open connections, outlive a single
+episode and can be warmed up ahead of the first one.
+
+LLM clients are built with max_retries=0: retries and backoff for LLM and TTS
+calls are owned by rate_limit.py, which coordinates them across sessions.
+
+Pool tuning via env vars:
+    PROVIDER_MAX_CONNECTIONS     connections per client pool (default 20)
+    PROVIDER_KEEPALIVE           idle keep-alive connections kept open (default 10)
+    PROVIDER_KEEPALIVE_EXPIRY    seconds an idle connection is kept (default 90)
+    PROVIDER_CONNECT_TIMEOUT     connect timeout in seconds (default 10)
+    PROVIDER_TIMEOUT             read/write timeout in seconds (default 600)
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+
+import anthropic
+import httpx
+import openai
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MAX_CONNECTIONS = int(os.getenv("PROVIDER_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("PROVIDER_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_KEEPALIVE_EXPIRY", "90"))
+CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "600"))
+
+_lock = threading.Lock()
+_clients: dict = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+_keys_loaded = False
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _load_keys():
+    """Copy API keys from st.secrets (Streamlit Cloud) into env vars, once per process."""
+    global _keys_loaded
+    if _keys_loaded:
+        return
+    try:
+        import streamlit as st
+        for key in ("ANTHROPIC_API_KEY", "OPENAI_API_KEY"):
+            if key not in os.environ and key in st.secrets:
+                os.environ[key] = st.secrets[key]
+        if "LUMAAI_API_KEY" not in os.environ and "LUMA_API_KEY" in st.secrets:
+            os.environ["LUMAAI_API_KEY"] = st.secrets["LUMA_API_KEY"]
+    except Exception:
+        pass
+    if "LUMAAI_API_KEY" not in os.environ and os.getenv("LUMA_API_KEY"):
+        os.environ["LUMAAI_API_KEY"] = os.environ["LUMA_API_KEY"]
+    _keys_loaded = True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _get_or_create(name: str, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                _load_keys()
+                client = factory()
+                _clients[name] = client
+    return client
+
+
+# ──────────────────────────────────────────────
+# Sync clients (shared by every thread)
+# ──────────────────────────────────────────────
+def get_anthropic_client() -> anthropic.Anthropic:
+    return _get_or_create("anthropic", lambda: anthropic.Anthropic(
+        timeout=_timeout(),
+        max_retries=0,
+        http_client=anthropic.DefaultHttpxClient(limits=_limits(), timeout=_timeout()),
+    ))
+
+
+def get_openai_client() -> openai.OpenAI:
+    return _get_or_create("openai", lambda: openai.OpenAI(
+        timeout=_timeout(),
+        max_retries=0,
+        http_client=openai.DefaultHttpxClient(limits=_limits(), timeout=_timeout()),
+    ))
+
+
+def get_luma_client():
+    from lumaai import LumaAI
+    return _get_or_create("luma", lambda: LumaAI(
+        timeout=_timeout(),
+        http_client=httpx.Client(limits=_limits(), timeout=_timeout()),
+    ))
+
+
+def get_http_session() -> requests.Session:
+    """Pooled requests session for plain downloads (e.g. rendered video assets)."""
+    def _factory():
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=MAX_KEEPALIVE, pool_maxsize=MAX_CONNECTIONS
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    return _get_or_create("http", _factory)
+
+
+# ──────────────────────────────────────────────
+# Async clients (one set per event loop)
+# ──────────────────────────────────────────────
+def _loop_clients() -> dict:
+    loop = asyncio.get_running_loop()
+    with _lock:
+        return _async_clients.setdefault(loop, {})
+
+
+def get_async_anthropic_client() -> anthropic.AsyncAnthropic:
+    clients = _loop_clients()
+    if "anthropic" not in clients:
+        _load_keys()
+        clients["anthropic"] = anthropic.AsyncAnthropic(
+            timeout=_timeout(),
+            max_retries=0,
+            http_client=anthropic.DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout()),
+        )
+    return clients["anthropic"]
+
+
+def get_async_openai_client() -> openai.AsyncOpenAI:
+    clients = _loop_clients()
+    if "openai" not in clients:
+        _load_keys()
+        clients["openai"] = openai.AsyncOpenAI(
+            timeout=_timeout(),
+            max_retries=0,
+            http_client=openai.DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout()),
+        )
+    return clients["openai"]
+
+
+async def aclose_loop_clients():
+    """Close the async clients bound to the running loop (call before closing the loop)."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        await client.close()
+
+
+# ──────────────────────────────────────────────
+# Shared event loop
+# ──────────────────────────────────────────────
+def get_shared_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide event loop, running in a daemon thread (started on first use)."""
+    global _loop
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="provider-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro):
+    """
+    Run a coroutine on the shared loop and block until it finishes. Returns
+    its result or raises its exception; if the caller is interrupted, the
+    coroutine is cancelled.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, get_shared_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+# ──────────────────────────────────────────────
+# Warm-up
+# ──────────────────────────────────────────────
+def warm_up(background: bool = True):
+    """
+    Build the shared clients and open a keep-alive connection to each LLM
+    provider, so the first episode doesn't pay for DNS + TLS setup. Both the
+    sync clients and the async clients on the shared loop (which the pipeline
+    runs on) are warmed.
+
+    Failures (missing keys, no network) are ignored; the real call will report them.
+    """
+    async def _warm_async():
+        for build, ping in (
+            (get_async_anthropic_client, lambda c: c.models.list(limit=1)),
+            (get_async_openai_client, lambda c: c.models.list()),
+        ):
+            try:
+                await ping(build())
+            except Exception:
+                pass
+
+    def _warm():
+        for build, ping in (
+            (get_anthropic_client, lambda c: c.models.list(limit=1)),
+            (get_openai_client, lambda c: c.models.list()),
+        ):
+            try:
+                ping(build())
+            except Exception:
+                pass
+        run_sync(_warm_async())
+
+    if background:
+        threading.Thread(target=_warm, name="provider-warm-up", daemon=True).start()
+    else:
+        _warm()
@@ -3,15 +3,18 @@ SQLite database for users and saved speeches.
 """
 
 import json
+import math
 import sqlite3
+import time
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
 DB_PATH = Path(__file__).parent / "speeches.db"
 
 
-def _get_conn() -> sqlite3.Connection:
-    conn = sqlite3.connect(str(DB_PATH))
+def _get_conn(timeout: float = 5.0) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(DB_PATH), timeout=timeout)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
     conn.execute("PRAGMA foreign_keys=ON")
@@ -49,6 +52,140 @@ def init_db():
 
         CREATE INDEX IF NOT EXISTS idx_speeches_user ON speeches(user_id);
 
+        CREATE TABLE IF NOT EXISTS speech_addons (
+            speech_id INTEGER NOT NULL,
+            addon_key TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (speech_id, addon_key),
+            FOREIGN KEY (speech_id) REFERENCES speeches(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS speech_perspectives (
+            speech_id INTEGER NOT NULL,
+            lens_key TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (speech_id, lens_key),
+            FOREIGN KEY (speech_id) REFERENCES speeches(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS pipeline_runs (
+            run_id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            topic TEXT NOT NULL,
+            length TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            cancel_reason TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_pipeline_runs_user ON pipeline_runs(user_id, status);
+
+        CREATE TABLE IF NOT EXISTS generation_jobs (
+            job_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            topic TEXT NOT NULL,
+            length TEXT NOT NULL,
+            voice TEXT NOT NULL,
+            run_id TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            cancel_requested INTEGER NOT NULL DEFAULT 0,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_expires_at REAL,
+            available_at REAL,
+            heartbeat_at TEXT,
+            progress_json TEXT,
+            speech_id INTEGER,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            updated_at TEXT NOT NULL,
+            finished_at TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs(status, created_at);
+        CREATE INDEX IF NOT EXISTS idx_generation_jobs_user ON generation_jobs(user_id, created_at);
+
+        CREATE TABLE IF NOT EXISTS pipeline_checkpoints (
+            run_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            step_name TEXT NOT NULL,
+            step_type TEXT NOT NULL,
+            data_json TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (run_id, step_name),
+            FOREIGN KEY (run_id) REFERENCES pipeline_runs(run_id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS speech_openings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            opening TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_speech_openings_user ON speech_openings(user_id, id);
+
+        CREATE TABLE IF NOT EXISTS research_briefs (
+            topic_key TEXT NOT NULL,
+            length TEXT NOT NULL,
+            prompt_hash TEXT NOT NULL,
+            topic TEXT NOT NULL,
+            brief TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            generations INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (topic_key, length, prompt_hash)
+        );
+
+        CREATE TABLE IF NOT EXISTS stage_latencies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stage_key TEXT NOT NULL,
+            length TEXT NOT NULL,
+            seconds REAL NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_stage_latencies_key ON stage_latencies(length, stage_key);
+
+        CREATE TABLE IF NOT EXISTS llm_call_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            speech_id INTEGER NOT NULL,
+            stage TEXT NOT NULL,
+            step_type TEXT NOT NULL,
+            provider TEXT NOT NULL,
+            model TEXT NOT NULL,
+            seconds REAL,
+            ttft REAL,
+            input_tokens INTEGER NOT NULL DEFAULT 0,
+            cached_input_tokens INTEGER NOT NULL DEFAULT 0,
+            cache_write_tokens INTEGER NOT NULL DEFAULT 0,
+            output_tokens INTEGER NOT NULL DEFAULT 0,
+            retries INTEGER NOT NULL DEFAULT 0,
+            llm_cache_hit INTEGER NOT NULL DEFAULT 0,
+            cost_usd REAL NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_llm_call_metrics_speech ON llm_call_metrics(speech_id);
+        CREATE INDEX IF NOT EXISTS idx_llm_call_metrics_stage ON llm_call_metrics(step_type, stage);
+
+        CREATE TABLE IF NOT EXISTS judge_agreement (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            length TEXT NOT NULL,
+            drafts INTEGER NOT NULL,
+            heuristic_winner INTEGER NOT NULL,
+            llm_winner INTEGER NOT NULL,
+            margin REAL NOT NULL,
+            created_at TEXT NOT NULL
+        );
+
         CREATE TABLE IF NOT EXISTS reflections (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -178,6 +315,14 @@ def update_subscription_status(user_id: int, status: str):
 def save_speech(user_id: int, topic: str, final_text: str, stages: list) -> int:
     """Save a completed speech. Returns speech id."""
     conn = _get_conn()
+    speech_id = _insert_speech(conn, user_id, topic, final_text, stages)
+    conn.commit()
+    conn.close()
+    return speech_id
+
+
+def _insert_speech(conn: sqlite3.Connection, user_id: int, topic: str, final_text: str, stages: list) -> int:
+    """Insert a speech and its call metrics on conn, without committing. Returns speech id."""
     now = datetime.now(timezone.utc).isoformat()
     word_count = len(final_text.split()) if final_text else 0
 
@@ -192,12 +337,32 @@ def save_speech(user_id: int, topic: str, final_text: str, stages: list) -> int:
         "VALUES (?, ?, ?, ?, ?, ?)",
         (user_id, topic, final_text, stages_json, word_count, now),
     )
-    conn.commit()
     speech_id = cursor.lastrowid
-    conn.close()
+    _save_call_metrics(conn, speech_id, stages, now)
     return speech_id
 
 
+def _save_call_metrics(conn: sqlite3.Connection, speech_id: int, stages: list, now: str):
+    """Copy the per-call measurements in each stage's data["metrics"] into llm_call_metrics."""
+    rows = []
+    for name, step_type, data in stages:
+        for call in (data.get("metrics") or {}).get("calls", []):
+            rows.append((
+                speech_id, name, step_type, call["provider"], call["model"],
+                call.get("seconds"), call.get("ttft"),
+                call.get("input_tokens", 0), call.get("cached_input_tokens", 0),
+                call.get("cache_write_tokens", 0), call.get("output_tokens", 0),
+                call.get("retries", 0), int(bool(call.get("llm_cache_hit"))),
+                call.get("cost_usd", 0.0), now,
+            ))
+    conn.executemany(
+        "INSERT INTO llm_call_metrics (speech_id, stage, step_type, provider, model, seconds, ttft, "
+        "input_tokens, cached_input_tokens, cache_write_tokens, output_tokens, retries, "
+        "llm_cache_hit, cost_usd, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
 def get_user_speeches(user_id: int) -> list[dict]:
     """Get all speeches for a user, newest first."""
     conn = _get_conn()
@@ -236,6 +401,76 @@ def get_speech(speech_id: int, user_id: int) -> dict | None:
     return None
 
 
+def get_speech_by_topic(user_id: int, topic: str) -> dict | None:
+    """Get a user's newest speech on exactly this topic: {id, has_audio}. None if absent."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT id, audio_data IS NOT NULL AS has_audio FROM speeches "
+        "WHERE user_id = ? AND topic = ? ORDER BY created_at DESC LIMIT 1",
+        (user_id, topic),
+    ).fetchone()
+    conn.close()
+    if row:
+        return {"id": row["id"], "has_audio": bool(row["has_audio"])}
+    return None
+
+
+def get_episode_topics() -> list[dict]:
+    """
+    Every completed speech as {id, user_id, topic, has_audio, catalogue}, for the
+    topic similarity index. catalogue marks speeches owned by system accounts
+    (the shared catalogue seeded by batch.py).
+    """
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT s.id, s.user_id, s.topic, s.audio_data IS NOT NULL AS has_audio, "
+        "u.provider = 'system' AS catalogue "
+        "FROM speeches s JOIN users u ON u.id = s.user_id "
+        "WHERE s.final_text IS NOT NULL ORDER BY s.id",
+    ).fetchall()
+    conn.close()
+    return [
+        {**dict(r), "has_audio": bool(r["has_audio"]), "catalogue": bool(r["catalogue"])}
+        for r in rows
+    ]
+
+
+def get_speeches_version() -> tuple:
+    """Cheap fingerprint of the speeches table; changes on insert, delete or new audio."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT MAX(id) AS max_id, COUNT(*) AS n, COUNT(audio_data) AS with_audio FROM speeches"
+    ).fetchone()
+    conn.close()
+    return (row["max_id"], row["n"], row["with_audio"])
+
+
+def copy_speech(speech_id: int, to_user_id: int) -> int:
+    """Copy a speech (text, stages, audio, add-ons and lenses) into another user's library. Returns the new id."""
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    cursor = conn.execute(
+        "INSERT INTO speeches (user_id, topic, final_text, stages_json, word_count, audio_data, audio_voice, created_at) "
+        "SELECT ?, topic, final_text, stages_json, word_count, audio_data, audio_voice, ? "
+        "FROM speeches WHERE id = ?",
+        (to_user_id, now, speech_id),
+    )
+    new_id = cursor.lastrowid
+    conn.execute(
+        "INSERT INTO speech_addons (speech_id, addon_key, result, created_at) "
+        "SELECT ?, addon_key, result, created_at FROM speech_addons WHERE speech_id = ?",
+        (new_id, speech_id),
+    )
+    conn.execute(
+        "INSERT INTO speech_perspectives (speech_id, lens_key, result, created_at) "
+        "SELECT ?, lens_key, result, created_at FROM speech_perspectives WHERE speech_id = ?",
+        (new_id, speech_id),
+    )
+    conn.commit()
+    conn.close()
+    return new_id
+
+
 def save_audio(speech_id: int, user_id: int, audio_data: bytes, voice: str):
     """Save generated audio to an existing speech."""
     conn = _get_conn()
@@ -273,6 +508,641 @@ def delete_speech(speech_id: int, user_id: int) -> bool:
     return deleted
 
 
+# --- Learning add-ons and perspective lenses stored per speech ---
+
+def save_speech_addon(speech_id: int, addon_key: str, result: str):
+    """Store (or replace) a generated learning add-on for a speech."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO speech_addons (speech_id, addon_key, result, created_at) VALUES (?, ?, ?, ?)",
+        (speech_id, addon_key, result, datetime.now(timezone.utc).isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_speech_addons(speech_id: int, user_id: int) -> dict[str, str]:
+    """Stored add-ons of a user's speech as {addon_key: result}."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT a.addon_key, a.result FROM speech_addons a JOIN speeches s ON s.id = a.speech_id "
+        "WHERE a.speech_id = ? AND s.user_id = ?",
+        (speech_id, user_id),
+    ).fetchall()
+    conn.close()
+    return {r["addon_key"]: r["result"] for r in rows}
+
+
+def save_speech_perspective(speech_id: int, lens_key: str, result: str):
+    """Store (or replace) one perspective lens analysis of a speech."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO speech_perspectives (speech_id, lens_key, result, created_at) VALUES (?, ?, ?, ?)",
+        (speech_id, lens_key, result, datetime.now(timezone.utc).isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_speech_perspectives(speech_id: int, user_id: int) -> dict[str, str]:
+    """Stored lens analyses of a user's speech as {lens_key: result}."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT p.lens_key, p.result FROM speech_perspectives p JOIN speeches s ON s.id = p.speech_id "
+        "WHERE p.speech_id = ? AND s.user_id = ?",
+        (speech_id, user_id),
+    ).fetchall()
+    conn.close()
+    return {r["lens_key"]: r["result"] for r in rows}
+
+
+# --- Pipeline run checkpoints ---
+
+def create_pipeline_run(run_id: str, topic: str, length: str, user_id: int | None = None):
+    """Register a pipeline run. No-op if the run already exists (resume)."""
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    conn.execute(
+        "INSERT OR IGNORE INTO pipeline_runs (run_id, user_id, topic, length, status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, 'running', ?, ?)",
+        (run_id, user_id, topic, length, now, now),
+    )
+    conn.commit()
+    conn.close()
+
+
+def save_pipeline_checkpoint(run_id: str, step_name: str, step_type: str, data: dict):
+    """Persist the output of a completed pipeline step."""
+    conn = _get_conn()
+    now = datetime.now(timezone.utc).isoformat()
+    row = conn.execute(
+        "SELECT COALESCE(MAX(seq), 0) AS seq FROM pipeline_checkpoints WHERE run_id = ?",
+        (run_id,),
+    ).fetchone()
+    conn.execute(
+        "INSERT OR REPLACE INTO pipeline_checkpoints (run_id, seq, step_name, step_type, data_json, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (run_id, row["seq"] + 1, step_name, step_type,
+         json.dumps(_sanitize_data(data), ensure_ascii=False), now),
+    )
+    conn.execute(
+        "UPDATE pipeline_runs SET updated_at = ? WHERE run_id = ?",
+        (now, run_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def update_pipeline_run_status(run_id: str, status: str, cancel_reason: str | None = None):
+    """Set run status: running, done, failed, or cancelled (with the CancelToken's reason)."""
+    conn = _get_conn()
+    conn.execute(
+        "UPDATE pipeline_runs SET status = ?, cancel_reason = ?, updated_at = ? WHERE run_id = ?",
+        (status, cancel_reason, datetime.now(timezone.utc).isoformat(), run_id),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_pipeline_run(run_id: str) -> dict | None:
+    """Get a run with its checkpoints in completion order. Returns None if not found."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT * FROM pipeline_runs WHERE run_id = ?", (run_id,)
+    ).fetchone()
+    if not row:
+        conn.close()
+        return None
+    checkpoints = conn.execute(
+        "SELECT step_name, step_type, data_json FROM pipeline_checkpoints "
+        "WHERE run_id = ? ORDER BY seq",
+        (run_id,),
+    ).fetchall()
+    conn.close()
+    result = dict(row)
+    result["checkpoints"] = [
+        {"name": c["step_name"], "type": c["step_type"], "data": json.loads(c["data_json"])}
+        for c in checkpoints
+    ]
+    return result
+
+
+def get_resumable_runs(user_id: int, max_age_hours: int = 24, stale_minutes: int = 10) -> list[dict]:
+    """
+    Get a user's interrupted runs from the last max_age_hours, newest first:
+    failed runs, cancelled runs with at least one checkpoint (stopped, rerun
+    or navigated away from), and runs still marked running that haven't
+    checkpointed for stale_minutes (their process died). Runs checkpointing
+    right now are still in progress, so they aren't offered, and neither are
+    runs a worker dropped after losing its lease (another worker carries on).
+    """
+    from datetime import timedelta
+    now = datetime.now(timezone.utc)
+    since = (now - timedelta(hours=max_age_hours)).isoformat()
+    stale = (now - timedelta(minutes=stale_minutes)).isoformat()
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT run_id, topic, length, status, updated_at FROM pipeline_runs r "
+        "WHERE user_id = ? AND updated_at > ? AND (status = 'failed' "
+        "OR (status = 'cancelled' AND IFNULL(cancel_reason, '') != 'lease lost' AND EXISTS (SELECT 1 FROM pipeline_checkpoints c WHERE c.run_id = r.run_id)) "
+        "OR (status = 'running' AND updated_at < ?)) "
+        "ORDER BY updated_at DESC",
+        (user_id, since, stale),
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+# --- Generation jobs (see worker.py) ---
+#
+# A worker claims a job with a lease (lease_expires_at, epoch seconds) and keeps
+# extending it with heartbeats. A job whose lease runs out (its worker crashed or
+# lost the database) goes back to the queue at the next claim, until it has used
+# max_attempts; then, like a job that keeps failing, it is dead-lettered
+# (status 'dead'). Every update made on a worker's behalf checks that the worker
+# still holds the job, so a worker that lost its lease can't overwrite the new
+# owner's progress.
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+# Seconds to wait for the write lock. Every worker process (on every host) takes
+# it with BEGIN IMMEDIATE to claim jobs, so it can be busy for a while; the
+# default 5 s would surface as "database is locked".
+JOB_DB_TIMEOUT = 30.0
+
+
+def _job_dict(row) -> dict:
+    job = dict(row)
+    job["progress"] = json.loads(job.pop("progress_json") or "{}")
+    return job
+
+
+def enqueue_job(user_id: int, topic: str, length: str, voice: str, run_id: str | None = None) -> str:
+    """
+    Queue an episode for a background worker. Returns the job id.
+
+    run_id is the pipeline run to checkpoint under; pass an interrupted run's id
+    to resume it. Defaults to the job id.
+    """
+    job_id = uuid.uuid4().hex
+    now = datetime.now(timezone.utc).isoformat()
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    conn.execute(
+        "INSERT INTO generation_jobs (job_id, user_id, topic, length, voice, run_id, status, created_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+        (job_id, user_id, topic, length, voice, run_id or job_id, now, now),
+    )
+    conn.commit()
+    conn.close()
+    return job_id
+
+
+def claim_job(worker: str, lease_seconds: float, max_attempts: int) -> dict | None:
+    """
+    Atomically take the oldest available queued job for worker, leased for
+    lease_seconds. Expired leases are recovered first: their jobs are requeued,
+    or dead-lettered once they have used max_attempts.
+
+    Returns the job (attempts includes this one), or None if nothing is available.
+    """
+    now = time.time()
+    stamp = datetime.now(timezone.utc).isoformat()
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    # One write transaction: two workers can never recover or claim the same job
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute(
+        "UPDATE generation_jobs SET status = 'dead', worker = NULL, lease_expires_at = NULL, "
+        "error = 'Worker lost after ' || attempts || ' attempts', updated_at = ?, finished_at = ? "
+        "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+        (stamp, stamp, now, max_attempts),
+    )
+    conn.execute(
+        "UPDATE generation_jobs SET status = 'queued', worker = NULL, lease_expires_at = NULL, updated_at = ? "
+        "WHERE status = 'running' AND lease_expires_at < ?",
+        (stamp, now),
+    )
+    row = conn.execute(
+        "UPDATE generation_jobs SET status = 'running', worker = ?, attempts = attempts + 1, "
+        "lease_expires_at = ?, heartbeat_at = ?, started_at = COALESCE(started_at, ?), updated_at = ? "
+        "WHERE job_id = (SELECT job_id FROM generation_jobs WHERE status = 'queued' "
+        "AND (available_at IS NULL OR available_at <= ?) ORDER BY created_at LIMIT 1) RETURNING *",
+        (worker, now + lease_seconds, stamp, stamp, stamp, now),
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return _job_dict(row) if row else None
+
+
+def heartbeat_job(job_id: str, worker: str, lease_seconds: float) -> dict | None:
+    """
+    Extend worker's lease on a running job. Returns {"cancel_requested": bool},
+    or None if the worker no longer holds the job (its lease expired and the
+    job was requeued, or it was closed).
+    """
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    row = conn.execute(
+        "UPDATE generation_jobs SET lease_expires_at = ?, heartbeat_at = ? "
+        "WHERE job_id = ? AND worker = ? AND status = 'running' RETURNING cancel_requested",
+        (time.time() + lease_seconds, datetime.now(timezone.utc).isoformat(), job_id, worker),
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return {"cancel_requested": bool(row["cancel_requested"])} if row else None
+
+
+def update_job_progress(job_id: str, worker: str, progress: dict):
+    """Record how far a running job has got (shown by the app while it polls)."""
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    conn.execute(
+        "UPDATE generation_jobs SET progress_json = ?, updated_at = ? "
+        "WHERE job_id = ? AND worker = ? AND status = 'running'",
+        (json.dumps(progress, ensure_ascii=False), datetime.now(timezone.utc).isoformat(), job_id, worker),
+    )
+    conn.commit()
+    conn.close()
+
+
+def save_job_speech(job_id: str, worker: str, final_text: str, stages: list) -> int | None:
+    """
+    Save the job's episode and record it on the job in one transaction, so a
+    crash can never leave a saved speech the job doesn't know about (which a
+    retry would save again). If an earlier attempt already saved it, that
+    speech id is returned instead.
+
+    Returns the speech id, or None if worker no longer holds the job.
+    """
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    conn.execute("BEGIN IMMEDIATE")
+    job = conn.execute(
+        "SELECT user_id, topic, speech_id FROM generation_jobs WHERE job_id = ? AND worker = ? AND status = 'running'",
+        (job_id, worker),
+    ).fetchone()
+    if job is None or job["speech_id"]:
+        conn.rollback()
+        conn.close()
+        return job["speech_id"] if job else None
+    speech_id = _insert_speech(conn, job["user_id"], job["topic"], final_text, stages)
+    conn.execute(
+        "UPDATE generation_jobs SET speech_id = ?, updated_at = ? WHERE job_id = ?",
+        (speech_id, datetime.now(timezone.utc).isoformat(), job_id),
+    )
+    conn.commit()
+    conn.close()
+    return speech_id
+
+
+def finish_job(job_id: str, worker: str, status: str, error: str | None = None) -> bool:
+    """
+    Close worker's job as done or cancelled. Returns False if the worker no
+    longer holds it.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    cur = conn.execute(
+        "UPDATE generation_jobs SET status = ?, error = ?, lease_expires_at = NULL, updated_at = ?, finished_at = ? "
+        "WHERE job_id = ? AND worker = ? AND status = 'running'",
+        (status, error, now, now, job_id, worker),
+    )
+    conn.commit()
+    conn.close()
+    return cur.rowcount > 0
+
+
+def fail_job(job_id: str, worker: str, error: str, max_attempts: int, retry_delay: float) -> str | None:
+    """
+    Record a failed attempt. The job is queued again after retry_delay seconds,
+    doubling with each attempt, or dead-lettered once it has used max_attempts.
+    Returns the new status ("queued" or "dead"), or None if the worker no longer
+    holds the job.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    row = conn.execute(
+        "UPDATE generation_jobs SET "
+        "status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'queued' END, "
+        "available_at = ? + ? * (1 << (attempts - 1)), "
+        "finished_at = CASE WHEN attempts >= ? THEN ? END, "
+        "worker = NULL, lease_expires_at = NULL, error = ?, updated_at = ? "
+        "WHERE job_id = ? AND worker = ? AND status = 'running' RETURNING status",
+        (max_attempts, time.time(), retry_delay, max_attempts, now, error, now, job_id, worker),
+    ).fetchone()
+    conn.commit()
+    conn.close()
+    return row["status"] if row else None
+
+
+def release_job(job_id: str, worker: str):
+    """
+    Hand a running job back to the queue without using up an attempt (its
+    worker is shutting down). It resumes from its pipeline checkpoints.
+    """
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    conn.execute(
+        "UPDATE generation_jobs SET status = 'queued', worker = NULL, lease_expires_at = NULL, "
+        "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE job_id = ? AND worker = ? AND status = 'running'",
+        (datetime.now(timezone.utc).isoformat(), job_id, worker),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_job(job_id: str, user_id: int | None = None) -> dict | None:
+    """A job by id (only if owned by user_id, when given). Returns None if not found."""
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    row = conn.execute(
+        "SELECT * FROM generation_jobs WHERE job_id = ? AND (? IS NULL OR user_id = ?)",
+        (job_id, user_id, user_id),
+    ).fetchone()
+    conn.close()
+    return _job_dict(row) if row else None
+
+
+def get_active_jobs(user_id: int) -> list[dict]:
+    """A user's queued and running jobs, newest first."""
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    rows = conn.execute(
+        "SELECT * FROM generation_jobs WHERE user_id = ? AND status IN (?, ?) ORDER BY created_at DESC",
+        (user_id, *ACTIVE_JOB_STATUSES),
+    ).fetchall()
+    conn.close()
+    return [_job_dict(r) for r in rows]
+
+
+def get_job_counts() -> dict:
+    """Number of jobs per status, for watching the queue (e.g. dead-lettered jobs)."""
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    rows = conn.execute(
+        "SELECT status, COUNT(*) AS jobs FROM generation_jobs GROUP BY status"
+    ).fetchall()
+    conn.close()
+    return {r["status"]: r["jobs"] for r in rows}
+
+
+def request_job_cancel(job_id: str, user_id: int) -> bool:
+    """
+    Stop a user's job: a queued job is cancelled outright, a running one is
+    flagged for its worker to stop. Returns False if the job isn't active.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    cur = conn.execute(
+        "UPDATE generation_jobs SET status = 'cancelled', updated_at = ?, finished_at = ? "
+        "WHERE job_id = ? AND user_id = ? AND status = 'queued'",
+        (now, now, job_id, user_id),
+    )
+    if not cur.rowcount:
+        cur = conn.execute(
+            "UPDATE generation_jobs SET cancel_requested = 1, updated_at = ? "
+            "WHERE job_id = ? AND user_id = ? AND status = 'running'",
+            (now, job_id, user_id),
+        )
+    conn.commit()
+    conn.close()
+    return cur.rowcount > 0
+
+
+def is_job_cancel_requested(job_id: str) -> bool:
+    conn = _get_conn(JOB_DB_TIMEOUT)
+    row = conn.execute(
+        "SELECT cancel_requested FROM generation_jobs WHERE job_id = ?", (job_id,)
+    ).fetchone()
+    conn.close()
+    return bool(row and row["cancel_requested"])
+
+
+# --- Speech openings (draft differentiation history) ---
+
+def get_speech_openings(user_id: int | None, limit: int = 20) -> list[str]:
+    """A user's most recent speech openings, oldest first. user_id None is the shared anonymous history."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT opening FROM speech_openings WHERE user_id IS ? ORDER BY id DESC LIMIT ?",
+        (user_id, limit),
+    ).fetchall()
+    conn.close()
+    return [r["opening"] for r in reversed(rows)]
+
+
+def add_speech_opening(user_id: int | None, opening: str, keep: int = 20) -> list[str]:
+    """
+    Append an opening to the user's ring buffer and drop all but the newest
+    `keep`, in one transaction. Returns the buffer after the write, oldest first.
+    """
+    conn = _get_conn()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO speech_openings (user_id, opening, created_at) VALUES (?, ?, ?)",
+            (user_id, opening, datetime.now(timezone.utc).isoformat()),
+        )
+        conn.execute(
+            "DELETE FROM speech_openings WHERE user_id IS ? AND id NOT IN ("
+            "SELECT id FROM speech_openings WHERE user_id IS ? ORDER BY id DESC LIMIT ?)",
+            (user_id, user_id, keep),
+        )
+        rows = conn.execute(
+            "SELECT opening FROM speech_openings WHERE user_id IS ? ORDER BY id",
+            (user_id,),
+        ).fetchall()
+    conn.close()
+    return [r["opening"] for r in rows]
+
+
+# --- Research briefs (shared across users, see pipeline.run_research_cached_async) ---
+
+def get_research_brief(topic_key: str, length: str, prompt_hash: str, max_age_seconds: float) -> dict | None:
+    """
+    The stored research brief for a normalized topic and length, counting a hit,
+    or None if there is none younger than max_age_seconds.
+    Returns {topic, brief, created_at, hits}.
+    """
+    now = time.time()
+    conn = _get_conn()
+    with conn:
+        row = conn.execute(
+            "SELECT topic, brief, created_at, hits FROM research_briefs "
+            "WHERE topic_key = ? AND length = ? AND prompt_hash = ? AND created_at >= ?",
+            (topic_key, length, prompt_hash, now - max_age_seconds),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE research_briefs SET hits = hits + 1 WHERE topic_key = ? AND length = ? AND prompt_hash = ?",
+                (topic_key, length, prompt_hash),
+            )
+    conn.close()
+    if not row:
+        return None
+    brief = dict(row)
+    brief["hits"] += 1
+    return brief
+
+
+def save_research_brief(topic_key: str, length: str, prompt_hash: str, topic: str, brief: str):
+    """Store a freshly generated brief, replacing any expired one (hit counts carry over)."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT INTO research_briefs (topic_key, length, prompt_hash, topic, brief, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (topic_key, length, prompt_hash) DO UPDATE SET "
+        "topic = excluded.topic, brief = excluded.brief, created_at = excluded.created_at, "
+        "generations = generations + 1",
+        (topic_key, length, prompt_hash, topic, brief, time.time()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_research_cache_stats() -> dict:
+    """Lifetime lookups served from the research cache: {entries, hits, misses, hit_rate}."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT COUNT(*) AS entries, COALESCE(SUM(hits), 0) AS hits, "
+        "COALESCE(SUM(generations), 0) AS misses FROM research_briefs"
+    ).fetchone()
+    conn.close()
+    stats = dict(row)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+    return stats
+
+
+# --- Stage latencies (latency-budget planning) ---
+
+def record_stage_latency(stage_key: str, length: str, seconds: float):
+    """Record how long one pipeline stage took (e.g. "drafts", "enhancement:2")."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT INTO stage_latencies (stage_key, length, seconds, created_at) VALUES (?, ?, ?, ?)",
+        (stage_key, length, seconds, datetime.now(timezone.utc).isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_stage_latencies(length: str, window: int = 20) -> dict[str, float]:
+    """Median latency in seconds per stage key over its last `window` runs at this length."""
+    from statistics import median
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT stage_key, seconds FROM stage_latencies WHERE length = ? ORDER BY id DESC",
+        (length,),
+    ).fetchall()
+    conn.close()
+    samples: dict[str, list[float]] = {}
+    for r in rows:
+        recent = samples.setdefault(r["stage_key"], [])
+        if len(recent) < window:
+            recent.append(r["seconds"])
+    return {key: median(values) for key, values in samples.items()}
+
+
+# --- LLM call metrics (latency, tokens, cost) ---
+
+def _percentile(values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of values (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def get_stage_latency_stats(days: int = 30) -> list[dict]:
+    """
+    Per-stage latency over the last `days` days, from llm_call_metrics. Returns
+    [{stage, step_type, calls, p50, p95, ttft_p50, ttft_p95, retries, cost_usd}],
+    slowest p95 first. Cache hits are excluded from the latency figures.
+    """
+    from datetime import timedelta
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT stage, step_type, seconds, ttft, retries, cost_usd, llm_cache_hit "
+        "FROM llm_call_metrics WHERE created_at > ?",
+        (since,),
+    ).fetchall()
+    conn.close()
+
+    groups: dict[tuple[str, str], list] = {}
+    for r in rows:
+        groups.setdefault((r["stage"], r["step_type"]), []).append(r)
+
+    stats = []
+    for (stage, step_type), calls in groups.items():
+        live = [c for c in calls if not c["llm_cache_hit"]]
+        seconds = [c["seconds"] for c in live if c["seconds"] is not None]
+        ttfts = [c["ttft"] for c in live if c["ttft"] is not None]
+        stats.append({
+            "stage": stage,
+            "step_type": step_type,
+            "calls": len(calls),
+            "p50": _percentile(seconds, 50),
+            "p95": _percentile(seconds, 95),
+            "ttft_p50": _percentile(ttfts, 50),
+            "ttft_p95": _percentile(ttfts, 95),
+            "retries": sum(c["retries"] for c in calls),
+            "cost_usd": round(sum(c["cost_usd"] for c in calls), 4),
+        })
+    stats.sort(key=lambda s: s["p95"] or 0, reverse=True)
+    return stats
+
+
+def get_episode_costs(limit: int = 50) -> list[dict]:
+    """Cost, tokens and summed LLM time per saved episode, newest first."""
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT m.speech_id, s.topic, s.created_at, COUNT(*) AS calls, "
+        "SUM(m.input_tokens) AS input_tokens, SUM(m.cached_input_tokens) AS cached_input_tokens, "
+        "SUM(m.cache_write_tokens) AS cache_write_tokens, SUM(m.output_tokens) AS output_tokens, "
+        "SUM(m.retries) AS retries, SUM(m.seconds) AS llm_seconds, SUM(m.cost_usd) AS cost_usd "
+        "FROM llm_call_metrics m LEFT JOIN speeches s ON s.id = m.speech_id "
+        "GROUP BY m.speech_id ORDER BY m.speech_id DESC LIMIT ?",
+        (limit,),
+    ).fetchall()
+    conn.close()
+    return [dict(r) for r in rows]
+
+
+# --- Judge agreement (tuning the heuristic draft scorer) ---
+
+def record_judge_agreement(length: str, drafts: int, heuristic_winner: int, llm_winner: int, margin: float):
+    """Log the heuristic scorer's pick next to the LLM judge's for the same drafts."""
+    conn = _get_conn()
+    conn.execute(
+        "INSERT INTO judge_agreement (length, drafts, heuristic_winner, llm_winner, margin, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (length, drafts, heuristic_winner, llm_winner, margin, datetime.now(timezone.utc).isoformat()),
+    )
+    conn.commit()
+    conn.close()
+
+
+def get_judge_agreement(days: int = 30, bucket: float = 5.0) -> list[dict]:
+    """
+    How often the heuristic scorer picked the LLM judge's winner, by score
+    margin. Returns [{margin_from, margin_to, judgments, agreement}] with
+    margins grouped into `bucket`-point bands, lowest first.
+    """
+    from datetime import timedelta
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    conn = _get_conn()
+    rows = conn.execute(
+        "SELECT CAST(margin / ? AS INTEGER) AS band, COUNT(*) AS judgments, "
+        "AVG(heuristic_winner = llm_winner) AS agreement "
+        "FROM judge_agreement WHERE created_at >= ? GROUP BY band ORDER BY band",
+        (bucket, since),
+    ).fetchall()
+    conn.close()
+    return [
+        {
+            "margin_from": r["band"] * bucket,
+            "margin_to": (r["band"] + 1) * bucket,
+            "judgments": r["judgments"],
+            "agreement": round(r["agreement"], 3),
+        }
+        for r in rows
+    ]
+
+
 def _sanitize_data(data: dict) -> dict:
     """Make stage data JSON-serializable."""
     clean = {}
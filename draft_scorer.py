@@ -0,0 +1,122 @@
+"""
+Fast local scoring of draft scripts.
+
+Scores a draft 0-100 from five signals that need no model call:
+
+    length       word count against the EPISODE_LENGTHS target range
+    readability  sentence length suited to listening (about 10-22 words)
+    repetition   share of repeated word trigrams
+    cliches      density of stock AI phrases per 1000 words (see cliche_detector.py)
+    structure    paragraphing, and no markdown headings/bullets in a spoken script
+
+The pipeline uses it to skip the LLM judge when one draft is clearly better
+(see pipeline.JUDGE_SKIP_MARGIN), and logs how often it agrees with the judge.
+"""
+
+import re
+
+from cliche_detector import CLICHE_RE
+from prompts import EPISODE_LENGTHS
+
+WEIGHTS = {
+    "length": 30,
+    "readability": 20,
+    "repetition": 15,
+    "cliches": 25,
+    "structure": 10,
+}
+
+IDEAL_SENTENCE_WORDS = (10, 22)
+CLICHES_PER_1000_FLOOR = 6  # at this density the cliché score reaches 0
+WORDS_PER_PARAGRAPH = (40, 220)
+
+_WORD = re.compile(r"[A-Za-z0-9']+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_MARKDOWN = re.compile(r"^\s*(#{1,6}\s|[-*•]\s|\d+\.\s)", re.MULTILINE)
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+def _length_score(words: int, length: str) -> float:
+    target = EPISODE_LENGTHS[length]
+    low, high = target["words_min"], target["words_max"]
+    if low <= words <= high:
+        return 1.0
+    # Lose all credit at 50% off the range
+    miss = (low - words) / low if words < low else (words - high) / high
+    return _clamp(1 - 2 * miss)
+
+
+def _readability_score(text: str, words: int) -> float:
+    sentences = [s for s in _SENTENCE_END.split(text.strip()) if _WORD.search(s)]
+    if not sentences:
+        return 0.0
+    average = words / len(sentences)
+    low, high = IDEAL_SENTENCE_WORDS
+    if low <= average <= high:
+        return 1.0
+    miss = (low - average) / low if average < low else (average - high) / high
+    return _clamp(1 - miss)
+
+
+def _repetition_score(tokens: list[str]) -> float:
+    trigrams = [tuple(tokens[i:i + 3]) for i in range(len(tokens) - 2)]
+    if not trigrams:
+        return 1.0
+    repeated = len(trigrams) - len(set(trigrams))
+    # 15% repeated trigrams or more scores 0
+    return _clamp(1 - (repeated / len(trigrams)) / 0.15)
+
+
+def _cliche_score(text: str, words: int) -> tuple[float, int]:
+    hits = len(CLICHE_RE.findall(text))
+    density = hits * 1000 / max(words, 1)
+    return _clamp(1 - density / CLICHES_PER_1000_FLOOR), hits
+
+
+def _structure_score(text: str, words: int) -> float:
+    paragraphs = [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+    average = words / max(len(paragraphs), 1)
+    low, high = WORDS_PER_PARAGRAPH
+    score = 1.0 if low <= average <= high else 0.5
+    markdown_lines = len(_MARKDOWN.findall(text))
+    return _clamp(score - 0.1 * markdown_lines)
+
+
+def score_draft(text: str, length: str = "10 min") -> dict:
+    """
+    Score one draft. Returns {"total": 0-100, "words": int, "cliche_hits": int,
+    <signal>: 0-1 for each key of WEIGHTS}.
+    """
+    tokens = [t.lower() for t in _WORD.findall(text)]
+    words = len(tokens)
+    cliches, cliche_hits = _cliche_score(text, words)
+    signals = {
+        "length": _length_score(words, length),
+        "readability": _readability_score(text, words),
+        "repetition": _repetition_score(tokens),
+        "cliches": cliches,
+        "structure": _structure_score(text, words),
+    }
+    total = sum(WEIGHTS[k] * v for k, v in signals.items())
+    return {
+        "total": round(total, 1),
+        "words": words,
+        "cliche_hits": cliche_hits,
+        **{k: round(v, 3) for k, v in signals.items()},
+    }
+
+
+def rank_drafts(drafts: list[dict], length: str = "10 min") -> dict:
+    """
+    Score every draft ({label, text}) and compare the best two.
+
+    Returns {"scores": [score dicts, in draft order], "best": index of the top
+    draft, "margin": its lead in points over the runner-up (0 for one draft)}.
+    """
+    scores = [score_draft(d["text"], length) for d in drafts]
+    order = sorted(range(len(scores)), key=lambda i: -scores[i]["total"])
+    margin = scores[order[0]]["total"] - scores[order[1]]["total"] if len(order) > 1 else 0.0
+    return {"scores": scores, "best": order[0], "margin": round(margin, 1)}
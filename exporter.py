@@ -3,25 +3,19 @@ Export functions for .txt, .docx, and audio (OpenAI TTS).
 """
 
 import io
-import os
 
-import openai
 from docx import Document
 from docx.shared import Pt
 from dotenv import load_dotenv
 
-load_dotenv()
+import rate_limit
+from cancellation import CancelToken
+from clients import get_openai_client
+from token_budget import estimate_tokens
 
+load_dotenv()
 
-def _get_openai_client():
-    """Lazy client init — works on Streamlit Cloud where secrets aren't in env."""
-    try:
-        import streamlit as st
-        if "OPENAI_API_KEY" not in os.environ and "OPENAI_API_KEY" in st.secrets:
-            os.environ["OPENAI_API_KEY"] = st.secrets["OPENAI_API_KEY"]
-    except Exception:
-        pass
-    return openai.OpenAI()
+TTS_MODEL = "tts-1-hd"
 
 
 def export_txt(text: str) -> str:
@@ -46,7 +40,9 @@ def export_docx(text: str, title: str) -> bytes:
     return buffer.getvalue()
 
 
-def generate_audio(text: str, voice: str = "onyx", speed: float = 1.0) -> bytes:
+def generate_audio(
+    text: str, voice: str = "onyx", speed: float = 1.0, cancel: CancelToken | None = None
+) -> bytes:
     """
     Generate documentary-style audio from text using OpenAI TTS.
 
@@ -57,6 +53,12 @@ def generate_audio(text: str, voice: str = "onyx", speed: float = 1.0) -> bytes:
     Voices: alloy, ash, ballad, coral, echo, fable, onyx, nova, sage, shimmer
     Speed: 0.25 to 4.0 (1.0 = normal)
 
+    Each chunk request goes through rate_limit.call_with_retries (the shared
+    client doesn't retry on its own), so a transient error or 429 is retried
+    with backoff rather than failing the whole episode's audio.
+
+    If cancel is cancelled, no further chunk is sent and Cancelled is raised.
+
     Returns MP3 bytes.
     """
     # Lazy import: pydub uses audioop which was removed in Python 3.13
@@ -67,12 +69,19 @@ def generate_audio(text: str, voice: str = "onyx", speed: float = 1.0) -> bytes:
     # Generate audio for each chunk
     audio_segments = []
     for chunk in chunks:
-        response = _get_openai_client().audio.speech.create(
-            model="tts-1-hd",
-            voice=voice,
-            input=chunk,
-            speed=speed,
-            response_format="mp3",
+        if cancel:
+            cancel.raise_if_cancelled()
+        response = rate_limit.call_with_retries(
+            "openai",
+            TTS_MODEL,
+            estimate_tokens(chunk),
+            lambda: get_openai_client().audio.speech.create(
+                model=TTS_MODEL,
+                voice=voice,
+                input=chunk,
+                speed=speed,
+                response_format="mp3",
+            ),
         )
         # Load MP3 bytes into pydub AudioSegment
         segment = AudioSegment.from_mp3(io.BytesIO(response.content))
@@ -0,0 +1,160 @@
+"""
+Content-addressed on-disk cache for LLM responses.
+
+Every completion is stored under a SHA-256 of the full request (provider, model,
+system prompt, user content, temperature, max_tokens), so byte-identical calls —
+re-runs, retries after a UI crash, add-ons on the same transcript — are served
+from disk instead of the provider.
+
+Entries live in a small SQLite file next to speeches.db. Eviction is LRU by
+last use, bounded both by total size (LLM_CACHE_MAX_MB) and by age
+(LLM_CACHE_MAX_AGE_DAYS). Set LLM_CACHE_DISABLED=1 to turn the cache off.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(Path(__file__).parent / "llm_cache.db")))
+MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024
+MAX_AGE_SECONDS = int(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30")) * 86400
+ENABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+
+def _get_conn() -> sqlite3.Connection:
+    conn = sqlite3.connect(str(CACHE_PATH), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def init_cache():
+    """Create the cache table if it doesn't exist."""
+    conn = _get_conn()
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS llm_responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used_at);
+    """)
+    conn.commit()
+    conn.close()
+
+
+def _count(name: str, n: int = 1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+def make_key(**request) -> str:
+    """Hash a full request description into a cache key."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get(key: str) -> str | None:
+    """Return the cached response for key, or None on a miss (expired entries miss)."""
+    if not ENABLED:
+        return None
+    now = time.time()
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT response, created_at FROM llm_responses WHERE key = ?", (key,)
+    ).fetchone()
+    if row and now - row["created_at"] <= MAX_AGE_SECONDS:
+        conn.execute(
+            "UPDATE llm_responses SET last_used_at = ?, hits = hits + 1 WHERE key = ?",
+            (now, key),
+        )
+        conn.commit()
+        conn.close()
+        _count("hits")
+        return row["response"]
+    conn.close()
+    _count("misses")
+    return None
+
+
+def put(key: str, response: str):
+    """Store a response and evict whatever falls outside the size/age limits."""
+    if not ENABLED or response is None:
+        return
+    now = time.time()
+    size = len(response.encode("utf-8"))
+    conn = _get_conn()
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_responses (key, response, size, created_at, last_used_at, hits) "
+        "VALUES (?, ?, ?, ?, ?, 0)",
+        (key, response, size, now, now),
+    )
+    _count("writes")
+    _evict(conn, now)
+    conn.commit()
+    conn.close()
+
+
+def _evict(conn: sqlite3.Connection, now: float):
+    """Drop expired entries, then least-recently-used ones until under MAX_BYTES."""
+    cursor = conn.execute(
+        "DELETE FROM llm_responses WHERE created_at < ?", (now - MAX_AGE_SECONDS,)
+    )
+    evicted = cursor.rowcount
+
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) AS total FROM llm_responses").fetchone()["total"]
+    if total > MAX_BYTES:
+        rows = conn.execute(
+            "SELECT key, size FROM llm_responses ORDER BY last_used_at ASC"
+        ).fetchall()
+        stale = []
+        for row in rows:
+            if total <= MAX_BYTES:
+                break
+            stale.append((row["key"],))
+            total -= row["size"]
+        conn.executemany("DELETE FROM llm_responses WHERE key = ?", stale)
+        evicted += len(stale)
+
+    if evicted:
+        _count("evictions", evicted)
+
+
+def stats() -> dict:
+    """Hit/miss counters for this process plus current on-disk footprint."""
+    with _stats_lock:
+        counters = dict(_stats)
+    lookups = counters["hits"] + counters["misses"]
+    counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes FROM llm_responses"
+    ).fetchone()
+    conn.close()
+    counters["entries"] = row["entries"]
+    counters["bytes"] = row["bytes"]
+    return counters
+
+
+def clear():
+    """Remove every cached response."""
+    conn = _get_conn()
+    conn.execute("DELETE FROM llm_responses")
+    conn.commit()
+    conn.close()
+
+
+# Initialize on import
+init_cache()
@@ -2,37 +2,96 @@
 Core pipeline engine (optimized for quality).
 
 Flow:
-  1. Stage 0: Research gathering (Anthropic)
-  2. Stage 1: 2 parallel drafts (Sonnet + GPT-4o)
-  3. Judge: Pick best draft + note strengths from loser
+  1. Stage 0: Research gathering (Anthropic), reused from the shared research
+     cache when a fresh brief exists for the same topic and length
+  2. Stage 1: 2 parallel drafts (Sonnet + GPT-4o), optionally hedged with spare
+     variants and a deadline (see DRAFT_HEDGE_EXTRA)
+  3. Judge: Pick best draft + note strengths from loser, or take the local
+     draft scorer's pick when it has a clear lead (see JUDGE_SKIP_MARGIN)
   4. Stages 2-5: Four enhancement stages with critique before each:
      - Stage 2: Deep Enhancement (artistic + academic depth)
-     - Stage 3: De-AI & Voice Authenticity (strip LLM patterns)
+     - Stage 3: De-AI & Voice Authenticity (strip LLM patterns), optionally
+       gated by a local phrase scan (see DEAI_GATE)
      - Stage 4: Oral Delivery Optimization (breath, rhythm, flow)
-     - Stage 5: Final Polish (line-by-line refinement)
+     - Stage 5: Final Polish (line-by-line refinement), optionally as concurrent
+       paragraph windows on long scripts (see POLISH_WINDOW_WORDS)
+     Stages listed in ENHANCEMENT_PATCH_STAGES return paragraph edits instead of
+     the whole script (see script_patch.py), falling back to a full rewrite.
   5. Save opening paragraph for future differentiation
 
 Each enhancement stage receives: topic, research brief, critique feedback, previous output.
+
+The orchestration lives in `run_full_pipeline_async`, an async iterator built on
+the async Anthropic/OpenAI clients so one event loop can drive many episodes at
+once. `run_full_pipeline` is the synchronous generator the Streamlit app uses; it
+drives the async engine on the shared event loop and yields the same events.
+
+Given a run_id, every completed step is checkpointed in the database and
+`resume_pipeline(run_id)` continues an interrupted run from its last finished step.
+A CancelToken (see cancellation.py) stops a run part-way: the step in flight is
+aborted, no further stage is scheduled, and the run is marked "cancelled".
 """
 
-import json
+import asyncio
 import os
+import random
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
 
 import anthropic
 import openai
 from dotenv import load_dotenv
 
+import cassettes
+from cancellation import Cancelled, CancelToken, run_cancellable
+import clients
+import llm_cache
+import rate_limit
+import token_budget
+from cliche_detector import scan_script
+from draft_scorer import rank_drafts
+from script_patch import PatchError, number_paragraphs, patch_script, split_paragraphs
+from script_windows import clean_window, make_windows, stitch
+from database import (
+    add_speech_opening,
+    create_pipeline_run,
+    get_pipeline_run,
+    get_research_brief,
+    get_research_cache_stats,
+    get_speech_addons,
+    get_speech_openings,
+    get_speech_perspectives,
+    get_stage_latencies,
+    record_judge_agreement,
+    record_stage_latency,
+    save_pipeline_checkpoint,
+    save_research_brief,
+    save_speech_addon,
+    save_speech_perspective,
+    update_pipeline_run_status,
+)
+
 from prompts import (
     CRITIQUE_TEMPLATE,
+    DEAI_FLAGGED_NOTE,
     DIFFERENTIATION_CONTEXT,
     DRAFT_VARIANTS,
     ENHANCEMENT_STAGES,
+    EPISODE_LENGTHS,
+    HEDGE_DRAFT_VARIANTS,
     JUDGE_PROMPT,
     LEARNING_ADDONS,
+    MERGED_CRITIQUE_NOTE,
+    PATCH_MODE_INSTRUCTIONS,
     PERSPECTIVE_LENSES,
+    PERSPECTIVE_SYNTHESIS_PROMPT,
+    POLISH_POSITION_NOTES,
+    POLISH_WINDOW_TEMPLATE,
+    RESEARCH_CONTEXT,
     get_combined_lens_prompt,
     get_draft_stage,
     get_research_stage,
@@ -41,94 +100,590 @@ from prompts import (
 load_dotenv()
 
 
-def _init_keys():
-    """Load API keys from st.secrets (Streamlit Cloud) into env vars."""
-    try:
-        import streamlit as st
-        for key in ("ANTHROPIC_API_KEY", "OPENAI_API_KEY"):
-            if key not in os.environ and key in st.secrets:
-                os.environ[key] = st.secrets[key]
-    except Exception:
-        pass
+DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
+DEFAULT_OPENAI_MODEL = "gpt-4o-2024-11-20"
+MAX_TOKENS = 16384
 
+# List prices in USD per million tokens, for per-episode cost reporting
+MODEL_PRICING = {
+    "claude-sonnet-4-20250514": {
+        "input_tokens": 3.00,
+        "cached_input_tokens": 0.30,
+        "cache_write_tokens": 3.75,
+        "output_tokens": 15.00,
+    },
+    "gpt-4o-2024-11-20": {
+        "input_tokens": 2.50,
+        "cached_input_tokens": 1.25,
+        "cache_write_tokens": 2.50,
+        "output_tokens": 10.00,
+    },
+}
+
+# Hedged drafts: launch spare variants and judge whichever drafts finish first.
+#   DRAFT_HEDGE_EXTRA       spare variants from HEDGE_DRAFT_VARIANTS (default 0 = off)
+#   DRAFT_FIRST_K           judge the first K drafts to finish (default: all primary variants)
+#   DRAFT_DEADLINE_SECONDS  once one draft is in, stop waiting after this long (default 0 = no deadline)
+DRAFT_HEDGE_EXTRA = int(os.getenv("DRAFT_HEDGE_EXTRA", "0"))
+DRAFT_FIRST_K = int(os.getenv("DRAFT_FIRST_K", "0"))
+DRAFT_DEADLINE_SECONDS = float(os.getenv("DRAFT_DEADLINE_SECONDS", "0"))
+MAX_JUDGED_DRAFTS = 3  # JUDGE_PROMPT has templates for 2 and 3 drafts
+
+# Patch mode: enhancement stages listed here return paragraph edits instead of
+# re-emitting the whole script (see script_patch.py). A patch that can't be
+# parsed or applied falls back to a full rewrite.
+#   ENHANCEMENT_PATCH_STAGES   comma-separated stage indexes 0-3, or "all" (default: none)
+def _patch_stages(value: str) -> set[int]:
+    value = value.strip().lower()
+    if value == "all":
+        return set(range(len(ENHANCEMENT_STAGES)))
+    return {int(v) for v in value.split(",") if v.strip()}
+
+
+ENHANCEMENT_PATCH_STAGES = _patch_stages(os.getenv("ENHANCEMENT_PATCH_STAGES", ""))
+
+# Windowed Final Polish: split the script into paragraph windows and polish them
+# concurrently (see script_windows.py). Only used when it yields 2+ windows.
+#   POLISH_WINDOW_WORDS   target words per window (default 0 = off; ~500 suits 15-20 min episodes)
+#   POLISH_CONCURRENCY    windows polished at once (default 4)
+POLISH_WINDOW_WORDS = int(os.getenv("POLISH_WINDOW_WORDS", "0"))
+POLISH_CONCURRENCY = int(os.getenv("POLISH_CONCURRENCY", "4"))
+POLISH_STAGE_INDEX = 3  # Stage 5: Final Polish
+
+# De-AI gate: before Stage 3 the script is scanned for stock AI phrases (see
+# cliche_detector.py). A clean script skips the stage and its critique; in
+# "flagged" mode any other script gets the stage in patch mode, pointed at the
+# flagged paragraphs.
+#   DEAI_GATE            "off" (default), "skip" or "flagged"
+#   DEAI_CLEAN_DENSITY   phrases per 1000 words at or below which a script is clean (default 0)
+DEAI_GATE = os.getenv("DEAI_GATE", "off").strip().lower()
+DEAI_CLEAN_DENSITY = float(os.getenv("DEAI_CLEAN_DENSITY", "0"))
+DEAI_STAGE_INDEX = 1  # Stage 3: De-AI & Voice Authenticity
+
+# Heuristic judging: drafts are scored locally (see draft_scorer.py) and when the
+# best one leads the runner-up by JUDGE_SKIP_MARGIN points it wins without a
+# judge call. A JUDGE_SHADOW_RATE share of those judgments still goes to the LLM
+# judge (whose verdict is used), so agreement keeps being measured at the margins
+# that are skipped. Every LLM judgment is logged in judge_agreement.
+#   JUDGE_SKIP_MARGIN   score lead (0-100 scale) that skips the judge (default 0 = never skip)
+#   JUDGE_SHADOW_RATE   share of skippable judgments still sent to the judge (default 0.1)
+JUDGE_SKIP_MARGIN = float(os.getenv("JUDGE_SKIP_MARGIN", "0"))
+JUDGE_SHADOW_RATE = float(os.getenv("JUDGE_SHADOW_RATE", "0.1"))
+
+# Research briefs depend only on the topic and length, so they are stored and
+# shared across users and runs, keyed by the topic with case and whitespace
+# folded. (Not topic_index.normalize_topic: it drops question words and word
+# order, so "why X causes Y" and "how Y causes X" would share a brief.)
+#   RESEARCH_CACHE_TTL_HOURS   how long a stored brief is reused (default 168 = 7 days, 0 = off)
+RESEARCH_CACHE_TTL_HOURS = float(os.getenv("RESEARCH_CACHE_TTL_HOURS", "168"))
+
+# Previous speech openings, fed to the drafts for differentiation. Each user has
+# a ring buffer of the last HISTORY_SIZE openings in the database. It is re-read
+# for every episode (one indexed query), since worker processes on other hosts
+# add to it too.
+HISTORY_SIZE = 20
+
+
+def _load_history(user_id: int | None = None) -> list[str]:
+    return get_speech_openings(user_id, HISTORY_SIZE)
+
+
+def _save_opening(text: str, user_id: int | None = None):
+    # Store first 300 chars as the "opening paragraph"
+    opening = text[:300].strip()
+    add_speech_opening(user_id, opening, keep=HISTORY_SIZE)
 
-def _get_anthropic_client():
-    _init_keys()
-    return anthropic.Anthropic()
 
+# ──────────────────────────────────────────────
+# Token usage reporting
+# ──────────────────────────────────────────────
+_usage_collector: ContextVar[list | None] = ContextVar("_usage_collector", default=None)
 
-def _get_openai_client():
-    _init_keys()
-    return openai.OpenAI()
 
+@contextmanager
+def collect_usage():
+    """
+    Collect one usage entry per LLM call made while the block runs:
+        {"provider", "model", "input_tokens", "cached_input_tokens",
+         "cache_write_tokens", "output_tokens", "llm_cache_hit",
+         "seconds", "ttft", "retries", "cost_usd", "max_tokens",
+         "prompt_tokens_condensed"}
+
+    input_tokens counts uncached prompt tokens only; cached_input_tokens are
+    provider prompt-cache reads.
+    """
+    calls = []
+    token = _usage_collector.set(calls)
+    try:
+        yield calls
+    finally:
+        _usage_collector.reset(token)
+
+
+def _record_usage(provider: str, model: str, usage=None, llm_cache_hit: bool = False, calls: list | None = None):
+    """Normalize an SDK usage object and append it to the active collector (or `calls`)."""
+    target = calls if calls is not None else _usage_collector.get()
+    if target is None:
+        return
+
+    entry = {
+        "provider": provider,
+        "model": model,
+        "input_tokens": 0,
+        "cached_input_tokens": 0,
+        "cache_write_tokens": 0,
+        "output_tokens": 0,
+        "llm_cache_hit": llm_cache_hit,
+    }
+    if usage is not None:
+        if provider == "openai":
+            details = getattr(usage, "prompt_tokens_details", None)
+            cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+            entry["input_tokens"] = (usage.prompt_tokens or 0) - cached
+            entry["cached_input_tokens"] = cached
+            entry["output_tokens"] = usage.completion_tokens or 0
+        else:
+            entry["input_tokens"] = usage.input_tokens or 0
+            entry["cached_input_tokens"] = getattr(usage, "cache_read_input_tokens", 0) or 0
+            entry["cache_write_tokens"] = getattr(usage, "cache_creation_input_tokens", 0) or 0
+            entry["output_tokens"] = usage.output_tokens or 0
+    target.append(entry)
+
+
+def _estimate_cost(entry: dict) -> float:
+    """USD cost of one usage entry at MODEL_PRICING list prices (0 for unknown models)."""
+    prices = MODEL_PRICING.get(entry["model"])
+    if not prices:
+        return 0.0
+    return round(sum(entry[field] * prices[field] for field in prices) / 1_000_000, 6)
+
+
+def _record_call_metrics(
+    entries: list[dict],
+    started: float,
+    retries: int = 0,
+    ttft: float | None = None,
+    calls: list | None = None,
+    max_tokens: int | None = None,
+    trimmed: int = 0,
+):
+    """
+    Complete the usage entries of one _call_llm call with timing, retries,
+    cost and token budget, then hand them to the active collector (or `calls`).
 
-DEFAULT_ANTHROPIC_MODEL = "claude-sonnet-4-20250514"
-DEFAULT_OPENAI_MODEL = "gpt-4o-2024-11-20"
-MAX_TOKENS = 16384
+    ttft is only known for streamed calls; a blocking call has no first token
+    before the whole response arrives, so it is left as None. `trimmed` is the
+    estimated number of prompt tokens condensed away to fit the context window.
+    """
+    target = calls if calls is not None else _usage_collector.get()
+    seconds = round(time.perf_counter() - started, 3)
+    for entry in entries:
+        entry["seconds"] = seconds
+        entry["ttft"] = round(ttft, 3) if ttft is not None else None
+        entry["retries"] = retries
+        entry["cost_usd"] = _estimate_cost(entry)
+        entry["max_tokens"] = max_tokens
+        entry["prompt_tokens_condensed"] = trimmed
+        if target is not None:
+            target.append(entry)
+
+
+def summarize_usage(calls: list[dict]) -> dict:
+    """Sum usage entries into a per-stage report."""
+    summary = {
+        "calls": len(calls),
+        "input_tokens": sum(c["input_tokens"] for c in calls),
+        "cached_input_tokens": sum(c["cached_input_tokens"] for c in calls),
+        "cache_write_tokens": sum(c["cache_write_tokens"] for c in calls),
+        "output_tokens": sum(c["output_tokens"] for c in calls),
+        "llm_cache_hits": sum(1 for c in calls if c["llm_cache_hit"]),
+        "retries": sum(c.get("retries", 0) for c in calls),
+        "cost_usd": round(sum(c.get("cost_usd", 0.0) for c in calls), 6),
+        "max_tokens": max((c.get("max_tokens") or 0 for c in calls), default=0),
+        # Calls whose output ran into max_tokens (likely cut off)
+        "capped_calls": sum(
+            1 for c in calls
+            if c.get("max_tokens") and not c["llm_cache_hit"] and c["output_tokens"] >= c["max_tokens"]
+        ),
+        "prompt_tokens_condensed": sum(c.get("prompt_tokens_condensed", 0) for c in calls),
+    }
+    prompt_tokens = summary["input_tokens"] + summary["cached_input_tokens"] + summary["cache_write_tokens"]
+    summary["cached_input_ratio"] = (
+        round(summary["cached_input_tokens"] / prompt_tokens, 3) if prompt_tokens else 0.0
+    )
+    return summary
 
-# File to store previous speech openings for differentiation
-HISTORY_FILE = Path(__file__).parent / "speech_history.json"
 
+def _stage_metrics(calls: list[dict], seconds: float) -> dict:
+    """Stage event fields: summed usage, plus the stage wall time and per-call measurements."""
+    return {
+        "usage": summarize_usage(calls),
+        "metrics": {"seconds": round(seconds, 3), "calls": calls},
+    }
 
-def _load_history() -> list[str]:
-    if HISTORY_FILE.exists():
-        try:
-            data = json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
-            return data.get("openings", [])
-        except (json.JSONDecodeError, KeyError):
-            return []
-    return []
+
+# ──────────────────────────────────────────────
+# Provider calls
+# ──────────────────────────────────────────────
+def _anthropic_system(system: str, context: str | None):
+    """
+    Anthropic system blocks. A shared context (e.g. topic + research brief) goes
+    first with a cache_control breakpoint, so every call that opens with the
+    same context reads it from the provider's prompt cache.
+    """
+    if not context:
+        return system
+    return [
+        {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": system},
+    ]
 
 
-def _save_opening(text: str):
-    openings = _load_history()
-    # Store first 300 chars as the "opening paragraph"
-    opening = text[:300].strip()
-    openings.append(opening)
-    # Keep last 20 openings max
-    openings = openings[-20:]
-    HISTORY_FILE.write_text(
-        json.dumps({"openings": openings}, indent=2), encoding="utf-8"
-    )
+def _openai_messages(system: str, user_content: str, context: str | None) -> list[dict]:
+    """
+    OpenAI messages. OpenAI caches the longest previously seen prompt prefix
+    automatically, so a shared context is placed first as its own system message.
+    """
+    messages = []
+    if context:
+        messages.append({"role": "system", "content": context})
+    messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": user_content})
+    return messages
 
 
-def _call_llm(
+def _call_provider(
     provider: str,
     system: str,
     user_content: str,
     temperature: float = 0.7,
     model_override: str | None = None,
+    context: str | None = None,
+    usage: list | None = None,
+    max_tokens: int = MAX_TOKENS,
 ) -> str:
-    """Unified LLM call for both Anthropic and OpenAI."""
+    """Uncached completion against Anthropic or OpenAI. Usage is appended to `usage` when given."""
     if provider == "openai":
         model = model_override or DEFAULT_OPENAI_MODEL
-        response = _get_openai_client().chat.completions.create(
+        response = clients.get_openai_client().chat.completions.create(
             model=model,
-            max_tokens=MAX_TOKENS,
+            max_tokens=max_tokens,
             temperature=temperature,
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user_content},
-            ],
+            messages=_openai_messages(system, user_content, context),
         )
+        _record_usage(provider, model, response.usage, calls=usage)
         return response.choices[0].message.content
 
     else:  # anthropic
         model = model_override or DEFAULT_ANTHROPIC_MODEL
-        message = _get_anthropic_client().messages.create(
+        message = clients.get_anthropic_client().messages.create(
             model=model,
-            max_tokens=MAX_TOKENS,
+            max_tokens=max_tokens,
             temperature=temperature,
-            system=system,
+            system=_anthropic_system(system, context),
             messages=[{"role": "user", "content": user_content}],
         )
+        _record_usage(provider, model, message.usage, calls=usage)
         return message.content[0].text
 
 
-def _call_llm_safe(provider: str, system: str, user_content: str, **kwargs) -> str:
-    """Wrapper with error handling."""
+async def _call_provider_async(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float = 0.7,
+    model_override: str | None = None,
+    context: str | None = None,
+    usage: list | None = None,
+    max_tokens: int = MAX_TOKENS,
+) -> str:
+    """Async counterpart of _call_provider on the async SDK clients."""
+    if provider == "openai":
+        model = model_override or DEFAULT_OPENAI_MODEL
+        response = await clients.get_async_openai_client().chat.completions.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=_openai_messages(system, user_content, context),
+        )
+        _record_usage(provider, model, response.usage, calls=usage)
+        return response.choices[0].message.content
+
+    else:  # anthropic
+        model = model_override or DEFAULT_ANTHROPIC_MODEL
+        message = await clients.get_async_anthropic_client().messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=_anthropic_system(system, context),
+            messages=[{"role": "user", "content": user_content}],
+        )
+        _record_usage(provider, model, message.usage, calls=usage)
+        return message.content[0].text
+
+
+async def _stream_provider_async(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float = 0.7,
+    model_override: str | None = None,
+    context: str | None = None,
+    usage: list | None = None,
+    max_tokens: int = MAX_TOKENS,
+):
+    """
+    Async iterator over the text chunks of an uncached streamed completion.
+
+    Usage is appended to `usage` when given: a context variable set inside an
+    async generator does not survive across its yields.
+    """
+    if provider == "openai":
+        model = model_override or DEFAULT_OPENAI_MODEL
+        stream = await clients.get_async_openai_client().chat.completions.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=_openai_messages(system, user_content, context),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if chunk.usage:
+                _record_usage(provider, model, chunk.usage, calls=usage)
+
+    else:  # anthropic
+        model = model_override or DEFAULT_ANTHROPIC_MODEL
+        async with clients.get_async_anthropic_client().messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=_anthropic_system(system, context),
+            messages=[{"role": "user", "content": user_content}],
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+            message = await stream.get_final_message()
+            _record_usage(provider, model, message.usage, calls=usage)
+
+
+def _estimate_tokens(*texts: str | None) -> int:
+    """Local input-token estimate for rate budgeting (see token_budget.estimate_tokens)."""
+    return token_budget.estimate_tokens(*texts)
+
+
+def _resolve_model(provider: str, model_override: str | None) -> str:
+    return model_override or (DEFAULT_OPENAI_MODEL if provider == "openai" else DEFAULT_ANTHROPIC_MODEL)
+
+
+def _request_fields(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float,
+    model_override: str | None,
+    context: str | None,
+    max_tokens: int = MAX_TOKENS,
+) -> dict:
+    """Everything that determines a completion; identifies it for llm_cache and cassettes."""
+    return {
+        "provider": provider,
+        "model": _resolve_model(provider, model_override),
+        "context": context,
+        "system": system,
+        "user_content": user_content,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+
+
+def _fit_request(
+    provider: str,
+    system: str,
+    user_content: str,
+    model_override: str | None,
+    context: str | None,
+    max_tokens: int | None,
+) -> tuple[str, str | None, int, int]:
+    """
+    Resolve the output budget and condense a prompt that would overflow the
+    context window. Returns (user_content, context, max_tokens, trimmed_tokens).
+    """
+    max_tokens = min(max_tokens or MAX_TOKENS, MAX_TOKENS)
+    user_content, context, trimmed = token_budget.fit_prompt(
+        _resolve_model(provider, model_override), system, user_content, context, max_tokens
+    )
+    return user_content, context, max_tokens, trimmed
+
+
+def _call_llm(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float = 0.7,
+    model_override: str | None = None,
+    context: str | None = None,
+    use_cache: bool = True,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Unified LLM call for both Anthropic and OpenAI, served from llm_cache when possible.
+
+    `context` is an optional stable prefix shared by several calls (see
+    _anthropic_system / _openai_messages); it is sent ahead of `system`.
+    `max_tokens` is the output budget (default MAX_TOKENS, see token_budget).
+    """
+    started = time.perf_counter()
+    entries = []
+    user_content, context, max_tokens, trimmed = _fit_request(
+        provider, system, user_content, model_override, context, max_tokens
+    )
+    request = _request_fields(provider, system, user_content, temperature, model_override, context, max_tokens)
+    key = llm_cache.make_key(**request)
+    if use_cache:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            _record_usage(provider, _resolve_model(provider, model_override), llm_cache_hit=True, calls=entries)
+            _record_call_metrics(entries, started, max_tokens=max_tokens, trimmed=trimmed)
+            return cached
+
+    stats = {}
+    text = rate_limit.call_with_retries(
+        provider,
+        _resolve_model(provider, model_override),
+        _estimate_tokens(system, user_content, context),
+        lambda: cassettes.call(
+            request,
+            lambda: _call_provider(
+                provider, system, user_content, temperature, model_override, context, entries, max_tokens
+            ),
+            entries,
+        ),
+        stats,
+    )
+    _record_call_metrics(entries, started, retries=stats["retries"], max_tokens=max_tokens, trimmed=trimmed)
+    llm_cache.put(key, text)
+    return text
+
+
+async def _call_llm_async(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float = 0.7,
+    model_override: str | None = None,
+    context: str | None = None,
+    use_cache: bool = True,
+    max_tokens: int | None = None,
+) -> str:
+    """Async counterpart of _call_llm."""
+    started = time.perf_counter()
+    entries = []
+    user_content, context, max_tokens, trimmed = _fit_request(
+        provider, system, user_content, model_override, context, max_tokens
+    )
+    request = _request_fields(provider, system, user_content, temperature, model_override, context, max_tokens)
+    key = llm_cache.make_key(**request)
+    if use_cache:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            _record_usage(provider, _resolve_model(provider, model_override), llm_cache_hit=True, calls=entries)
+            _record_call_metrics(entries, started, max_tokens=max_tokens, trimmed=trimmed)
+            return cached
+
+    stats = {}
+    text = await rate_limit.call_with_retries_async(
+        provider,
+        _resolve_model(provider, model_override),
+        _estimate_tokens(system, user_content, context),
+        lambda: cassettes.call_async(
+            request,
+            lambda: _call_provider_async(
+                provider, system, user_content, temperature, model_override, context, entries, max_tokens
+            ),
+            entries,
+        ),
+        stats,
+    )
+    _record_call_metrics(entries, started, retries=stats["retries"], max_tokens=max_tokens, trimmed=trimmed)
+    await asyncio.to_thread(llm_cache.put, key, text)
+    return text
+
+
+async def _stream_llm_async(
+    provider: str,
+    system: str,
+    user_content: str,
+    temperature: float = 0.7,
+    model_override: str | None = None,
+    context: str | None = None,
+    use_cache: bool = True,
+    usage: list | None = None,
+    max_tokens: int | None = None,
+):
+    """
+    Streaming counterpart of _call_llm_async. A cache hit arrives as a single chunk.
+
+    Transient failures are retried only before the first chunk; once text has
+    been yielded a retry would duplicate it, so later errors propagate.
+    """
+    started = time.perf_counter()
+    entries = []
+    model = _resolve_model(provider, model_override)
+    user_content, context, max_tokens, trimmed = _fit_request(
+        provider, system, user_content, model_override, context, max_tokens
+    )
+    request = _request_fields(provider, system, user_content, temperature, model_override, context, max_tokens)
+    key = llm_cache.make_key(**request)
+    if use_cache:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            _record_usage(provider, model, llm_cache_hit=True, calls=entries)
+            _record_call_metrics(
+                entries, started, ttft=time.perf_counter() - started, calls=usage,
+                max_tokens=max_tokens, trimmed=trimmed,
+            )
+            yield cached
+            return
+
+    tokens = _estimate_tokens(system, user_content, context)
+    parts = []
+    ttft = None
+    attempt = 0
+    while True:
+        await rate_limit.acquire_async(provider, model, tokens)
+        try:
+            async for chunk in cassettes.stream_async(
+                request,
+                lambda: _stream_provider_async(
+                    provider, system, user_content, temperature, model_override, context, entries, max_tokens
+                ),
+                entries,
+            ):
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+                parts.append(chunk)
+                yield chunk
+            break
+        except Exception as e:
+            delay = None if parts else rate_limit.retry_delay(provider, model, e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+    _record_call_metrics(
+        entries, started, retries=attempt, ttft=ttft, calls=usage, max_tokens=max_tokens, trimmed=trimmed
+    )
+    await asyncio.to_thread(llm_cache.put, key, "".join(parts))
+
+
+@contextmanager
+def _friendly_api_errors():
+    """Translate provider SDK exceptions into user-facing RuntimeErrors."""
     try:
-        return _call_llm(provider, system, user_content, **kwargs)
+        yield
     except anthropic.RateLimitError:
         raise RuntimeError("Rate limited by Anthropic. Wait a moment and retry.")
     except anthropic.APIConnectionError:
@@ -147,28 +702,105 @@ def _call_llm_safe(provider: str, system: str, user_content: str, **kwargs) -> s
         raise RuntimeError(f"OpenAI API error: {e}")
 
 
+def _call_llm_safe(provider: str, system: str, user_content: str, **kwargs) -> str:
+    """Wrapper with error handling."""
+    with _friendly_api_errors():
+        return _call_llm(provider, system, user_content, **kwargs)
+
+
+async def _call_llm_safe_async(provider: str, system: str, user_content: str, **kwargs) -> str:
+    """Async wrapper with error handling."""
+    with _friendly_api_errors():
+        return await _call_llm_async(provider, system, user_content, **kwargs)
+
+
+async def _stream_llm_safe_async(provider: str, system: str, user_content: str, **kwargs):
+    """
+    Streamed call with error handling. Yields dicts:
+        {"delta": str, "tokens": int, "ttft": float}
+
+    tokens counts streamed chunks so far (providers emit roughly one token per
+    chunk); ttft is seconds from request to the first chunk.
+    """
+    started = time.perf_counter()
+    ttft = None
+    tokens = 0
+    with _friendly_api_errors():
+        async for chunk in _stream_llm_async(provider, system, user_content, **kwargs):
+            if ttft is None:
+                ttft = round(time.perf_counter() - started, 3)
+            tokens += 1
+            yield {"delta": chunk, "tokens": tokens, "ttft": ttft}
+
+
 # ──────────────────────────────────────────────
 # Stage 0: Research Gathering
 # ──────────────────────────────────────────────
-def run_research(topic: str, length: str = "10 min") -> str:
+def _research_request(topic: str, length: str) -> dict:
     stage = get_research_stage(length)
-    user_content = stage["user_template"].format(topic=topic)
-    return _call_llm_safe(
-        provider=stage["provider"],
-        system=stage["system"],
-        user_content=user_content,
-        temperature=stage["temperature"],
-        model_override=stage["model_override"],
-    )
+    return {
+        "provider": stage["provider"],
+        "system": stage["system"],
+        "user_content": stage["user_template"].format(topic=topic),
+        "temperature": stage["temperature"],
+        "model_override": stage["model_override"],
+        "max_tokens": token_budget.output_budget("research", length, MAX_TOKENS),
+    }
+
+
+def run_research(topic: str, length: str = "10 min") -> str:
+    return _call_llm_safe(**_research_request(topic, length))
+
+
+async def run_research_async(topic: str, length: str = "10 min") -> str:
+    return await _call_llm_safe_async(**_research_request(topic, length))
+
+
+def _research_cache_key(topic: str, length: str) -> tuple[str, str, str]:
+    """
+    (topic_key, length, prompt_hash) for the research cache. The prompt hash
+    covers the research prompt and model, so editing them invalidates old briefs.
+    """
+    topic_key = " ".join(topic.lower().split())
+    template = _request_fields(**_research_request("{topic}", length), context=None)
+    return topic_key, length, llm_cache.make_key(**template)[:16]
+
+
+async def run_research_cached_async(topic: str, length: str = "10 min") -> tuple[str, dict]:
+    """
+    Research brief for a topic, reused from the shared cache when a fresh one exists.
+
+    Returns (brief, cache_info) where cache_info is {hit, key, age_seconds,
+    ttl_seconds, hit_rate}; age_seconds is None for a freshly generated brief.
+    """
+    ttl = RESEARCH_CACHE_TTL_HOURS * 3600
+    key = _research_cache_key(topic, length)
+    cached = await asyncio.to_thread(get_research_brief, *key, ttl) if ttl > 0 else None
+    if cached:
+        brief, age = cached["brief"], round(time.time() - cached["created_at"], 1)
+    else:
+        brief, age = await run_research_async(topic, length), None
+        if ttl > 0:
+            await asyncio.to_thread(save_research_brief, *key, topic, brief)
+    stats = await asyncio.to_thread(get_research_cache_stats)
+    return brief, {
+        "hit": cached is not None,
+        "key": key[0],
+        "age_seconds": age,
+        "ttl_seconds": ttl,
+        "hit_rate": stats["hit_rate"],
+    }
 
 
 # ──────────────────────────────────────────────
 # Stage 1: Parallel Drafts
 # ──────────────────────────────────────────────
-def run_parallel_drafts(topic: str, research: str, length: str = "10 min") -> list[dict]:
-    """Generate drafts in parallel. Returns list of {label, text}."""
-    # Add differentiation context if we have history
-    openings = _load_history()
+def _draft_requests(
+    topic: str, research: str, length: str, extra: int = 0, user_id: int | None = None
+) -> list[tuple[str, dict]]:
+    """Build one (label, request) pair per entry in DRAFT_VARIANTS, plus `extra` hedge variants."""
+    # Add differentiation context if the user has history
+    openings = _load_history(user_id)
     diff_prefix = ""
     if openings:
         diff_prefix = DIFFERENTIATION_CONTEXT.format(
@@ -178,44 +810,180 @@ def run_parallel_drafts(topic: str, research: str, length: str = "10 min") -> li
     stage = get_draft_stage(length)
     base_user = stage["user_template"].format(topic=topic, research=research)
     user_content = diff_prefix + base_user
+    context = RESEARCH_CONTEXT.format(topic=topic, research=research)
+    max_tokens = token_budget.output_budget("drafts", length, MAX_TOKENS)
+
+    return [
+        (
+            variant["label"],
+            {
+                "provider": variant["provider"],
+                "system": stage["system"],
+                "user_content": user_content,
+                "temperature": variant["temperature"],
+                "model_override": variant["model_override"],
+                "context": context,
+                "max_tokens": max_tokens,
+            },
+        )
+        for variant in DRAFT_VARIANTS + HEDGE_DRAFT_VARIANTS[:extra]
+    ]
+
+
+def _hedge_policy(extra: int | None, first_k: int | None, deadline: float | None) -> tuple[int, int, float | None]:
+    """Resolve hedging arguments against the env defaults. Returns (extra, first_k, deadline)."""
+    extra = DRAFT_HEDGE_EXTRA if extra is None else extra
+    extra = max(0, min(extra, len(HEDGE_DRAFT_VARIANTS)))
+    first_k = first_k or DRAFT_FIRST_K or len(DRAFT_VARIANTS)
+    first_k = max(1, min(first_k, len(DRAFT_VARIANTS) + extra, MAX_JUDGED_DRAFTS))
+    deadline = DRAFT_DEADLINE_SECONDS if deadline is None else deadline
+    return extra, first_k, deadline or None
+
+
+def _collect_drafts(requests: list[tuple[str, dict]], finished: dict, errors: list) -> list[dict]:
+    """Turn finished {variant index: text} into drafts, in variant order."""
+    if not finished:
+        raise errors[0] if errors else RuntimeError("No draft finished.")
+    return [
+        {"label": requests[i][0], "text": finished[i]}
+        for i in sorted(finished)
+    ]
+
+
+def _hedged_drafts(topic, research, length, extra=None, first_k=None, deadline=None, user_id=None, cancel=None):
+    """Hedged draft generation on threads. Returns (drafts, cancelled_labels)."""
+    extra, first_k, deadline = _hedge_policy(extra, first_k, deadline)
+    requests = _draft_requests(topic, research, length, extra, user_id)
+
+    executor = ThreadPoolExecutor(max_workers=len(requests))
+    futures = {
+        executor.submit(_call_llm_safe, **request): i
+        for i, (_, request) in enumerate(requests)
+    }
+    # Completes when the run is cancelled, waking the wait below
+    stopped = Future()
+    remove = cancel.on_cancel(lambda: stopped.set_result(None)) if cancel else None
+    give_up_at = time.monotonic() + deadline if deadline else None
+    finished, errors = {}, []
+    pending = set(futures)
+    try:
+        while pending and len(finished) < first_k and not stopped.done():
+            timeout = None
+            if give_up_at is not None and finished:
+                timeout = give_up_at - time.monotonic()
+                if timeout <= 0:
+                    break
+            done, pending = wait(pending | {stopped}, timeout=timeout, return_when=FIRST_COMPLETED)
+            pending.discard(stopped)
+            for future in done - {stopped}:
+                if future.exception():
+                    errors.append(future.exception())
+                else:
+                    finished[futures[future]] = future.result()
+    finally:
+        if remove:
+            remove()
+        # A running thread can't be interrupted: stragglers finish in the background
+        # and their results are discarded.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if cancel:
+        cancel.raise_if_cancelled()
+    cancelled = [requests[futures[f]][0] for f in pending]
+    return _collect_drafts(requests, finished, errors), cancelled
+
+
+async def _hedged_drafts_async(topic, research, length, extra=None, first_k=None, deadline=None, user_id=None):
+    """Hedged draft generation on the running event loop. Returns (drafts, cancelled_labels)."""
+    extra, first_k, deadline = _hedge_policy(extra, first_k, deadline)
+    requests = await asyncio.to_thread(_draft_requests, topic, research, length, extra, user_id)
+
+    tasks = {
+        asyncio.create_task(_call_llm_safe_async(**request)): i
+        for i, (_, request) in enumerate(requests)
+    }
+    loop = asyncio.get_running_loop()
+    give_up_at = loop.time() + deadline if deadline else None
+    finished, errors = {}, []
+    pending = set(tasks)
+    try:
+        while pending and len(finished) < first_k:
+            timeout = None
+            if give_up_at is not None and finished:
+                timeout = give_up_at - loop.time()
+                if timeout <= 0:
+                    break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception():
+                    errors.append(task.exception())
+                else:
+                    finished[tasks[task]] = task.result()
+    finally:
+        # Cancel stragglers: their in-flight requests are aborted, not just ignored
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    cancelled = [requests[tasks[t]][0] for t in pending]
+    return _collect_drafts(requests, finished, errors), cancelled
+
+
+def run_parallel_drafts(
+    topic: str,
+    research: str,
+    length: str = "10 min",
+    extra: int | None = None,
+    first_k: int | None = None,
+    deadline: float | None = None,
+    user_id: int | None = None,
+    cancel: CancelToken | None = None,
+) -> list[dict]:
+    """
+    Generate drafts in parallel. Returns list of {label, text} in variant order.
 
-    num_drafts = len(DRAFT_VARIANTS)
-    results = [None] * num_drafts
+    By default every entry in DRAFT_VARIANTS is awaited. Hedged mode launches
+    `extra` spare variants and returns as soon as `first_k` drafts are in, or
+    `deadline` seconds after the first one arrived; the rest are dropped. A
+    failed draft is tolerated as long as another one finishes.
 
-    def _generate(idx, variant):
-        text = _call_llm_safe(
-            provider=variant["provider"],
-            system=stage["system"],
-            user_content=user_content,
-            temperature=variant["temperature"],
-            model_override=variant["model_override"],
-        )
-        return idx, variant["label"], text
+    Args:
+        extra: Spare variants from HEDGE_DRAFT_VARIANTS (default DRAFT_HEDGE_EXTRA)
+        first_k: Stop after this many drafts (default DRAFT_FIRST_K, capped at 3 for the judge)
+        deadline: Seconds to wait for more drafts once one is in (default DRAFT_DEADLINE_SECONDS)
+        user_id: Whose previous openings the drafts should differ from
+        cancel: Stop waiting and raise Cancelled when this token is cancelled;
+            drafts not yet started are never sent
+    """
+    drafts, _ = _hedged_drafts(topic, research, length, extra, first_k, deadline, user_id, cancel)
+    return drafts
 
-    with ThreadPoolExecutor(max_workers=num_drafts) as executor:
-        futures = [
-            executor.submit(_generate, i, v) for i, v in enumerate(DRAFT_VARIANTS)
-        ]
-        for future in as_completed(futures):
-            idx, label, text = future.result()
-            results[idx] = {"label": label, "text": text}
 
-    return results
+async def run_parallel_drafts_async(
+    topic: str,
+    research: str,
+    length: str = "10 min",
+    extra: int | None = None,
+    first_k: int | None = None,
+    deadline: float | None = None,
+    user_id: int | None = None,
+    cancel: CancelToken | None = None,
+) -> list[dict]:
+    """
+    Async counterpart of run_parallel_drafts; stragglers are cancelled. Same
+    arguments and return shape. A cancel aborts every draft request in flight.
+    """
+    drafts, _ = await run_cancellable(
+        _hedged_drafts_async(topic, research, length, extra, first_k, deadline, user_id), cancel
+    )
+    return drafts
 
 
 # ──────────────────────────────────────────────
 # Judge: Select Best Draft
 # ──────────────────────────────────────────────
-def run_judge(topic: str, drafts: list[dict]) -> dict:
-    """
-    Judge drafts (2 or 3). Returns {
-        winner_index: int,
-        winner_label: str,
-        winner_text: str,
-        judgment: str,
-        borrow_notes: str
-    }
-    """
+def _judge_request(topic: str, drafts: list[dict]) -> tuple[dict, dict, str]:
+    """Build the judge request. Returns (request, letter_map, winner_pattern)."""
     stage = JUDGE_PROMPT
 
     # Build user content dynamically based on number of drafts
@@ -237,14 +1005,18 @@ def run_judge(topic: str, drafts: list[dict]) -> dict:
         letter_map = {"A": 0, "B": 1, "C": 2}
         pattern = r"WINNER:\s*([ABC])"
 
-    judgment = _call_llm_safe(
-        provider=stage["provider"],
-        system=stage["system"],
-        user_content=user_content,
-        temperature=stage["temperature"],
-        model_override=stage["model_override"],
-    )
+    request = {
+        "provider": stage["provider"],
+        "system": stage["system"],
+        "user_content": user_content,
+        "temperature": stage["temperature"],
+        "model_override": stage["model_override"],
+        "max_tokens": token_budget.output_budget("judge", cap=MAX_TOKENS),
+    }
+    return request, letter_map, pattern
+
 
+def _parse_judgment(judgment: str, drafts: list[dict], letter_map: dict, pattern: str) -> dict:
     # Parse winner from judgment
     winner_letter = "A"  # default fallback
     match = re.search(pattern, judgment, re.IGNORECASE)
@@ -270,108 +1042,800 @@ def run_judge(topic: str, drafts: list[dict]) -> dict:
     }
 
 
+def _sole_draft_judgment(drafts: list[dict]) -> dict:
+    """Hedged mode can leave a single draft; it wins without a judge call."""
+    return {
+        "winner_index": 0,
+        "winner_label": drafts[0]["label"],
+        "winner_text": drafts[0]["text"],
+        "judgment": "Only one draft finished in time; judging skipped.",
+        "borrow_notes": "",
+        "judge": "sole",
+    }
+
+
+def _skip_judge(ranking: dict) -> bool:
+    """Whether the local scorer's pick stands without an LLM judge call."""
+    if JUDGE_SKIP_MARGIN <= 0 or ranking["margin"] < JUDGE_SKIP_MARGIN:
+        return False
+    return random.random() >= JUDGE_SHADOW_RATE
+
+
+def _heuristic_summary(ranking: dict, skipped_judge: bool) -> dict:
+    return {**ranking, "skipped_judge": skipped_judge}
+
+
+def _heuristic_judgment(drafts: list[dict], ranking: dict) -> dict:
+    best = ranking["best"]
+    return {
+        "winner_index": best,
+        "winner_label": drafts[best]["label"],
+        "winner_text": drafts[best]["text"],
+        "judgment": (
+            f"Picked by the local draft scorer ({ranking['scores'][best]['total']} points, "
+            f"{ranking['margin']} ahead of the runner-up); judge call skipped."
+        ),
+        "borrow_notes": "",
+        "judge": "heuristic",
+        "heuristic": _heuristic_summary(ranking, True),
+    }
+
+
+def run_judge(topic: str, drafts: list[dict], length: str = "10 min") -> dict:
+    """
+    Judge drafts (1, 2 or 3). Returns {
+        winner_index: int,
+        winner_label: str,
+        winner_text: str,
+        judgment: str,
+        borrow_notes: str,
+        judge: "llm" | "heuristic" | "sole",
+        heuristic: {scores, best, margin, skipped_judge} (2+ drafts)
+    }
+    """
+    if len(drafts) == 1:
+        return _sole_draft_judgment(drafts)
+    ranking = rank_drafts(drafts, length)
+    if _skip_judge(ranking):
+        return _heuristic_judgment(drafts, ranking)
+    request, letter_map, pattern = _judge_request(topic, drafts)
+    judgment = _call_llm_safe(**request)
+    result = _parse_judgment(judgment, drafts, letter_map, pattern)
+    record_judge_agreement(length, len(drafts), ranking["best"], result["winner_index"], ranking["margin"])
+    return {**result, "judge": "llm", "heuristic": _heuristic_summary(ranking, False)}
+
+
+async def run_judge_async(topic: str, drafts: list[dict], length: str = "10 min") -> dict:
+    """Async counterpart of run_judge. Same return shape."""
+    if len(drafts) == 1:
+        return _sole_draft_judgment(drafts)
+    ranking = rank_drafts(drafts, length)
+    if _skip_judge(ranking):
+        return _heuristic_judgment(drafts, ranking)
+    request, letter_map, pattern = _judge_request(topic, drafts)
+    judgment = await _call_llm_safe_async(**request)
+    result = _parse_judgment(judgment, drafts, letter_map, pattern)
+    await asyncio.to_thread(
+        record_judge_agreement, length, len(drafts), ranking["best"], result["winner_index"], ranking["margin"]
+    )
+    return {**result, "judge": "llm", "heuristic": _heuristic_summary(ranking, False)}
+
+
 # ──────────────────────────────────────────────
 # Critique (between enhancement stages)
 # ──────────────────────────────────────────────
-def run_critique(topic: str, text: str, completed_stage: str, next_stage: str) -> str:
+def _critique_request(topic: str, text: str, completed_stage: str, next_stage: str, brief: bool = False) -> dict:
     tmpl = CRITIQUE_TEMPLATE
-    user_content = tmpl["user_template"].format(
-        topic=topic,
-        completed_stage=completed_stage,
-        next_stage=next_stage,
-        text=text,
-    )
-    return _call_llm_safe(
-        provider=tmpl["provider"],
-        system=tmpl["system"],
-        user_content=user_content,
-        temperature=tmpl["temperature"],
-        model_override=tmpl["model_override"],
-    )
+    template = tmpl["user_template_brief"] if brief else tmpl["user_template"]
+    return {
+        "provider": tmpl["provider"],
+        "system": tmpl["system"],
+        "user_content": template.format(
+            topic=topic,
+            completed_stage=completed_stage,
+            next_stage=next_stage,
+            text=text,
+        ),
+        "temperature": tmpl["temperature"],
+        "model_override": tmpl["model_override"],
+        "max_tokens": token_budget.output_budget("critique_brief" if brief else "critique", cap=MAX_TOKENS),
+    }
+
+
+def run_critique(topic: str, text: str, completed_stage: str, next_stage: str, brief: bool = False) -> str:
+    return _call_llm_safe(**_critique_request(topic, text, completed_stage, next_stage, brief))
+
+
+async def run_critique_async(
+    topic: str, text: str, completed_stage: str, next_stage: str, brief: bool = False
+) -> str:
+    return await _call_llm_safe_async(**_critique_request(topic, text, completed_stage, next_stage, brief))
 
 
 # ──────────────────────────────────────────────
 # Enhancement Stages (2-5)
 # ──────────────────────────────────────────────
-def run_enhancement_stage(
+def _enhancement_request(
     stage_index: int,
     topic: str,
     research: str,
     critique: str,
     previous_output: str,
-) -> str:
+    length: str = "10 min",
+    patch: bool = False,
+    flagged: dict[int, list[str]] | None = None,
+) -> dict:
+    """
+    Enhancement request; in patch mode the script is numbered by paragraph and
+    only edits are asked for. flagged ({paragraph number: phrases}, patch mode
+    only) points the stage at the paragraphs a phrase scan flagged.
+    """
     stage = ENHANCEMENT_STAGES[stage_index]
+    if patch:
+        previous_output = number_paragraphs(split_paragraphs(previous_output))
     user_content = stage["user_template"].format(
         topic=topic,
         research=research,
         critique=critique,
         previous_output=previous_output,
     )
+    if patch and flagged:
+        user_content += DEAI_FLAGGED_NOTE.format(flagged="\n".join(
+            f"[P{n}] " + ", ".join(f"'{p}'" for p in phrases) for n, phrases in sorted(flagged.items())
+        ))
+    return {
+        "provider": stage["provider"],
+        "system": stage["system"],
+        "user_content": user_content + PATCH_MODE_INSTRUCTIONS if patch else user_content,
+        "temperature": stage["temperature"],
+        "model_override": stage.get("model_override"),
+        "context": RESEARCH_CONTEXT.format(topic=topic, research=research),
+        "max_tokens": token_budget.output_budget("enhancement_patch" if patch else "enhancement", length, MAX_TOKENS),
+    }
+
+
+def run_enhancement_stage(
+    stage_index: int,
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    length: str = "10 min",
+) -> str:
     return _call_llm_safe(
-        provider=stage["provider"],
-        system=stage["system"],
-        user_content=user_content,
-        temperature=stage["temperature"],
-        model_override=stage.get("model_override"),
+        **_enhancement_request(stage_index, topic, research, critique, previous_output, length)
+    )
+
+
+async def run_enhancement_stage_async(
+    stage_index: int,
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    length: str = "10 min",
+) -> str:
+    return await _call_llm_safe_async(
+        **_enhancement_request(stage_index, topic, research, critique, previous_output, length)
     )
 
 
+def run_enhancement_patch(
+    stage_index: int,
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    length: str = "10 min",
+    flagged: dict[int, list[str]] | None = None,
+) -> tuple[str, int]:
+    """
+    Run an enhancement stage in patch mode. Returns (new_text, edit_count).
+
+    flagged ({paragraph number: phrases}) lists paragraphs the stage should
+    fix first, e.g. from cliche_detector.scan_script.
+
+    Raises PatchError if the response is not an applicable patch; the caller
+    should then fall back to run_enhancement_stage.
+    """
+    response = _call_llm_safe(
+        **_enhancement_request(stage_index, topic, research, critique, previous_output, length, True, flagged)
+    )
+    return patch_script(previous_output, response)
+
+
+async def run_enhancement_patch_async(
+    stage_index: int,
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    length: str = "10 min",
+    flagged: dict[int, list[str]] | None = None,
+) -> tuple[str, int]:
+    """Async counterpart of run_enhancement_patch."""
+    response = await _call_llm_safe_async(
+        **_enhancement_request(stage_index, topic, research, critique, previous_output, length, True, flagged)
+    )
+    return patch_script(previous_output, response)
+
+
+def _polish_windows(text: str, window_words: int | None = None) -> list[dict]:
+    """Windows for a windowed polish of text, or [] when it is off or the script fits one window."""
+    window_words = POLISH_WINDOW_WORDS if window_words is None else window_words
+    if window_words <= 0:
+        return []
+    windows = make_windows(text, window_words)
+    return windows if len(windows) > 1 else []
+
+
+def _polish_window_request(window: dict, topic: str, research: str, critique: str) -> dict:
+    stage = ENHANCEMENT_STAGES[POLISH_STAGE_INDEX]
+    return {
+        "provider": stage["provider"],
+        "system": stage["system"],
+        "user_content": POLISH_WINDOW_TEMPLATE.format(
+            critique=critique,
+            position=f"the {window['position']}",
+            before=window["before"] or "(start of script)",
+            section=window["section"],
+            after=window["after"] or "(end of script)",
+            position_note=POLISH_POSITION_NOTES[window["position"]],
+        ),
+        "temperature": stage["temperature"],
+        "model_override": stage.get("model_override"),
+        # Same prefix as the other stages, so every window reads it from the prompt cache
+        "context": RESEARCH_CONTEXT.format(topic=topic, research=research),
+        "max_tokens": token_budget.passage_budget(window["words"], MAX_TOKENS),
+    }
+
+
+def _stitch_windows(windows: list[dict], polished: list[str], concurrency: int) -> tuple[str, dict]:
+    sections, notes = [], []
+    for n, (window, text) in enumerate(zip(windows, polished)):
+        section, window_notes = clean_window(window, text)
+        sections.append(section)
+        notes.extend(f"window {n + 1}: {note}" for note in window_notes)
+    text, seams = stitch(sections)
+    if seams:
+        notes.append(f"{seams} duplicated sentence(s) removed at seams")
+    return text, {"edit_mode": "windowed", "windows": len(windows), "concurrency": concurrency, "seam_notes": notes}
+
+
+def run_windowed_polish(
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    window_words: int | None = None,
+    concurrency: int | None = None,
+) -> tuple[str, dict] | None:
+    """
+    Final Polish as concurrent paragraph windows, stitched back with seam checks.
+
+    Returns (text, info) with info {edit_mode, windows, concurrency, seam_notes},
+    or None when windowing is off or the script fits in one window.
+
+    Args:
+        window_words: Target words per window (default POLISH_WINDOW_WORDS)
+        concurrency: Windows polished at once (default POLISH_CONCURRENCY)
+    """
+    windows = _polish_windows(previous_output, window_words)
+    if not windows:
+        return None
+    concurrency = max(1, concurrency or POLISH_CONCURRENCY)
+    requests = [_polish_window_request(w, topic, research, critique) for w in windows]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        polished = list(executor.map(lambda request: _call_llm_safe(**request), requests))
+    return _stitch_windows(windows, polished, concurrency)
+
+
+async def run_windowed_polish_async(
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    window_words: int | None = None,
+    concurrency: int | None = None,
+) -> tuple[str, dict] | None:
+    """Async counterpart of run_windowed_polish, on a semaphore-bounded set of tasks."""
+    windows = _polish_windows(previous_output, window_words)
+    if not windows:
+        return None
+    concurrency = max(1, concurrency or POLISH_CONCURRENCY)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _polish(window: dict) -> str:
+        async with semaphore:
+            return await _call_llm_safe_async(**_polish_window_request(window, topic, research, critique))
+
+    polished = await asyncio.gather(*(_polish(w) for w in windows))
+    return _stitch_windows(windows, list(polished), concurrency)
+
+
+async def stream_enhancement_stage_async(
+    stage_index: int,
+    topic: str,
+    research: str,
+    critique: str,
+    previous_output: str,
+    usage: list | None = None,
+    length: str = "10 min",
+):
+    """
+    Streaming variant of run_enhancement_stage_async.
+
+    Yields {"delta", "tokens", "ttft"} dicts as text arrives; the stage output is
+    the concatenation of every "delta". Token usage is appended to `usage`.
+    """
+    request = _enhancement_request(stage_index, topic, research, critique, previous_output, length)
+    async for delta in _stream_llm_safe_async(**request, usage=usage):
+        yield delta
+
+
 # ──────────────────────────────────────────────
-# Full Pipeline (generator for UI updates)
+# Latency budget planning
 # ──────────────────────────────────────────────
-def run_full_pipeline(topic: str, length: str = "10 min"):
+# Fallback stage latencies in seconds for a 10 min episode, used until real
+# timings for a stage have been recorded (see database.record_stage_latency).
+DEFAULT_STAGE_SECONDS = {
+    "research": 40,
+    "drafts": 70,
+    "drafts_first": 50,
+    "judge": 20,
+    "critique": 15,
+    "critique_brief": 6,
+    "enhancement": 75,
+}
+# Enhancement stages in the order they are given up when the budget is tight:
+# Final Polish, Oral Delivery, Deep Enhancement, De-AI.
+BUDGET_DROP_ORDER = [3, 2, 0, 1]
+
+
+class _StageClock:
+    """Observed stage latencies for one episode length, with scaled fallbacks."""
+
+    def __init__(self, length: str):
+        self.length = length
+        self.observed = get_stage_latencies(length)
+        self.scale = EPISODE_LENGTHS[length]["words_max"] / EPISODE_LENGTHS["10 min"]["words_max"]
+
+    def estimate(self, key: str) -> float:
+        if key in self.observed:
+            return self.observed[key]
+        base = key.split(":")[0]
+        seconds = DEFAULT_STAGE_SECONDS[base]
+        # Drafting and rewriting cost scales with the script length
+        return seconds * self.scale if base in ("drafts", "drafts_first", "enhancement") else seconds
+
+
+def _plan_cost(plan: dict, clock: _StageClock) -> float:
+    cost = 0.0
+    if plan["drafts"] == "full":
+        cost += clock.estimate("drafts") + clock.estimate("judge")
+    elif plan["drafts"] == "first":
+        cost += clock.estimate("drafts_first")
+    for i, mode in plan["stages"].items():
+        if mode == "skip":
+            continue
+        cost += clock.estimate(f"enhancement:{i}")
+        if mode == "full":
+            cost += clock.estimate("critique")
+        elif mode == "brief":
+            cost += clock.estimate("critique_brief")
+    return cost
+
+
+def _plan_budget(remaining: float, drafts_pending: bool, stage_indexes: list[int], clock: _StageClock) -> dict:
     """
-    Generator yielding status updates as tuples:
-        (step_name, step_type, data)
+    Pick the least degraded plan for the rest of the pipeline that fits in
+    `remaining` seconds. Returns {"drafts": "full" | "first" | "done",
+    "stages": {stage_index: "full" | "brief" | "merged" | "skip"}}.
 
-    step_type is one of: "research", "drafts", "judge", "critique", "enhancement", "done"
-    data contains the relevant output for that step.
+    Degradations are applied in order until the estimate fits: brief critiques,
+    critiques merged into their enhancement stage, first finished draft without
+    a judge, then enhancement stages skipped in BUDGET_DROP_ORDER.
+    """
+    plan = {
+        "drafts": "full" if drafts_pending else "done",
+        "stages": {i: "full" for i in stage_indexes},
+    }
+    order = [i for i in BUDGET_DROP_ORDER if i in plan["stages"]]
+    steps = (
+        [("stage", i, "brief") for i in order]
+        + [("stage", i, "merged") for i in order]
+        + ([("drafts", None, "first")] if drafts_pending else [])
+        + [("stage", i, "skip") for i in order]
+    )
+    for kind, i, mode in steps:
+        if _plan_cost(plan, clock) <= remaining:
+            break
+        if kind == "drafts":
+            plan["drafts"] = mode
+        else:
+            plan["stages"][i] = mode
+    return plan
 
-    Args:
-        topic: The speech topic
-        length: Speech length key ("5 min", "10 min", "15 min", "20 min")
+
+# ──────────────────────────────────────────────
+# Full Pipeline (generator for UI updates)
+# ──────────────────────────────────────────────
+async def _pipeline_steps_async(
+    topic: str,
+    length: str,
+    stream: bool,
+    run_id: str | None,
+    restored: dict,
+    budget: float | None = None,
+    user_id: int | None = None,
+):
     """
+    The pipeline proper. Steps found in `restored` (step_name -> done data) are
+    replayed instead of recomputed; every newly completed step is checkpointed
+    under run_id so a later resume only pays for what is left.
+
+    With a latency budget, the rest of the pipeline is re-planned before the
+    drafts and before each enhancement stage (see _plan_budget). Skipped or
+    merged steps are emitted with status "skipped" so the stages output shows
+    what was dropped.
+    """
+    started = time.monotonic()
+    clock = await asyncio.to_thread(_StageClock, length) if budget is not None else None
+    dropped, merged, shortened = [], [], []
+
+    async def _checkpoint(step_name: str, step_type: str, data: dict) -> dict:
+        if run_id:
+            await asyncio.to_thread(save_pipeline_checkpoint, run_id, step_name, step_type, data)
+        return data
+
+    async def _timed(stage_key: str, step_started: float, calls: list):
+        # A stage served entirely from llm_cache took no provider time: its
+        # near-zero latency would drag down the medians the budget planner uses
+        if summarize_usage(calls)["llm_cache_hits"] == len(calls):
+            return
+        await asyncio.to_thread(record_stage_latency, stage_key, length, time.monotonic() - step_started)
+
+    def _plan(drafts_pending: bool, stage_indexes: list[int]) -> dict | None:
+        if budget is None:
+            return None
+        return _plan_budget(budget - (time.monotonic() - started), drafts_pending, stage_indexes, clock)
 
     # Step 1: Research
-    yield ("Stage 0: Research Gathering", "research", {"status": "running"})
-    research = run_research(topic, length)
-    yield ("Stage 0: Research Gathering", "research", {"status": "done", "text": research})
+    name = "Stage 0: Research Gathering"
+    data = restored.get(name)
+    if data is None:
+        yield (name, "research", {"status": "running"})
+        step_started = time.monotonic()
+        with collect_usage() as calls:
+            research, cache_info = await run_research_cached_async(topic, length)
+        if not cache_info["hit"]:
+            await _timed("research", step_started, calls)
+        data = await _checkpoint(name, "research", {
+            "status": "done", "text": research, "research_cache": cache_info,
+            **_stage_metrics(calls, time.monotonic() - step_started),
+        })
+    yield (name, "research", data)
+    research = data["text"]
 
     # Step 2: Parallel drafts
-    yield ("Stage 1: Parallel Drafts", "drafts", {"status": "running"})
-    drafts = run_parallel_drafts(topic, research, length)
-    yield ("Stage 1: Parallel Drafts", "drafts", {"status": "done", "drafts": drafts})
+    name = "Stage 1: Parallel Drafts"
+    data = restored.get(name)
+    if data is None:
+        plan = _plan(True, list(range(len(ENHANCEMENT_STAGES))))
+        first_only = plan is not None and plan["drafts"] == "first"
+        yield (name, "drafts", {"status": "running"})
+        step_started = time.monotonic()
+        with collect_usage() as calls:
+            drafts, cancelled = await _hedged_drafts_async(
+                topic, research, length, first_k=1 if first_only else None, user_id=user_id
+            )
+        await _timed("drafts_first" if first_only else "drafts", step_started, calls)
+        data = {"status": "done", "drafts": drafts, "cancelled": cancelled, **_stage_metrics(calls, time.monotonic() - step_started)}
+        if first_only:
+            data["mode"] = "first"
+            shortened.append(name)
+        data = await _checkpoint(name, "drafts", data)
+    yield (name, "drafts", data)
+    drafts = data["drafts"]
 
     # Step 3: Judge
-    yield ("Judge: Select Best Draft", "judge", {"status": "running"})
-    judge_result = run_judge(topic, drafts)
-    yield ("Judge: Select Best Draft", "judge", {"status": "done", **judge_result})
-
-    current_text = judge_result["winner_text"]
+    name = "Judge: Select Best Draft"
+    data = restored.get(name)
+    if data is None:
+        yield (name, "judge", {"status": "running"})
+        step_started = time.monotonic()
+        with collect_usage() as calls:
+            judge_result = await run_judge_async(topic, drafts, length)
+        if judge_result["judge"] == "llm":
+            await _timed("judge", step_started, calls)
+        data = await _checkpoint(name, "judge", {
+            "status": "done", **judge_result, **_stage_metrics(calls, time.monotonic() - step_started),
+        })
+    yield (name, "judge", data)
+
+    current_text = data["winner_text"]
+    prev_stage_name = "Draft Selection (Judge)"
 
     # Steps 4-7: Enhancement stages with critiques between them
     for i, stage in enumerate(ENHANCEMENT_STAGES):
-        # Critique before this stage (except the first enhancement if judge already provided feedback)
         next_stage_name = stage["name"]
-        if i == 0:
-            prev_stage_name = "Draft Selection (Judge)"
-        else:
-            prev_stage_name = ENHANCEMENT_STAGES[i - 1]["name"]
-
         critique_name = f"Critique: {prev_stage_name} → {next_stage_name}"
-        yield (critique_name, "critique", {"status": "running"})
-        critique = run_critique(topic, current_text, prev_stage_name, next_stage_name)
-        yield (critique_name, "critique", {"status": "done", "text": critique})
+
+        mode = "full"
+        scan = None
+        data = restored.get(stage["name"])
+        if data is None:
+            plan = _plan(False, list(range(i, len(ENHANCEMENT_STAGES))))
+            if plan is not None:
+                mode = plan["stages"][i]
+            if mode == "skip":
+                dropped.append(stage["name"])
+                data = await _checkpoint(stage["name"], "enhancement", {
+                    "status": "skipped", "stage_index": i, "text": current_text, "reason": "latency budget",
+                })
+            elif i == DEAI_STAGE_INDEX and DEAI_GATE in ("skip", "flagged"):
+                scan = scan_script(current_text)
+                if scan["density"] <= DEAI_CLEAN_DENSITY:
+                    data = await _checkpoint(stage["name"], "enhancement", {
+                        "status": "skipped", "stage_index": i, "text": current_text,
+                        "reason": "no AI phrasing detected", "cliche_scan": scan,
+                    })
+        if data is not None and data["status"] == "skipped":
+            yield (stage["name"], "enhancement", data)
+            continue
+
+        # Critique before this stage (merged mode folds it into the stage prompt)
+        data = restored.get(critique_name)
+        if data is None and mode == "merged":
+            merged.append(critique_name)
+            data = await _checkpoint(critique_name, "critique", {
+                "status": "skipped", "text": MERGED_CRITIQUE_NOTE, "reason": "merged into stage (latency budget)",
+            })
+        elif data is None:
+            brief = mode == "brief"
+            yield (critique_name, "critique", {"status": "running"})
+            step_started = time.monotonic()
+            with collect_usage() as calls:
+                critique = await run_critique_async(topic, current_text, prev_stage_name, next_stage_name, brief)
+            await _timed("critique_brief" if brief else "critique", step_started, calls)
+            data = {"status": "done", "text": critique, **_stage_metrics(calls, time.monotonic() - step_started)}
+            if brief:
+                data["mode"] = "brief"
+                shortened.append(critique_name)
+            data = await _checkpoint(critique_name, "critique", data)
+        yield (critique_name, "critique", data)
+        critique = data["text"]
 
         # Enhancement stage
-        yield (stage["name"], "enhancement", {"status": "running", "stage_index": i})
-        current_text = run_enhancement_stage(i, topic, research, critique, current_text)
-        yield (stage["name"], "enhancement", {"status": "done", "stage_index": i, "text": current_text})
+        data = restored.get(stage["name"])
+        if data is None:
+            yield (stage["name"], "enhancement", {"status": "running", "stage_index": i})
+            step_started = time.monotonic()
+            enhanced, edit_info, mode_calls = None, {"edit_mode": "rewrite"}, []
+            if i == POLISH_STAGE_INDEX and POLISH_WINDOW_WORDS > 0:
+                with collect_usage() as mode_calls:
+                    windowed = await run_windowed_polish_async(topic, research, critique, current_text)
+                if windowed:
+                    enhanced, edit_info = windowed
+            flagged = scan["paragraphs"] if scan and DEAI_GATE == "flagged" else None
+            if enhanced is None and (flagged or i in ENHANCEMENT_PATCH_STAGES):
+                with collect_usage() as mode_calls:
+                    try:
+                        enhanced, edits = await run_enhancement_patch_async(
+                            i, topic, research, critique, current_text, length, flagged
+                        )
+                        edit_info = {"edit_mode": "patch", "edits": edits}
+                    except PatchError as e:
+                        edit_info = {"edit_mode": "rewrite", "patch_error": str(e)}
+            if scan:
+                edit_info["cliche_scan"] = scan
+            if enhanced is None and stream:
+                parts = []
+                calls = []
+                async for delta in stream_enhancement_stage_async(
+                    i, topic, research, critique, current_text, usage=calls, length=length
+                ):
+                    parts.append(delta["delta"])
+                    yield (stage["name"], "enhancement", {"status": "delta", "stage_index": i, **delta})
+                enhanced = "".join(parts)
+            elif enhanced is None:
+                with collect_usage() as calls:
+                    enhanced = await run_enhancement_stage_async(i, topic, research, critique, current_text, length)
+            else:
+                calls = []
+            await _timed(f"enhancement:{i}", step_started, mode_calls + calls)
+            data = await _checkpoint(stage["name"], "enhancement", {
+                "status": "done", "stage_index": i, "text": enhanced, **edit_info,
+                **_stage_metrics(mode_calls + calls, time.monotonic() - step_started),
+            })
+        yield (stage["name"], "enhancement", data)
+        current_text = data["text"]
+        prev_stage_name = stage["name"]
+
+    data = restored.get("Complete")
+    if data is None:
+        # Save opening for future differentiation
+        await asyncio.to_thread(_save_opening, current_text, user_id)
+        data = {"final_text": current_text}
+        if budget is not None:
+            data["budget"] = {
+                "seconds": budget,
+                "elapsed": round(time.monotonic() - started, 1),
+                "dropped": dropped,
+                "merged": merged,
+                "shortened": shortened,
+            }
+        data = await _checkpoint("Complete", "done", data)
+
+    yield ("Complete", "done", data)
+
+
+async def run_full_pipeline_async(
+    topic: str,
+    length: str = "10 min",
+    stream: bool = False,
+    run_id: str | None = None,
+    user_id: int | None = None,
+    budget: float | None = None,
+    cancel: CancelToken | None = None,
+):
+    """
+    Async iterator yielding status updates as tuples:
+        (step_name, step_type, data)
 
-    # Save opening for future differentiation
-    _save_opening(current_text)
+    Same events as run_full_pipeline, but every provider call is awaited on the
+    running event loop, so many episodes can share one process and one loop.
 
-    yield ("Complete", "done", {"final_text": current_text})
+    Args:
+        topic: The speech topic
+        length: Speech length key ("5 min", "10 min", "15 min", "20 min")
+        stream: Stream enhancement stage output as "delta" status events
+        run_id: Checkpoint each completed step under this id (see resume_pipeline).
+            If the run already has checkpoints, those steps are replayed, not re-run.
+        user_id: Owner recorded on a newly created run; the drafts avoid repeating
+            this user's previous openings
+        budget: Wall-clock budget in seconds (see run_full_pipeline)
+        cancel: Stop the run when this token is cancelled (see run_full_pipeline)
+    """
+    restored = {}
+    if run_id:
+        run = await asyncio.to_thread(get_pipeline_run, run_id)
+        if run:
+            restored = {c["name"]: c["data"] for c in run["checkpoints"]}
+            await asyncio.to_thread(update_pipeline_run_status, run_id, "running")
+        else:
+            await asyncio.to_thread(create_pipeline_run, run_id, topic, length, user_id)
+
+    steps = _pipeline_steps_async(topic, length, stream, run_id, restored, budget, user_id)
+    completed, latest_text = [], None
+    try:
+        while True:
+            try:
+                # Each step runs in its own task so a cancel aborts its requests mid-flight
+                event = await run_cancellable(steps.__anext__(), cancel)
+            except StopAsyncIteration:
+                break
+            name, step_type, data = event
+            if data.get("status") in ("done", "skipped"):
+                completed.append(name)
+                if step_type in ("judge", "enhancement"):
+                    latest_text = data.get("winner_text") or data.get("text")
+            yield event
+    except Cancelled as e:
+        if run_id:
+            await asyncio.to_thread(update_pipeline_run_status, run_id, "cancelled", e.reason)
+        yield ("Cancelled", "cancelled", {
+            "status": "cancelled", "reason": e.reason, "completed_steps": completed, "partial_text": latest_text,
+        })
+    except (GeneratorExit, asyncio.CancelledError):
+        # Closed or cancelled from outside: the generator may be finalized with no
+        # task left to await in, so this one small write stays synchronous
+        if run_id:
+            update_pipeline_run_status(run_id, "cancelled", "interrupted")
+        raise
+    except Exception:
+        if run_id:
+            await asyncio.to_thread(update_pipeline_run_status, run_id, "failed")
+        raise
+    else:
+        if run_id:
+            await asyncio.to_thread(update_pipeline_run_status, run_id, "done")
+    finally:
+        await steps.aclose()
+
+
+def _iterate_async(agen):
+    """
+    Drive an async iterator to completion from synchronous code, on the shared
+    event loop (see clients.run_sync), so the loop's async clients and their
+    warm connections are reused from one episode to the next.
+    """
+    async def _next():
+        return await agen.__anext__()
+
+    try:
+        while True:
+            try:
+                yield clients.run_sync(_next())
+            except StopAsyncIteration:
+                break
+    finally:
+        clients.run_sync(agen.aclose())
+
+
+def run_full_pipeline(
+    topic: str,
+    length: str = "10 min",
+    stream: bool = False,
+    run_id: str | None = None,
+    user_id: int | None = None,
+    budget: float | None = None,
+    cancel: CancelToken | None = None,
+):
+    """
+    Generator yielding status updates as tuples:
+        (step_name, step_type, data)
+
+    step_type is one of: "research", "drafts", "judge", "critique", "enhancement", "done",
+    or "cancelled" for the last event of a run stopped through `cancel`
+    data contains the relevant output for that step. data["status"] is "running",
+    "done", "skipped" (dropped to meet a latency budget), or (with stream=True)
+    "delta" for incremental enhancement text, carrying
+    {"delta": chunk, "tokens": chunks so far, "ttft": seconds to first chunk}.
+    Every provider-backed "done" event carries data["usage"] (see summarize_usage),
+    which reports cached vs. uncached input tokens and cost for that stage, and
+    data["metrics"]: the stage wall time plus one entry per LLM call with its
+    model, wall time, time to first token, token counts and retries.
+
+    Runs run_full_pipeline_async on the shared event loop, so the events are identical.
+
+    Args:
+        topic: The speech topic
+        length: Speech length key ("5 min", "10 min", "15 min", "20 min")
+        stream: Stream enhancement stage output as "delta" status events
+        run_id: Checkpoint each completed step under this id (see resume_pipeline)
+        user_id: Owner recorded on a newly created run; the drafts avoid repeating
+            this user's previous openings
+        budget: Wall-clock budget in seconds for the whole run. Before each stage the
+            rest of the pipeline is re-planned from observed stage latencies, and
+            critiques are shortened or merged, the judge dropped, or enhancement
+            stages skipped until the estimate fits. The "Complete" event reports
+            what was dropped under data["budget"].
+        cancel: CancelToken that stops the run from any thread. The step in flight
+            is aborted along with its provider requests, no further stage is
+            scheduled, and a final ("Cancelled", "cancelled", data) event reports
+            {"reason", "completed_steps", "partial_text"} (the latest script
+            version, or None). With a run_id the run is marked "cancelled" with
+            the token's reason; once a step has been checkpointed it is offered
+            for resume (see database.get_resumable_runs).
+    """
+    yield from _iterate_async(
+        run_full_pipeline_async(
+            topic, length, stream=stream, run_id=run_id, user_id=user_id, budget=budget, cancel=cancel
+        )
+    )
+
+
+async def resume_pipeline_async(run_id: str, stream: bool = False, cancel: CancelToken | None = None):
+    """Async counterpart of resume_pipeline."""
+    run = await asyncio.to_thread(get_pipeline_run, run_id)
+    if not run:
+        raise ValueError(f"Unknown pipeline run: {run_id}")
+    async for event in run_full_pipeline_async(
+        run["topic"], run["length"], stream=stream, run_id=run_id, user_id=run["user_id"], cancel=cancel
+    ):
+        yield event
+
+
+def resume_pipeline(run_id: str, stream: bool = False, cancel: CancelToken | None = None):
+    """
+    Continue a checkpointed run from its last finished step.
+
+    Completed steps are replayed from the database as "done" events (so callers
+    can rebuild the full step list); only the remaining stages call a provider.
+    cancel works as in run_full_pipeline.
+    """
+    yield from _iterate_async(resume_pipeline_async(run_id, stream=stream, cancel=cancel))
 
 
 # ══════════════════════════════════════════════════════════════════════════════
@@ -456,6 +1920,20 @@ def run_lens_audio_script(
 # LEARNING ADD-ONS (on-demand after episode generation)
 # ══════════════════════════════════════════════════════════════════════════════
 
+def _addon_request(addon_key: str, topic: str, transcript: str) -> dict:
+    if addon_key not in LEARNING_ADDONS:
+        raise ValueError(f"Unknown add-on: {addon_key}")
+
+    addon = LEARNING_ADDONS[addon_key]
+    return {
+        "provider": addon.get("provider", "anthropic"),
+        "system": addon["system"],
+        "user_content": addon["user_template"].format(topic=topic, transcript=transcript),
+        "temperature": addon["temperature"],
+        "model_override": addon.get("model_override", "claude-sonnet-4-20250514"),
+    }
+
+
 def generate_addon(addon_key: str, topic: str, transcript: str) -> str:
     """
     Generate a learning add-on (quiz, journal, takeaways).
@@ -468,19 +1946,88 @@ def generate_addon(addon_key: str, topic: str, transcript: str) -> str:
     Returns:
         Generated add-on content
     """
-    if addon_key not in LEARNING_ADDONS:
-        raise ValueError(f"Unknown add-on: {addon_key}")
+    return _call_llm_safe(**_addon_request(addon_key, topic, transcript))
 
-    addon = LEARNING_ADDONS[addon_key]
-    user_content = addon["user_template"].format(topic=topic, transcript=transcript)
 
-    return _call_llm_safe(
-        provider=addon.get("provider", "anthropic"),
-        system=addon["system"],
-        user_content=user_content,
-        temperature=addon["temperature"],
-        model_override=addon.get("model_override", "claude-sonnet-4-20250514"),
-    )
+async def generate_addon_async(addon_key: str, topic: str, transcript: str) -> str:
+    """Async counterpart of generate_addon."""
+    return await _call_llm_safe_async(**_addon_request(addon_key, topic, transcript))
+
+
+# Background precompute: with PRECOMPUTE_ADDONS=1 the app starts every add-on as
+# soon as an episode is saved (while its audio is being generated) and stores
+# each result against the speech, so the add-on buttons return instantly.
+PRECOMPUTE_ADDONS = os.getenv("PRECOMPUTE_ADDONS", "").lower() in ("1", "true", "yes")
+_addon_executor = ThreadPoolExecutor(max_workers=2 * len(LEARNING_ADDONS), thread_name_prefix="addons")
+_addon_jobs_lock = threading.RLock()  # a done-callback may run inside precompute_addons
+_addon_jobs: dict[tuple[int, str], Future] = {}
+
+
+def _generate_and_store_addon(speech_id: int, addon_key: str, topic: str, transcript: str) -> str:
+    result = generate_addon(addon_key, topic, transcript)
+    save_speech_addon(speech_id, addon_key, result)
+    return result
+
+
+def precompute_addons(speech_id: int, topic: str, transcript: str) -> dict[str, Future]:
+    """
+    Start generating every LEARNING_ADDONS entry for a saved speech in the
+    background, concurrently. Each result is stored with the speech as soon as
+    it is ready; add-ons already being generated are not started twice.
+
+    Returns:
+        {addon_key: Future} for the background generations
+    """
+    futures = {}
+    with _addon_jobs_lock:
+        for addon_key in LEARNING_ADDONS:
+            job = (speech_id, addon_key)
+            future = _addon_jobs.get(job)
+            if future is None:
+                future = _addon_executor.submit(_generate_and_store_addon, speech_id, addon_key, topic, transcript)
+                _addon_jobs[job] = future
+                future.add_done_callback(lambda _, job=job: _forget_addon_job(job))
+            futures[addon_key] = future
+    return futures
+
+
+def _forget_addon_job(job: tuple[int, str]):
+    # Finished results are in the database from here on
+    with _addon_jobs_lock:
+        _addon_jobs.pop(job, None)
+
+
+def get_addon(speech_id: int, user_id: int, addon_key: str, topic: str, transcript: str) -> str:
+    """
+    A learning add-on for a saved speech: the stored result if there is one,
+    else the background generation already in flight, else generated now.
+    Newly generated add-ons are stored with the speech.
+    """
+    stored = get_speech_addons(speech_id, user_id).get(addon_key)
+    if stored is not None:
+        return stored
+    with _addon_jobs_lock:
+        future = _addon_jobs.get((speech_id, addon_key))
+    if future is not None:
+        try:
+            return future.result()
+        except Exception:
+            pass  # retried below, so the error surfaces to the caller
+    return _generate_and_store_addon(speech_id, addon_key, topic, transcript)
+
+
+def _perspective_request(lens_key: str, topic: str, transcript: str) -> dict:
+    if lens_key not in PERSPECTIVE_LENSES:
+        raise ValueError(f"Unknown perspective lens: {lens_key}")
+
+    lens = PERSPECTIVE_LENSES[lens_key]
+    return {
+        "provider": lens.get("provider", "anthropic"),
+        "system": lens["system"],
+        "user_content": lens["user_template"].format(topic=topic, transcript=transcript),
+        "temperature": lens["temperature"],
+        "model_override": lens.get("model_override", "claude-sonnet-4-20250514"),
+    }
 
 
 def generate_perspective(lens_key: str, topic: str, transcript: str) -> str:
@@ -495,22 +2042,134 @@ def generate_perspective(lens_key: str, topic: str, transcript: str) -> str:
     Returns:
         Generated perspective analysis
     """
-    if lens_key not in PERSPECTIVE_LENSES:
-        raise ValueError(f"Unknown perspective lens: {lens_key}")
+    return _call_llm_safe(**_perspective_request(lens_key, topic, transcript))
 
-    lens = PERSPECTIVE_LENSES[lens_key]
-    user_content = lens["user_template"].format(topic=topic, transcript=transcript)
 
-    return _call_llm_safe(
-        provider=lens.get("provider", "anthropic"),
-        system=lens["system"],
-        user_content=user_content,
-        temperature=lens["temperature"],
-        model_override=lens.get("model_override", "claude-sonnet-4-20250514"),
+async def generate_perspective_async(lens_key: str, topic: str, transcript: str) -> str:
+    """Async counterpart of generate_perspective."""
+    return await _call_llm_safe_async(**_perspective_request(lens_key, topic, transcript))
+
+
+def get_perspective(speech_id: int, user_id: int, lens_key: str, topic: str, transcript: str) -> str:
+    """A lens analysis of a saved speech, generated once and then served from the database."""
+    stored = get_speech_perspectives(speech_id, user_id).get(lens_key)
+    if stored is not None:
+        return stored
+    result = generate_perspective(lens_key, topic, transcript)
+    save_speech_perspective(speech_id, lens_key, result)
+    return result
+
+
+async def get_perspective_async(speech_id: int, user_id: int, lens_key: str, topic: str, transcript: str) -> str:
+    """Async counterpart of get_perspective."""
+    stored = (await asyncio.to_thread(get_speech_perspectives, speech_id, user_id)).get(lens_key)
+    if stored is not None:
+        return stored
+    result = await generate_perspective_async(lens_key, topic, transcript)
+    await asyncio.to_thread(save_speech_perspective, speech_id, lens_key, result)
+    return result
+
+
+# Fan-out mode for combined perspectives: every lens runs concurrently on its own
+# and is stored per (speech, lens), then a short synthesis call merges the lens
+# outputs. Adding a lens to a selection costs one lens call plus the synthesis.
+#   PERSPECTIVES_FAN_OUT   1 to make it the default for generate_combined_perspectives
+PERSPECTIVES_FAN_OUT = os.getenv("PERSPECTIVES_FAN_OUT", "").lower() in ("1", "true", "yes")
+
+
+def _valid_lens_keys(lens_keys: list[str]) -> list[str]:
+    keys = [k for k in dict.fromkeys(lens_keys) if k in PERSPECTIVE_LENSES]
+    if not keys:
+        raise ValueError(f"Invalid lens combination: {lens_keys}")
+    return keys
+
+
+def _synthesis_request(lens_keys: list[str], topic: str, analyses: dict[str, str]) -> dict:
+    prompt = PERSPECTIVE_SYNTHESIS_PROMPT
+    sections = "\n\n---\n\n".join(
+        f"## {PERSPECTIVE_LENSES[k]['icon']} {PERSPECTIVE_LENSES[k]['name']}\n\n{analyses[k]}"
+        for k in lens_keys
     )
+    return {
+        "provider": prompt["provider"],
+        "system": prompt["system"],
+        "user_content": prompt["user_template"].format(topic=topic, count=len(lens_keys), analyses=sections),
+        "temperature": prompt["temperature"],
+        "model_override": prompt["model_override"],
+        "max_tokens": token_budget.passage_budget(350, MAX_TOKENS),
+    }
+
+
+def _merge_perspectives(lens_keys: list[str], analyses: dict[str, str], synthesis: str | None) -> str:
+    """One document: a section per lens, then the synthesis."""
+    sections = [
+        f"## {PERSPECTIVE_LENSES[k]['icon']} {PERSPECTIVE_LENSES[k]['name']}\n\n{analyses[k]}"
+        for k in lens_keys
+    ]
+    if synthesis:
+        sections.append(f"## 🔗 Synthesis: Where the Lenses Converge\n\n{synthesis}")
+    return "\n\n---\n\n".join(sections)
+
 
+def _lens_analysis(lens_key: str, topic: str, transcript: str, speech_id: int | None, user_id: int | None) -> str:
+    if speech_id is not None and user_id is not None:
+        return get_perspective(speech_id, user_id, lens_key, topic, transcript)
+    return generate_perspective(lens_key, topic, transcript)
 
-def generate_combined_perspectives(lens_keys: list[str], topic: str, transcript: str) -> str:
+
+def _fan_out_perspectives(
+    lens_keys: list[str], topic: str, transcript: str, speech_id: int | None, user_id: int | None
+) -> str:
+    lens_keys = _valid_lens_keys(lens_keys)
+    with ThreadPoolExecutor(max_workers=len(lens_keys)) as executor:
+        results = executor.map(
+            lambda k: _lens_analysis(k, topic, transcript, speech_id, user_id), lens_keys
+        )
+        analyses = dict(zip(lens_keys, results))
+    synthesis = _call_llm_safe(**_synthesis_request(lens_keys, topic, analyses)) if len(lens_keys) > 1 else None
+    return _merge_perspectives(lens_keys, analyses, synthesis)
+
+
+async def _fan_out_perspectives_async(
+    lens_keys: list[str], topic: str, transcript: str, speech_id: int | None, user_id: int | None
+) -> str:
+    lens_keys = _valid_lens_keys(lens_keys)
+
+    async def _lens(lens_key: str) -> str:
+        if speech_id is not None and user_id is not None:
+            return await get_perspective_async(speech_id, user_id, lens_key, topic, transcript)
+        return await generate_perspective_async(lens_key, topic, transcript)
+
+    results = await asyncio.gather(*(_lens(k) for k in lens_keys))
+    analyses = dict(zip(lens_keys, results))
+    synthesis = None
+    if len(lens_keys) > 1:
+        synthesis = await _call_llm_safe_async(**_synthesis_request(lens_keys, topic, analyses))
+    return _merge_perspectives(lens_keys, analyses, synthesis)
+
+
+def _combined_perspectives_request(lens_keys: list[str], topic: str, transcript: str) -> dict:
+    combined = get_combined_lens_prompt(lens_keys)
+    if not combined:
+        raise ValueError(f"Invalid lens combination: {lens_keys}")
+
+    return {
+        "provider": combined.get("provider", "anthropic"),
+        "system": combined["system"],
+        "user_content": combined["user_template"].format(topic=topic, transcript=transcript),
+        "temperature": combined["temperature"],
+        "model_override": combined.get("model_override", "claude-sonnet-4-20250514"),
+    }
+
+
+def generate_combined_perspectives(
+    lens_keys: list[str],
+    topic: str,
+    transcript: str,
+    speech_id: int | None = None,
+    user_id: int | None = None,
+    fan_out: bool | None = None,
+) -> str:
     """
     Generate a combined analysis from multiple perspective lenses.
 
@@ -518,20 +2177,29 @@ def generate_combined_perspectives(lens_keys: list[str], topic: str, transcript:
         lens_keys: List of perspective lens keys to combine
         topic: The episode topic
         transcript: The full episode transcript
+        speech_id: Saved speech the transcript belongs to; with user_id, fan-out
+            lens analyses are stored and reused per (speech, lens)
+        user_id: Owner of speech_id
+        fan_out: Run each lens concurrently and synthesize, instead of one
+            combined prompt (default PERSPECTIVES_FAN_OUT)
 
     Returns:
         Generated combined perspective analysis
     """
-    combined = get_combined_lens_prompt(lens_keys)
-    if not combined:
-        raise ValueError(f"Invalid lens combination: {lens_keys}")
+    if PERSPECTIVES_FAN_OUT if fan_out is None else fan_out:
+        return _fan_out_perspectives(lens_keys, topic, transcript, speech_id, user_id)
+    return _call_llm_safe(**_combined_perspectives_request(lens_keys, topic, transcript))
 
-    user_content = combined["user_template"].format(topic=topic, transcript=transcript)
 
-    return _call_llm_safe(
-        provider=combined.get("provider", "anthropic"),
-        system=combined["system"],
-        user_content=user_content,
-        temperature=combined["temperature"],
-        model_override=combined.get("model_override", "claude-sonnet-4-20250514"),
-    )
+async def generate_combined_perspectives_async(
+    lens_keys: list[str],
+    topic: str,
+    transcript: str,
+    speech_id: int | None = None,
+    user_id: int | None = None,
+    fan_out: bool | None = None,
+) -> str:
+    """Async counterpart of generate_combined_perspectives."""
+    if PERSPECTIVES_FAN_OUT if fan_out is None else fan_out:
+        return await _fan_out_perspectives_async(lens_keys, topic, transcript, speech_id, user_id)
+    return await _call_llm_safe_async(**_combined_perspectives_request(lens_keys, topic, transcript))
@@ -13,6 +13,8 @@ Pipeline flow (optimized for quality):
     Stage 5: Final Polish (line-by-line refinement)
 
 Every stage after Stage 0 receives the original topic + research brief for context.
+Drafts and enhancement stages get it as RESEARCH_CONTEXT, a shared prompt prefix
+that the pipeline marks for provider-side prompt caching.
 """
 
 # Episode length presets
@@ -73,9 +75,6 @@ def get_draft_stage(length_key: str = "10 min") -> dict:
             "making complex ideas feel fascinating and approachable. Your scripts make knowledge stick."
         ),
         "user_template": (
-            "Topic: '{topic}'\n\n"
-            "Research brief to draw from (use specific details from this):\n{research}\n\n"
-            "---\n\n"
             "Objective:\n\n"
             "Create an eloquent, intellectually sophisticated, and deeply engaging documentary script on the topic of '{topic}'. "
             "The outcome should be varied and different from any other scripts we've made together. "
@@ -211,6 +210,16 @@ def get_draft_stage(length_key: str = "10 min") -> dict:
     }
 
 
+# --- Shared research context ---
+# Drafts and every enhancement stage open with this exact block, ahead of their
+# own instructions, so providers can cache it as a common prompt prefix.
+RESEARCH_CONTEXT = (
+    "Topic: '{topic}'\n\n"
+    "Research brief (use specific details from this, and keep every fact grounded in it):\n"
+    "{research}"
+)
+
+
 # --- Draft variants for parallel generation (2 drafts for speed) ---
 DRAFT_VARIANTS = [
     {
@@ -227,6 +236,23 @@ DRAFT_VARIANTS = [
     },
 ]
 
+# --- Spare variants launched in hedged mode (see pipeline.DRAFT_HEDGE_EXTRA) ---
+# Alternating providers, so a slow provider is always covered by the other one.
+HEDGE_DRAFT_VARIANTS = [
+    {
+        "label": "Draft C (GPT-4o, hedge)",
+        "provider": "openai",
+        "model_override": "gpt-4o-2024-11-20",
+        "temperature": 0.8,
+    },
+    {
+        "label": "Draft D (Claude Sonnet, hedge)",
+        "provider": "anthropic",
+        "model_override": "claude-sonnet-4-20250514",
+        "temperature": 0.85,
+    },
+]
+
 # --- Judge: Select best draft ---
 JUDGE_PROMPT = {
     "name": "Judge: Select Best Draft",
@@ -312,11 +338,25 @@ CRITIQUE_TEMPLATE = {
         "5. One structural suggestion.\n\n"
         "Be blunt. Be specific. No praise — only actionable feedback."
     ),
+    # Shorter critique used when the pipeline runs under a latency budget
+    "user_template_brief": (
+        "Topic: '{topic}'\n\n"
+        "The following script has just been through '{completed_stage}' and is about to enter '{next_stage}'.\n\n"
+        "Script:\n{text}\n\n"
+        "In under 100 words, list the 3 most important fixes for the next stage. "
+        "Quote the exact phrases that need work. No praise."
+    ),
     "temperature": 0.3,
     "provider": "openai",
     "model_override": "gpt-4o-2024-11-20",
 }
 
+# Stands in for the critique when a latency budget merges it into the enhancement stage
+MERGED_CRITIQUE_NOTE = (
+    "No separate editorial review this round. Before rewriting, find the 3 weakest passages "
+    "and anything that still sounds machine-written, and fix them as part of this stage."
+)
+
 # --- Enhancement stages (4 stages for maximum quality) ---
 ENHANCEMENT_STAGES = [
     {
@@ -328,8 +368,6 @@ ENHANCEMENT_STAGES = [
             "key discoveries, and profound depth while preserving every piece of existing content."
         ),
         "user_template": (
-            "Topic: '{topic}'\n"
-            "Research brief for reference:\n{research}\n\n"
             "Critique from editorial review (address these issues):\n{critique}\n\n"
             "---\n\n"
             "Without losing any content, enhance the following script in these ways:\n\n"
@@ -367,8 +405,6 @@ ENHANCEMENT_STAGES = [
             "opinionated person — not a helpful assistant."
         ),
         "user_template": (
-            "Topic: '{topic}'\n"
-            "Research brief:\n{research}\n\n"
             "Critique:\n{critique}\n\n"
             "---\n\n"
             "The following script needs to be DE-ROBOTIZED. Find and fix ALL instances of:\n\n"
@@ -407,8 +443,6 @@ ENHANCEMENT_STAGES = [
             "You make text a pleasure to listen to."
         ),
         "user_template": (
-            "Topic: '{topic}'\n"
-            "Research brief:\n{research}\n\n"
             "Critique:\n{critique}\n\n"
             "---\n\n"
             "Optimize this script specifically for AUDIO DELIVERY:\n\n"
@@ -447,8 +481,6 @@ ENHANCEMENT_STAGES = [
             "and polish until the text gleams. You are the last line of defense before publication."
         ),
         "user_template": (
-            "Topic: '{topic}'\n"
-            "Research brief (verify facts):\n{research}\n\n"
             "Critique (final check):\n{critique}\n\n"
             "---\n\n"
             "FINAL PASS. Go line by line through this script:\n\n"
@@ -475,6 +507,56 @@ ENHANCEMENT_STAGES = [
     },
 ]
 
+# Appended to an enhancement stage in patch mode (see script_patch.py): the script
+# arrives with numbered paragraphs and only the changed paragraphs come back.
+PATCH_MODE_INSTRUCTIONS = (
+    "\n\n---\n\n"
+    "OUTPUT FORMAT — EDITS ONLY. The script above is split into numbered paragraphs ([P1], [P2], ...). "
+    "Do NOT rewrite the whole script. Return only the paragraphs you change, each as:\n\n"
+    "@@ P<number>\n"
+    "<the full new text of that paragraph>\n\n"
+    "To insert a new paragraph after paragraph N, use a header '@@ P<N>+'. "
+    "To delete a paragraph, give its header with no text. "
+    "Leave paragraph labels out of the text itself, and change as many paragraphs as the task needs. "
+    "Write nothing before the first header, and finish with a line containing only '@@ END'."
+)
+
+# Gated De-AI stage: the local phrase scan found these (see cliche_detector.py).
+# Appended before PATCH_MODE_INSTRUCTIONS so the stage edits only what it needs to.
+DEAI_FLAGGED_NOTE = (
+    "\n\n---\n\n"
+    "An automated scan flagged stock AI phrasing in these paragraphs:\n"
+    "{flagged}\n\n"
+    "Fix every flagged phrase. Edit other paragraphs only where they have the same problems; "
+    "the rest of the script has already passed review."
+)
+
+# Windowed Final Polish: each section of a long script is polished concurrently,
+# with its neighbouring paragraphs shown as read-only context (see script_windows.py).
+POLISH_WINDOW_TEMPLATE = (
+    "Critique (final check):\n{critique}\n\n"
+    "---\n\n"
+    "FINAL PASS on one section of a longer script ({position}). "
+    "Other editors are polishing the rest in parallel.\n\n"
+    "PRECEDING TEXT (context only — do not edit or repeat it):\n{before}\n\n"
+    "SECTION TO POLISH:\n{section}\n\n"
+    "FOLLOWING TEXT (context only — do not edit or repeat it):\n{after}\n\n"
+    "Go line by line through the section:\n"
+    "- Cut any word that doesn't add meaning; replace weak verbs with strong, specific ones\n"
+    "- Eliminate redundancy and filler ('really', 'very', 'quite', 'just' unless purposeful)\n"
+    "- Every fact, name, date, and number must be accurate per the research brief\n"
+    "- Keep the paragraph breaks, and keep the first and last sentences joining smoothly "
+    "with the surrounding text\n"
+    "{position_note}\n\n"
+    "Do NOT add content. Return ONLY the polished section, with no labels or commentary."
+)
+
+POLISH_POSITION_NOTES = {
+    "opening": "- This is the opening: it must hook immediately — no throat-clearing",
+    "middle": "- This is a middle section: don't open or close the episode here",
+    "closing": "- This is the ending: it must resonate — no weak fade-outs or cliché conclusions",
+}
+
 # --- Previous episodes memory (stores opening paragraphs for differentiation) ---
 DIFFERENTIATION_CONTEXT = (
     "IMPORTANT: Here are opening paragraphs from previous episodes we've generated. "
@@ -845,6 +927,29 @@ def get_combined_lens_prompt(lens_keys: list[str]) -> dict | None:
     }
 
 
+# Fan-out mode for combined perspectives: each lens runs on its own (and is cached
+# per speech), then this short call synthesizes the lens outputs.
+PERSPECTIVE_SYNTHESIS_PROMPT = {
+    "system": (
+        "You are a multi-disciplinary thinker who finds the connections between different ways of seeing. "
+        "You integrate several analyses of the same material into insights none of them reaches alone."
+    ),
+    "user_template": (
+        "Topic: '{topic}'\n\n"
+        "The episode on this topic has been analyzed through {count} lenses:\n\n"
+        "{analyses}\n\n"
+        "---\n\n"
+        "**🔗 Synthesis: Where the Lenses Converge**\n"
+        "In 200-350 words: what insights emerge from looking at this topic through these frameworks "
+        "simultaneously? Name where they agree, where they pull against each other, and one idea that "
+        "only appears when they are combined. Do not summarize each lens again."
+    ),
+    "temperature": 0.65,
+    "provider": "anthropic",
+    "model_override": "claude-sonnet-4-20250514",
+}
+
+
 # Legacy exports for backwards compatibility
 RESEARCH_STAGE = get_research_stage("10 min")
 DRAFT_STAGE = get_draft_stage("10 min")
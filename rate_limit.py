@@ -0,0 +1,191 @@
+"""
+Rate-limit-aware scheduler for provider calls.
+
+Every LLM request reserves capacity from a token bucket shared by all threads
+and Streamlit sessions in the process, keyed by (provider, model). One bucket
+meters requests per minute, the other input tokens per minute; a request that
+would overdraw either waits its turn instead of hitting a 429. Reservations
+are taken in arrival order, so a burst of users queues smoothly.
+
+Failed calls are retried with jittered exponential backoff. A provider's
+Retry-After header wins over the computed delay, and a 429 pauses the shared
+bucket so concurrent callers back off together.
+
+Budgets via env vars (set them to your account tier):
+    RATE_LIMIT_ANTHROPIC_RPM / RATE_LIMIT_ANTHROPIC_TPM
+    RATE_LIMIT_OPENAI_RPM / RATE_LIMIT_OPENAI_TPM
+    LLM_MAX_RETRIES (default 5), LLM_BACKOFF_BASE / LLM_BACKOFF_MAX (seconds)
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+
+import anthropic
+import openai
+
+DEFAULT_LIMITS = {
+    "anthropic": {"rpm": 1000, "tpm": 400_000},
+    "openai": {"rpm": 5000, "tpm": 800_000},
+}
+
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "60"))
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def _limit(provider: str, kind: str) -> int:
+    env = os.getenv(f"RATE_LIMIT_{provider.upper()}_{kind.upper()}")
+    if env:
+        return int(env)
+    return DEFAULT_LIMITS.get(provider, DEFAULT_LIMITS["anthropic"])[kind]
+
+
+class _Bucket:
+    """Token bucket that lets callers reserve ahead (the level may go negative)."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` and return how long the caller must wait for it."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate)
+
+
+class _Limiter:
+    def __init__(self, provider: str):
+        self.requests = _Bucket(_limit(provider, "rpm"))
+        self.tokens = _Bucket(_limit(provider, "tpm"))
+        self.paused_until = 0.0
+
+
+_lock = threading.Lock()
+_limiters: dict[tuple[str, str], _Limiter] = {}
+
+
+def _limiter(provider: str, model: str) -> _Limiter:
+    key = (provider, model)
+    if key not in _limiters:
+        _limiters[key] = _Limiter(provider)
+    return _limiters[key]
+
+
+def _reserve(provider: str, model: str, tokens: int) -> float:
+    now = time.monotonic()
+    with _lock:
+        limiter = _limiter(provider, model)
+        wait = max(
+            limiter.requests.reserve(1, now),
+            limiter.tokens.reserve(tokens, now),
+        )
+        return max(wait, limiter.paused_until - now)
+
+
+def acquire(provider: str, model: str, tokens: int):
+    """Block until a request of ~`tokens` input tokens fits the shared budget."""
+    wait = _reserve(provider, model, tokens)
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def acquire_async(provider: str, model: str, tokens: int):
+    """Async counterpart of acquire: waits without blocking the event loop."""
+    wait = _reserve(provider, model, tokens)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+# ──────────────────────────────────────────────
+# Retry policy
+# ──────────────────────────────────────────────
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # HTTP-date form; fall back to computed backoff
+    return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (anthropic.APIConnectionError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, (anthropic.APIStatusError, openai.APIStatusError)):
+        return error.status_code in RETRYABLE_STATUS
+    return False
+
+
+def retry_delay(provider: str, model: str, error: Exception, attempt: int) -> float | None:
+    """
+    Seconds to wait before retry number `attempt + 1`, or None if the error is
+    not retryable or retries are exhausted.
+
+    Uses Retry-After when the provider sends it, otherwise full-jitter
+    exponential backoff. Rate-limit errors also pause the shared bucket.
+    """
+    if attempt >= MAX_RETRIES or not _is_retryable(error):
+        return None
+
+    delay = _retry_after(error)
+    if delay is None:
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    if getattr(error, "status_code", None) == 429:
+        with _lock:
+            limiter = _limiter(provider, model)
+            limiter.paused_until = max(limiter.paused_until, time.monotonic() + delay)
+    return delay
+
+
+def call_with_retries(provider: str, model: str, tokens: int, call, stats: dict | None = None):
+    """
+    Run call() under the shared budget, retrying transient failures.
+
+    If `stats` is given, stats["retries"] is set to the number of retries made.
+    """
+    attempt = 0
+    while True:
+        if stats is not None:
+            stats["retries"] = attempt
+        acquire(provider, model, tokens)
+        try:
+            return call()
+        except Exception as e:
+            delay = retry_delay(provider, model, e, attempt)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+
+
+async def call_with_retries_async(provider: str, model: str, tokens: int, call, stats: dict | None = None):
+    """Async counterpart of call_with_retries; call() returns an awaitable."""
+    attempt = 0
+    while True:
+        if stats is not None:
+            stats["retries"] = attempt
+        await acquire_async(provider, model, tokens)
+        try:
+            return await call()
+        except Exception as e:
+            delay = retry_delay(provider, model, e, attempt)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
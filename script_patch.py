@@ -0,0 +1,127 @@
+"""
+Paragraph-level edit patches for enhancement stages.
+
+In patch mode an enhancement stage sees the script with numbered paragraphs
+and answers with only the paragraphs it changes, instead of re-emitting the
+whole script:
+
+    @@ P3
+    Replacement text for paragraph 3.
+    @@ P5
+    @@ P7+
+    A new paragraph inserted after paragraph 7.
+    @@ END
+
+An empty body deletes the paragraph. The patch is parsed and applied locally;
+anything malformed raises PatchError so the caller can fall back to a full
+rewrite.
+"""
+
+import re
+
+_HEADER = re.compile(r"^@@\s*P(\d+)(\+?)\s*$")
+_END = re.compile(r"^@@\s*END\s*$")
+
+# A patch that deletes more than this share of the script is rejected
+MAX_REMOVED_SHARE = 0.4
+
+
+class PatchError(ValueError):
+    """A model response that is not a valid patch for the script."""
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Paragraphs of a script (blank-line separated), stripped, empty ones dropped."""
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def number_paragraphs(paragraphs: list[str]) -> str:
+    """The script as the model sees it in patch mode: '[P1] ...' per paragraph."""
+    return "\n\n".join(f"[P{i}] {p}" for i, p in enumerate(paragraphs, 1))
+
+
+def parse_patch(response: str, paragraph_count: int) -> list[tuple[int, bool, str]]:
+    """
+    Parse a patch response into (paragraph number, is_insert, text) edits.
+
+    Raises PatchError when the response has no END marker (e.g. it was cut
+    off), has text before the first header, references a paragraph that doesn't
+    exist, or replaces the same paragraph twice.
+    """
+    edits = []
+    current = None
+    body: list[str] = []
+    ended = False
+    seen = set()
+
+    def _close():
+        if current is not None:
+            number, insert = current
+            text = "\n".join(body).strip()
+            # Models sometimes echo the [Pn] label back
+            text = re.sub(r"^\[P\d+\]\s*", "", text)
+            if insert and not text:
+                raise PatchError(f"Empty insertion after paragraph {number}")
+            edits.append((number, insert, text))
+
+    for line in response.strip().splitlines():
+        if line.strip().startswith("```"):
+            continue
+        if _END.match(line.strip()):
+            ended = True
+            break
+        header = _HEADER.match(line.strip())
+        if header:
+            _close()
+            number, insert = int(header.group(1)), bool(header.group(2))
+            if not 1 <= number <= paragraph_count:
+                raise PatchError(f"Patch references paragraph {number} of {paragraph_count}")
+            if not insert and number in seen:
+                raise PatchError(f"Paragraph {number} is edited twice")
+            if not insert:
+                seen.add(number)
+            current, body = (number, insert), []
+        elif current is None:
+            if line.strip():
+                raise PatchError("Text outside of an edit block")
+        else:
+            body.append(line)
+    _close()
+
+    if not ended:
+        # Also catches a response cut off by max_tokens mid-edit
+        raise PatchError("Patch is incomplete (no END marker)")
+    return edits
+
+
+def apply_patch(paragraphs: list[str], edits: list[tuple[int, bool, str]]) -> str:
+    """Apply parsed edits to the paragraphs. Returns the new script text."""
+    replaced = {number: text for number, insert, text in edits if not insert}
+    inserted: dict[int, list[str]] = {}
+    for number, insert, text in edits:
+        if insert:
+            inserted.setdefault(number, []).append(text)
+
+    result = []
+    for i, paragraph in enumerate(paragraphs, 1):
+        text = replaced.get(i, paragraph)
+        if text:
+            result.append(text)
+        result.extend(inserted.get(i, []))
+    return "\n\n".join(result)
+
+
+def patch_script(text: str, response: str) -> tuple[str, int]:
+    """
+    Apply a patch response to a script and sanity-check the result.
+
+    Returns (new_text, edit_count). Raises PatchError if the patch is
+    malformed or would delete too much of the script.
+    """
+    paragraphs = split_paragraphs(text)
+    edits = parse_patch(response, len(paragraphs))
+    patched = apply_patch(paragraphs, edits)
+    before, after = len(text.split()), len(patched.split())
+    if before and after < before * (1 - MAX_REMOVED_SHARE):
+        raise PatchError(f"Patch shrinks the script from {before} to {after} words")
+    return patched, len(edits)
@@ -0,0 +1,112 @@
+"""
+Paragraph windows for polishing a long script in parallel.
+
+The script is cut into consecutive windows of whole paragraphs (about
+window_words each). Every window is polished on its own, with the paragraphs
+just before and after it shown as read-only context, and the results are
+stitched back in order. Seam checks then repair what independent edits tend
+to break at the joins:
+
+  - context paragraphs the model echoed back are dropped
+  - a sentence duplicated across a seam is kept only once
+  - a window whose length changed implausibly keeps its original text
+"""
+
+import re
+
+from script_patch import split_paragraphs
+
+CONTEXT_PARAGRAPHS = 1  # read-only paragraphs shown on each side of a window
+
+# A polished window outside these bounds (relative word count) is discarded
+MIN_LENGTH_RATIO = 0.6
+MAX_LENGTH_RATIO = 1.3
+
+_LABEL = re.compile(r"^(polished section|section to polish|section)\s*:\s*", re.IGNORECASE)
+
+
+def make_windows(text: str, window_words: int) -> list[dict]:
+    """
+    Split a script into windows of whole paragraphs.
+
+    Returns a list of {section, before, after, position, words}; position is
+    "opening", "middle" or "closing". A short tail is folded into the last
+    window rather than polished on its own.
+    """
+    paragraphs = split_paragraphs(text)
+    groups: list[list[int]] = []
+    words = 0
+    for i, paragraph in enumerate(paragraphs):
+        if not groups or words >= window_words:
+            groups.append([])
+            words = 0
+        groups[-1].append(i)
+        words += len(paragraph.split())
+    if len(groups) > 1 and words < window_words / 3:
+        groups[-2].extend(groups.pop())
+
+    windows = []
+    for n, group in enumerate(groups):
+        first, last = group[0], group[-1]
+        windows.append({
+            "section": "\n\n".join(paragraphs[first:last + 1]),
+            "before": "\n\n".join(paragraphs[max(0, first - CONTEXT_PARAGRAPHS):first]),
+            "after": "\n\n".join(paragraphs[last + 1:last + 1 + CONTEXT_PARAGRAPHS]),
+            "position": "opening" if n == 0 else "closing" if n == len(groups) - 1 else "middle",
+            "words": sum(len(paragraphs[i].split()) for i in group),
+        })
+    return windows
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def _sentences(paragraph: str) -> list[str]:
+    return [s for s in re.split(r"(?<=[.!?])\s+", paragraph.strip()) if s]
+
+
+def clean_window(window: dict, polished: str) -> tuple[str, list[str]]:
+    """
+    Seam-check one polished window against its context.
+
+    Returns (text, notes): the text to stitch in (the original section if the
+    polished one is unusable) and a note per repair made.
+    """
+    notes = []
+    paragraphs = split_paragraphs(_LABEL.sub("", polished.strip()))
+    before = {_normalize(p) for p in split_paragraphs(window["before"])}
+    after = {_normalize(p) for p in split_paragraphs(window["after"])}
+    while paragraphs and _normalize(paragraphs[0]) in before:
+        paragraphs.pop(0)
+        notes.append("dropped echoed preceding context")
+    while paragraphs and _normalize(paragraphs[-1]) in after:
+        paragraphs.pop()
+        notes.append("dropped echoed following context")
+
+    text = "\n\n".join(paragraphs)
+    ratio = len(text.split()) / max(window["words"], 1)
+    if not MIN_LENGTH_RATIO <= ratio <= MAX_LENGTH_RATIO:
+        notes.append(f"kept original (length ratio {ratio:.2f})")
+        return window["section"], notes
+    return text, notes
+
+
+def stitch(sections: list[str]) -> tuple[str, int]:
+    """
+    Join polished sections in order, removing a sentence repeated on both
+    sides of a seam. Returns (text, seams_repaired).
+    """
+    repaired = 0
+    parts = [sections[0]] if sections else []
+    for section in sections[1:]:
+        previous = _sentences(split_paragraphs(parts[-1])[-1]) if parts[-1].strip() else []
+        paragraphs = split_paragraphs(section)
+        if previous and paragraphs:
+            opening = _sentences(paragraphs[0])
+            if opening and _normalize(opening[0]) == _normalize(previous[-1]):
+                paragraphs[0] = " ".join(opening[1:])
+                section = "\n\n".join(p for p in paragraphs if p)
+                repaired += 1
+        parts.append(section)
+    return "\n\n".join(p for p in parts if p.strip()), repaired
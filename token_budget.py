@@ -0,0 +1,144 @@
+"""
+Local token estimates and per-stage output budgets.
+
+Pipeline requests used to ask every provider for max_tokens=16384, whether the
+call was a three-line critique or a 20-minute script. Each stage now gets a
+max_tokens derived from its type and the episode length (EPISODE_LENGTHS), so
+short episodes finish sooner and a runaway generation is cut off early.
+
+Token counts are estimated locally (no tokenizer dependency): English prose
+averages ~1.3 tokens per word and ~4 characters per token, and the larger of
+the two estimates is used. A prompt that would not fit the model's context
+window next to its output budget is condensed before it is sent.
+"""
+
+import math
+import re
+
+from prompts import EPISODE_LENGTHS
+
+TOKENS_PER_WORD = 1.35
+CHARS_PER_TOKEN = 4
+
+# Scripts may overshoot their word target; the cap only stops runaways.
+SCRIPT_HEADROOM = 1.5
+SCRIPT_EXTRA_TOKENS = 512  # chapter markers, stage directions
+
+# The research prompt sets no length, and a truncated brief silently starves
+# every later stage, so research keeps at least the old request-wide limit and
+# grows with the episode beyond it (when the cap allows).
+RESEARCH_MIN_TOKENS = 16384
+RESEARCH_TOKENS_PER_SCRIPT_WORD = 4
+
+# Output budgets in tokens for stages whose size doesn't follow the script.
+FIXED_BUDGETS = {
+    "judge": 1024,
+    "critique": 1024,  # prompt asks for max 300 words
+    "critique_brief": 384,  # prompt asks for under 100 words
+}
+SCRIPT_STAGES = ("drafts", "enhancement")
+# Patch-mode enhancement returns only the changed paragraphs
+PATCH_SHARE = 0.5
+
+CONTEXT_WINDOWS = {
+    "claude-sonnet-4-20250514": 200_000,
+    "gpt-4o-2024-11-20": 128_000,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+PROMPT_SAFETY_TOKENS = 1024  # margin for estimation error and message framing
+
+CONDENSED_MARKER = "\n\n[... {tokens} tokens condensed to fit the context window ...]\n\n"
+
+
+def estimate_tokens(*texts: str | None) -> int:
+    """Estimated token count of the given texts combined."""
+    total = 0
+    for text in texts:
+        if not text:
+            continue
+        words = len(text.split())
+        total += max(math.ceil(words * TOKENS_PER_WORD), math.ceil(len(text) / CHARS_PER_TOKEN))
+    return total
+
+
+def output_budget(stage_type: str, length: str = "10 min", cap: int | None = None) -> int:
+    """
+    max_tokens for one call of a pipeline stage.
+
+    Args:
+        stage_type: "research", "drafts", "judge", "critique", "critique_brief",
+            "enhancement" or "enhancement_patch"
+        length: Key of EPISODE_LENGTHS (only affects research and the script stages)
+        cap: Upper bound, e.g. the provider request limit
+
+    Returns:
+        Token budget, never above cap
+    """
+    words_max = EPISODE_LENGTHS[length]["words_max"]
+    if stage_type in SCRIPT_STAGES:
+        budget = words_max * TOKENS_PER_WORD * SCRIPT_HEADROOM + SCRIPT_EXTRA_TOKENS
+    elif stage_type == "enhancement_patch":
+        budget = words_max * TOKENS_PER_WORD * SCRIPT_HEADROOM * PATCH_SHARE + SCRIPT_EXTRA_TOKENS
+    elif stage_type == "research":
+        budget = max(RESEARCH_MIN_TOKENS, words_max * RESEARCH_TOKENS_PER_SCRIPT_WORD)
+    else:
+        budget = FIXED_BUDGETS[stage_type]
+    return min(cap, int(budget)) if cap else int(budget)
+
+
+def passage_budget(words: int, cap: int | None = None) -> int:
+    """max_tokens for rewriting a passage of `words` words (e.g. one polish window)."""
+    budget = int(words * TOKENS_PER_WORD * SCRIPT_HEADROOM) + SCRIPT_EXTRA_TOKENS // 2
+    return min(cap, budget) if cap else budget
+
+
+def _condense(text: str, max_tokens: int) -> str:
+    """
+    Shorten text to about max_tokens by dropping whole paragraphs from the
+    middle, keeping the opening and the end (instructions and the latest
+    material usually sit there).
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    paragraphs = re.split(r"\n\s*\n", text)
+    head, tail = [], []
+    used = estimate_tokens(CONDENSED_MARKER)
+    while paragraphs:
+        # Alternate between the front and the back
+        take_front = len(head) <= len(tail)
+        paragraph = paragraphs[0] if take_front else paragraphs[-1]
+        cost = estimate_tokens(paragraph)
+        if used + cost > max_tokens:
+            break
+        used += cost
+        if take_front:
+            head.append(paragraphs.pop(0))
+        else:
+            tail.insert(0, paragraphs.pop())
+    if not head and not tail:
+        # A single oversized paragraph: hard cut on characters
+        return text[: max(0, max_tokens - used) * CHARS_PER_TOKEN]
+    dropped = estimate_tokens(*paragraphs)
+    return "\n\n".join(head) + CONDENSED_MARKER.format(tokens=dropped) + "\n\n".join(tail)
+
+
+def fit_prompt(
+    model: str, system: str, user_content: str, context: str | None, max_tokens: int
+) -> tuple[str, str | None, int]:
+    """
+    Make a prompt fit the model's context window next to max_tokens of output.
+
+    The shared context (research brief) is condensed first, then the user
+    content. Returns (user_content, context, tokens_removed); the prompt is
+    returned unchanged when it already fits.
+    """
+    window = CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    available = window - max_tokens - PROMPT_SAFETY_TOKENS - estimate_tokens(system)
+    before = estimate_tokens(user_content, context)
+    if before <= available:
+        return user_content, context, 0
+
+    if context:
+        context = _condense(context, max(available - estimate_tokens(user_content), available // 4))
+    user_content = _condense(user_content, max(available - estimate_tokens(context), 0))
+    return user_content, context, before - estimate_tokens(user_content, context)
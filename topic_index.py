@@ -0,0 +1,159 @@
+"""
+Near-duplicate topic detection over saved episodes.
+
+Topics are normalized (lowercased, punctuation and question filler removed,
+light suffix stemming) and compared with TF-IDF cosine similarity, so
+"How does memory work?" and "how memory works" are the same topic. Everything
+runs locally; the index is rebuilt in-process whenever the speeches table
+changes.
+
+A user is matched against their own episodes and the shared catalogue
+(episodes owned by system accounts, see batch.py), never against other
+users' libraries.
+
+TF-IDF ignores word order, so "how does inflation affect unemployment" and
+"how does unemployment affect inflation" score 1.0 against each other. A
+match is only served without asking when the content words also appear in
+the same order; otherwise it is just offered.
+
+Thresholds via env vars:
+    TOPIC_MATCH_OFFER        similarity at which an existing episode is offered (default 0.75)
+    TOPIC_MATCH_AUTO_SERVE   similarity at which it is served without asking (default 0.92)
+"""
+
+import math
+import os
+import re
+import threading
+
+from database import get_episode_topics, get_speeches_version
+
+OFFER_THRESHOLD = float(os.getenv("TOPIC_MATCH_OFFER", "0.75"))
+AUTO_SERVE_THRESHOLD = float(os.getenv("TOPIC_MATCH_AUTO_SERVE", "0.92"))
+
+STOPWORDS = {
+    "a", "about", "actually", "an", "and", "are", "as", "at", "be", "by", "can", "could",
+    "did", "do", "does", "explain", "explained", "for", "from", "how", "i", "in", "into",
+    "is", "it", "its", "me", "mine", "my", "of", "on", "or", "our", "really", "should",
+    "tell", "that", "the", "this", "to", "us", "was", "we", "were", "what", "when",
+    "where", "which", "who", "why", "with", "would", "you", "your",
+}
+
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so 'works', 'working' and 'worked' collapse."""
+    if len(word) > 4 and word.endswith("ies"):
+        word = word[:-3] + "y"
+    elif word.endswith(("ches", "shes", "sses", "xes")):
+        word = word[:-2]
+    elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed", "ly"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            word = word[:-len(suffix)]
+            break
+    # "improve" / "improving" -> "improv"
+    if len(word) > 4 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def _terms(topic: str) -> list[str]:
+    words = re.findall(r"[a-z0-9]+", topic.lower().replace("'", ""))
+    return [_stem(w) for w in words if w not in STOPWORDS]
+
+
+def normalize_topic(topic: str) -> str:
+    """Canonical form of a topic: stemmed content words, de-duplicated and sorted."""
+    return " ".join(sorted(set(_terms(topic))))
+
+
+class _Index:
+    """TF-IDF vectors for every saved episode topic, with an inverted index."""
+
+    def __init__(self, episodes: list[dict]):
+        self.episodes = episodes
+        doc_terms = [_terms(e["topic"]) for e in episodes]
+        df: dict[str, int] = {}
+        for terms in doc_terms:
+            for term in set(terms):
+                df[term] = df.get(term, 0) + 1
+        n = len(episodes)
+        self.idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self.vectors = [self._vector(terms) for terms in doc_terms]
+        self.postings: dict[str, list[int]] = {}
+        for i, vector in enumerate(self.vectors):
+            for term in vector:
+                self.postings.setdefault(term, []).append(i)
+
+    def _vector(self, terms: list[str]) -> dict[str, float]:
+        counts: dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        # Terms unseen in the corpus get the maximum idf
+        default_idf = math.log(1 + len(self.episodes)) + 1
+        vector = {t: c * self.idf.get(t, default_idf) for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values()))
+        return {t: v / norm for t, v in vector.items()} if norm else {}
+
+    def search(self, topic: str, allowed) -> list[tuple[float, dict]]:
+        """(score, episode) for every allowed episode sharing a term with topic, best first."""
+        query = self._vector(_terms(topic))
+        scores: dict[int, float] = {}
+        for term, weight in query.items():
+            for i in self.postings.get(term, ()):
+                scores[i] = scores.get(i, 0.0) + weight * self.vectors[i][term]
+        hits = [(score, self.episodes[i]) for i, score in scores.items() if allowed(self.episodes[i])]
+        return sorted(hits, key=lambda hit: (-hit[0], -hit[1]["id"]))
+
+
+_lock = threading.Lock()
+_index: _Index | None = None
+_index_version = None
+
+
+def _current_index() -> _Index:
+    global _index, _index_version
+    version = get_speeches_version()
+    with _lock:
+        if _index is None or version != _index_version:
+            _index = _Index(get_episode_topics())
+            _index_version = version
+        return _index
+
+
+def find_similar_episode(user_id: int, topic: str, threshold: float = OFFER_THRESHOLD) -> dict | None:
+    """
+    Best existing episode for a (near-)identical topic, or None below threshold.
+
+    Returns {speech_id, user_id, topic, score, has_audio, catalogue, auto_serve}:
+    auto_serve is True when the match is close enough (AUTO_SERVE_THRESHOLD), has
+    the same content words in the same order, and has audio, so it can be served
+    without asking. Among equal scores the
+    user's own episode wins, then the newest.
+    """
+    def allowed(episode: dict) -> bool:
+        return episode["user_id"] == user_id or episode["catalogue"]
+
+    hits = _current_index().search(topic, allowed)
+    if not hits:
+        return None
+    best_score = hits[0][0]
+    ties = [episode for score, episode in hits if score >= best_score - 1e-9]
+    episode = next((e for e in ties if e["user_id"] == user_id), ties[0])
+    score = round(min(best_score, 1.0), 3)
+    if score < threshold:
+        return None
+    return {
+        "speech_id": episode["id"],
+        "user_id": episode["user_id"],
+        "topic": episode["topic"],
+        "score": score,
+        "has_audio": episode["has_audio"],
+        "catalogue": episode["catalogue"],
+        "auto_serve": (
+            score >= AUTO_SERVE_THRESHOLD
+            and _terms(topic) == _terms(episode["topic"])
+            and episode["has_audio"]
+        ),
+    }
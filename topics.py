@@ -43,6 +43,11 @@ def _load_topics():
     return _ALL_TOPICS
 
 
+def get_all_topics() -> list[str]:
+    """Get every topic in topics.txt, in file order."""
+    return list(_load_topics())
+
+
 def get_random_topic() -> str:
     """Get a random topic from the list."""
     topics = _load_topics()
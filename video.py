@@ -16,23 +16,12 @@ import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import requests
 from dotenv import load_dotenv
 
-load_dotenv()
-
+from cancellation import Cancelled, CancelToken
+from clients import get_http_session, get_luma_client
 
-def _get_luma_client():
-    """Get Luma AI client with API key from env or Streamlit secrets."""
-    try:
-        import streamlit as st
-        if "LUMA_API_KEY" not in os.environ and "LUMA_API_KEY" in st.secrets:
-            os.environ["LUMAAI_API_KEY"] = st.secrets["LUMA_API_KEY"]
-    except Exception:
-        pass
-
-    from lumaai import LumaAI
-    return LumaAI()
+load_dotenv()
 
 
 def segment_transcript(transcript: str, target_seconds: int = 12) -> list[dict]:
@@ -100,12 +89,14 @@ def segment_transcript(transcript: str, target_seconds: int = 12) -> list[dict]:
 def generate_shot_prompts(
     segments: list[dict],
     topic: str,
-    style: str = "documentary"
+    style: str = "documentary",
+    cancel: CancelToken | None = None,
 ) -> list[dict]:
     """
     Generate visual prompts for each transcript segment.
 
-    Uses Claude to create cinematic shot descriptions.
+    Uses Claude to create cinematic shot descriptions. Raises Cancelled before
+    the next segment once cancel is cancelled.
     """
     from pipeline import _call_llm_safe
 
@@ -140,6 +131,8 @@ def generate_shot_prompts(
 
     prompts = []
     for i, segment in enumerate(segments):
+        if cancel:
+            cancel.raise_if_cancelled()
         user_content = f"""Topic: {topic}
 
 Narration for this shot:
@@ -179,6 +172,7 @@ def generate_video_clip(
     duration: str = "5s",
     resolution: str = "720p",
     model: str = "ray-flash-2",
+    cancel: CancelToken | None = None,
 ) -> bytes:
     """
     Generate a single video clip using Luma AI.
@@ -188,11 +182,15 @@ def generate_video_clip(
         duration: "5s" or "9s"
         resolution: "540p", "720p", or "1080p"
         model: "ray-flash-2" (fast/cheap) or "ray-2" (quality)
+        cancel: Stop polling, delete the generation and raise Cancelled when
+            this token is cancelled
 
     Returns:
         Video bytes (MP4)
     """
-    client = _get_luma_client()
+    client = get_luma_client()
+    if cancel:
+        cancel.raise_if_cancelled()
 
     # Create generation
     generation = client.generations.create(
@@ -209,11 +207,18 @@ def generate_video_clip(
             break
         elif generation.state == "failed":
             raise RuntimeError(f"Video generation failed: {generation.failure_reason}")
-        time.sleep(2)
+        if cancel is None:
+            time.sleep(2)
+        elif cancel.wait(2):
+            try:
+                client.generations.delete(id=generation.id)
+            except Exception:
+                pass  # Best effort: the clip is abandoned either way
+            raise Cancelled(cancel.reason)
 
     # Download the video
     video_url = generation.assets.video
-    response = requests.get(video_url, stream=True)
+    response = get_http_session().get(video_url)
     response.raise_for_status()
 
     return response.content
@@ -225,10 +230,15 @@ def generate_all_clips(
     resolution: str = "720p",
     model: str = "ray-flash-2",
     max_parallel: int = 3,
+    cancel: CancelToken | None = None,
 ) -> list[bytes]:
     """
     Generate all video clips, with some parallelism.
 
+    If cancel is cancelled, clips not started yet are dropped, running ones stop
+    at their next status poll, and Cancelled is raised with the clips finished so
+    far as its partial result (None where a clip is missing).
+
     Returns list of video bytes in order.
     """
     results = [None] * len(shot_prompts)
@@ -239,6 +249,7 @@ def generate_all_clips(
             duration=duration,
             resolution=resolution,
             model=model,
+            cancel=cancel,
         )
         return idx, video
 
@@ -247,10 +258,22 @@ def generate_all_clips(
             executor.submit(_generate, i, shot)
             for i, shot in enumerate(shot_prompts)
         ]
-        for future in as_completed(futures):
-            idx, video = future.result()
-            results[idx] = video
-
+        remove = cancel.on_cancel(lambda: [f.cancel() for f in futures]) if cancel else None
+        try:
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                try:
+                    idx, video = future.result()
+                except Cancelled:
+                    continue
+                results[idx] = video
+        finally:
+            if remove:
+                remove()
+
+    if cancel:
+        cancel.raise_if_cancelled(partial=results)
     return results
 
 
@@ -329,6 +352,7 @@ def generate_video_from_episode(
     resolution: str = "720p",
     model: str = "ray-flash-2",
     on_progress: callable = None,
+    cancel: CancelToken | None = None,
 ) -> bytes:
     """
     Full pipeline: transcript + audio -> video.
@@ -341,6 +365,8 @@ def generate_video_from_episode(
         resolution: "720p" or "1080p"
         model: "ray-flash-2" (fast) or "ray-2" (quality)
         on_progress: Optional callback(step, total, message)
+        cancel: Optional CancelToken; stops the remaining steps and raises
+            Cancelled (see generate_all_clips for the partial clips)
 
     Returns:
         Final MP4 bytes
@@ -355,7 +381,7 @@ def generate_video_from_episode(
 
     # Step 2: Generate shot prompts
     _progress(2, 4, f"Creating {len(segments)} shot descriptions...")
-    shot_prompts = generate_shot_prompts(segments, topic, style)
+    shot_prompts = generate_shot_prompts(segments, topic, style, cancel=cancel)
 
     # Step 3: Generate video clips
     _progress(3, 4, f"Generating {len(shot_prompts)} video clips...")
@@ -365,6 +391,7 @@ def generate_video_from_episode(
         resolution=resolution,
         model=model,
         max_parallel=2,  # Be nice to the API
+        cancel=cancel,
     )
 
     # Step 4: Stitch with audio
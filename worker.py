@@ -0,0 +1,239 @@
+"""
+Background workers for episode generation.
+
+With JOB_QUEUE on, the app no longer generates inside the browser tab's script
+run: it queues a job (database.enqueue_job) and polls its status. A worker
+claims queued jobs one at a time and runs the full pipeline plus TTS for them,
+saving the episode exactly as the inline path does. A rerun, a closed tab or a
+restarted Streamlit server doesn't lose the episode, and generation capacity
+scales with the number of workers rather than open tabs.
+
+Workers run either as separate processes (this script, on one or more hosts)
+or as threads inside the Streamlit server (JOB_EMBEDDED_WORKERS), sharing the
+same SQLite database. Hosts sharing a volume need a filesystem with working
+SQLite locking.
+
+Jobs are claimed with a lease that the worker renews with heartbeats while it
+runs. If a worker crashes, its lease expires and the next claim puts the job
+back in the queue; a job that fails is retried with backoff. After
+JOB_MAX_ATTEMPTS either way it is dead-lettered (status "dead"). Nothing is
+lost on a retry: the pipeline run is checkpointed under the job's run_id and
+continues from its last finished step, and an episode already saved only gets
+its audio. Stopping a job from the app flags it; the worker cancels the run
+through a CancelToken, as it does when it finds its lease was lost.
+
+Configuration via env vars:
+    JOB_QUEUE                1 = the app generates through the job queue (default 0 = inline)
+    JOB_EMBEDDED_WORKERS     worker threads started inside the Streamlit server (default 1)
+    JOB_POLL_SECONDS         how often an idle worker checks the queue (default 2)
+    JOB_LEASE_SECONDS        how long a job stays with a worker that stopped heartbeating (default 60)
+    JOB_MAX_ATTEMPTS         attempts before a job is dead-lettered (default 3)
+    JOB_RETRY_DELAY_SECONDS  wait before retrying a failed job, doubling per attempt (default 30)
+
+Usage:
+    python worker.py
+    python worker.py --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+from cancellation import CancelToken
+from database import (
+    claim_job,
+    fail_job,
+    finish_job,
+    get_speech,
+    heartbeat_job,
+    is_job_cancel_requested,
+    release_job,
+    save_audio,
+    save_job_speech,
+    update_job_progress,
+)
+from exporter import generate_audio
+from pipeline import PRECOMPUTE_ADDONS, precompute_addons, run_full_pipeline
+
+JOB_QUEUE = os.getenv("JOB_QUEUE", "0") == "1"
+JOB_EMBEDDED_WORKERS = int(os.getenv("JOB_EMBEDDED_WORKERS", "1"))
+JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "2"))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY_SECONDS = float(os.getenv("JOB_RETRY_DELAY_SECONDS", "30"))
+CANCEL_POLL_SECONDS = 2  # how often a running job checks whether it was stopped
+HEARTBEATS_PER_LEASE = 3  # a lease survives two missed heartbeats
+
+PROGRESS_STEPS = 12  # Research, Drafts, Judge, 4x(Critique+Enhancement), Audio
+
+
+def _worker_name(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+
+def _monitor(job_id: str, worker: str, cancel: CancelToken, done: threading.Event):
+    """
+    Keep the job's lease alive while it runs, and cancel the run once the app
+    asks for it to stop or the lease turns out to be lost.
+    """
+    interval = JOB_LEASE_SECONDS / HEARTBEATS_PER_LEASE
+    next_heartbeat = time.monotonic() + interval
+    while not done.wait(min(CANCEL_POLL_SECONDS, interval)):
+        try:
+            if time.monotonic() < next_heartbeat:
+                if is_job_cancel_requested(job_id):
+                    cancel.cancel("stopped by user")
+                    return
+                continue
+            state = heartbeat_job(job_id, worker, JOB_LEASE_SECONDS)
+        except Exception:
+            continue  # e.g. database briefly locked: try again on the next tick
+        next_heartbeat = time.monotonic() + interval
+        if state is None:
+            cancel.cancel("lease lost")
+            return
+        if state["cancel_requested"]:
+            cancel.cancel("stopped by user")
+            return
+
+
+def _generate_text(job: dict, worker: str, cancel: CancelToken) -> tuple[list, str | None]:
+    """Run (or resume) the job's pipeline. Returns (steps, final_text); final_text is None if cancelled."""
+    steps = []
+    for step_name, step_type, data in run_full_pipeline(
+        job["topic"], job["length"], run_id=job["run_id"], user_id=job["user_id"], cancel=cancel,
+    ):
+        if step_type == "cancelled":
+            return steps, None
+        if step_type == "done":
+            # Not a progress step: the episode still has to be saved and voiced
+            steps.append((step_name, step_type, data))
+            return steps, data["final_text"]
+        if data.get("status") in ("done", "skipped"):
+            steps.append((step_name, step_type, data))
+            update_job_progress(job["job_id"], worker, {
+                "step": step_name, "step_type": step_type, "completed": len(steps), "total": PROGRESS_STEPS,
+            })
+    return steps, None
+
+
+def _audio_progress(job_id: str, worker: str, completed: int):
+    """Report the audio step; the bar only reaches the total once the episode is saved and voiced."""
+    update_job_progress(job_id, worker, {
+        "step": "Audio", "step_type": "audio", "completed": completed, "total": PROGRESS_STEPS,
+    })
+
+
+def run_job(job: dict, worker: str) -> str:
+    """
+    Generate one claimed job end to end and close it. Returns the outcome:
+    "done", "cancelled", "queued" (failed, will be retried), "dead"
+    (dead-lettered) or "lost" (the lease passed to another worker first).
+    """
+    job_id = job["job_id"]
+    cancel = CancelToken()
+    done = threading.Event()
+    threading.Thread(target=_monitor, args=(job_id, worker, cancel, done), daemon=True).start()
+    try:
+        speech_id = job["speech_id"]
+        if speech_id:
+            # An earlier attempt saved the episode before it was lost: only the audio may be missing
+            speech = get_speech(speech_id, job["user_id"])
+            final_text, has_audio = speech["final_text"], speech["audio_data"] is not None
+        else:
+            steps, final_text = _generate_text(job, worker, cancel)
+            if final_text is None:
+                return "cancelled" if finish_job(job_id, worker, "cancelled") else "lost"
+            speech_id = save_job_speech(job_id, worker, final_text, steps)
+            if speech_id is None:
+                return "lost"
+            if PRECOMPUTE_ADDONS:
+                precompute_addons(speech_id, job["topic"], final_text)
+            has_audio = False
+
+        # As in the app, an episode whose audio fails is still kept (audio can be made later)
+        error = None
+        if not has_audio:
+            _audio_progress(job_id, worker, PROGRESS_STEPS - 1)
+            try:
+                audio_bytes = generate_audio(final_text, voice=job["voice"], speed=1.0, cancel=cancel)
+                save_audio(speech_id, job["user_id"], audio_bytes, job["voice"])
+            except Exception as e:
+                error = f"Audio generation failed: {e}"
+        _audio_progress(job_id, worker, PROGRESS_STEPS)
+        return "done" if finish_job(job_id, worker, "done", error=error) else "lost"
+    except Exception as e:
+        return fail_job(job_id, worker, str(e), JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY_SECONDS) or "lost"
+    except BaseException:
+        # Shutting down (Ctrl-C): hand the job back without using up an attempt
+        release_job(job_id, worker)
+        raise
+    finally:
+        done.set()
+
+
+def work(worker: str, stop: threading.Event | None = None, poll_seconds: float | None = None):
+    """Claim and run jobs until stop is set (forever by default)."""
+    stop = stop or threading.Event()
+    poll_seconds = JOB_POLL_SECONDS if poll_seconds is None else poll_seconds
+    while not stop.is_set():
+        try:
+            job = claim_job(worker, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS)
+            if job is None:
+                stop.wait(poll_seconds)
+                continue
+            outcome = run_job(job, worker)
+        except Exception as e:
+            # e.g. database locked, or closing a failed job failed: a job left
+            # running is recovered when its lease expires, so keep serving the queue
+            print(f"[{worker}] error     {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+            stop.wait(poll_seconds)
+            continue
+        print(f"[{worker}] {outcome:<9} {job['job_id']}  attempt {job['attempts']}  {job['topic']}", flush=True)
+
+
+_embedded: list[threading.Thread] = []
+
+
+def start_embedded_workers(count: int = JOB_EMBEDDED_WORKERS) -> list[threading.Thread]:
+    """Start worker threads in this process (once; later calls return the running ones)."""
+    if not _embedded:
+        for i in range(count):
+            thread = threading.Thread(target=work, args=(_worker_name(i),), daemon=True, name=f"job-worker-{i}")
+            thread.start()
+            _embedded.append(thread)
+    return _embedded
+
+
+def _run_process(index: int):
+    try:
+        work(_worker_name(index))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run MindCast generation workers.")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes (default: 2)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    print(f"Starting {args.workers} generation workers (Ctrl-C to stop)...", flush=True)
+    processes = [multiprocessing.Process(target=_run_process, args=(i,)) for i in range(args.workers)]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # The children got the same SIGINT and put their jobs back in the queue
+        for process in processes:
+            process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())